@@ -0,0 +1,9 @@
+"""
+Benchmarks for django-contact-form's per-submission hot path.
+
+Run with ``python -m benchmarks`` from the repository root (or via the ``benchmarks``
+nox session); results are written as JSON.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
@@ -0,0 +1,386 @@
+"""
+Run the benchmarks and write their results as JSON.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import django
+
+BENCHMARKS = []
+
+PAYLOAD = {
+    "name": "Benchmark",
+    "email": "benchmark@example.com",
+    "body": "A message of typical length, sent through the contact form.",
+}
+
+
+def benchmark(function):
+    """
+    Register a benchmark: a function which takes the stub Akismet server and returns
+    a pair of (setup, run) callables. ``setup`` is called (untimed) before each
+    iteration, and its return value passed to ``run``, which is timed.
+
+    """
+    BENCHMARKS.append(function)
+    return function
+
+
+def measure(name: str, setup, run, iterations: int) -> dict:
+    """
+    Time ``iterations`` calls of ``run`` after a warm-up, and summarize them.
+
+    """
+    run(setup())
+    timings = []
+    for _ in range(iterations):
+        argument = setup()
+        start = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "mean_s": statistics.mean(timings),
+        "median_s": statistics.median(timings),
+        "p95_s": timings[int(0.95 * (iterations - 1))],
+        "ops_per_s": iterations / sum(timings),
+    }
+
+
+def measure_memory(name: str, setup, run, iterations: int) -> dict:
+    """
+    Measure the mean peak memory allocated by a call of ``run``.
+
+    """
+    run(setup())
+    peaks = []
+    for _ in range(iterations):
+        argument = setup()
+        tracemalloc.start()
+        run(argument)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "mean_peak_bytes": statistics.mean(peaks),
+        "max_peak_bytes": max(peaks),
+    }
+
+
+# Modules whose import time is measured, in fresh interpreters without Django settings
+# configured.
+IMPORTS = [
+    "django_contact_form.forms",
+    "django_contact_form.akismet_urls",
+    "django_contact_form._akismet",
+]
+
+IMPORT_SCRIPT = """
+import sys
+import time
+
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "akismet" in sys.modules, "httpx" in sys.modules)
+"""
+
+
+def measure_import(module: str, iterations: int) -> dict:
+    """
+    Time importing a module in ``iterations`` fresh interpreters, without Django
+    settings configured, and record whether doing so imported ``akismet`` or
+    ``httpx``.
+
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    environment.pop("DJANGO_SETTINGS_MODULE", None)
+    timings = []
+    for _ in range(iterations):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT.format(module=module)],
+            env=environment,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+    return {
+        "name": f"import {module}",
+        "iterations": iterations,
+        "mean_s": statistics.mean(timings),
+        "median_s": statistics.median(timings),
+        "imports_akismet": output[1] == "True",
+        "imports_httpx": output[2] == "True",
+    }
+
+
+def nothing():
+    """
+    Setup function for benchmarks which need none.
+
+    """
+
+
+@benchmark
+def view_get(stub):  # pylint: disable=unused-argument
+    """
+    Display the contact form.
+
+    """
+    from django.test import Client  # pylint: disable=import-outside-toplevel
+
+    client = Client()
+    return nothing, lambda _: client.get("/")
+
+
+@benchmark
+def view_get_cached(stub):  # pylint: disable=unused-argument
+    """
+    Display the contact form from the page cache.
+
+    """
+    from django.test import Client  # pylint: disable=import-outside-toplevel
+
+    client = Client()
+    return nothing, lambda _: client.get("/cached/")
+
+
+@benchmark
+def view_post(stub):  # pylint: disable=unused-argument
+    """
+    Submit the contact form, sending the message with the in-memory mail backend.
+
+    """
+    from django.core import mail  # pylint: disable=import-outside-toplevel
+    from django.test import Client  # pylint: disable=import-outside-toplevel
+
+    client = Client()
+    return mail.outbox.clear, lambda _: client.post("/", PAYLOAD)
+
+
+@benchmark
+def view_post_akismet(stub):  # pylint: disable=unused-argument
+    """
+    Submit the Akismet contact form, checking it with the stub Akismet server.
+
+    """
+    from django.core import mail  # pylint: disable=import-outside-toplevel
+    from django.test import Client  # pylint: disable=import-outside-toplevel
+
+    client = Client()
+    return mail.outbox.clear, lambda _: client.post("/akismet/", PAYLOAD)
+
+
+@benchmark
+def get_message_dict(stub):  # pylint: disable=unused-argument
+    """
+    Render the message for a validated form.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.test import RequestFactory
+
+    from django_contact_form.forms import ContactForm
+
+    def setup():
+        """
+        Return a validated contact form.
+
+        """
+        form = ContactForm(request=RequestFactory().post("/"), data=PAYLOAD)
+        form.is_valid()
+        return form
+
+    return setup, lambda form: form.get_message_dict()
+
+
+def _rendering(message_renderer):
+    """
+    Return a (setup, run) pair rendering the subject and body of a contact form's
+    message with the given renderer.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.test import RequestFactory
+
+    from django_contact_form.forms import ContactForm
+
+    form_class = type(
+        "BenchmarkRenderedForm", (ContactForm,), {"message_renderer": message_renderer}
+    )
+
+    def setup():
+        """
+        Return a validated contact form, with its message context computed.
+
+        """
+        form = form_class(request=RequestFactory().post("/"), data=PAYLOAD)
+        form.get_message_context()
+        return form
+
+    return setup, lambda form: (form.subject(), form.message())
+
+
+@benchmark
+def render_template(stub):  # pylint: disable=unused-argument
+    """
+    Render a message with the Django template engine, running context processors.
+
+    """
+    return _rendering(None)
+
+
+@benchmark
+def render_template_no_context_processors(stub):  # pylint: disable=unused-argument
+    """
+    Render a message with the Django template engine, skipping context processors.
+
+    """
+    from django_contact_form.renderers import (  # pylint: disable=import-outside-toplevel
+        TemplateRenderer,
+    )
+
+    return _rendering(TemplateRenderer(context_processors=False))
+
+
+@benchmark
+def render_format(stub):  # pylint: disable=unused-argument
+    """
+    Render a message from format strings, without the template engine.
+
+    """
+    from django_contact_form.forms import (  # pylint: disable=import-outside-toplevel
+        ContactForm,
+    )
+    from django_contact_form.renderers import (  # pylint: disable=import-outside-toplevel
+        FormatRenderer,
+    )
+
+    return _rendering(
+        FormatRenderer(
+            {
+                ContactForm.subject_template_name: "Contact form message",
+                ContactForm.template_name: "{body}\n",
+            }
+        )
+    )
+
+
+def _akismet_validation(data):
+    """
+    Return a (setup, run) pair validating an Akismet contact form with the given data.
+
+    """
+    from django.test import RequestFactory  # pylint: disable=import-outside-toplevel
+
+    from .urls import BenchmarkAkismetForm
+
+    def setup():
+        """
+        Return an unvalidated Akismet contact form.
+
+        """
+        return BenchmarkAkismetForm(request=RequestFactory().post("/"), data=data)
+
+    return setup, lambda form: form.is_valid()
+
+
+@benchmark
+def akismet_validate(stub):  # pylint: disable=unused-argument
+    """
+    Validate a submission to the Akismet contact form, including the spam check.
+
+    """
+    return _akismet_validation(PAYLOAD)
+
+
+@benchmark
+def akismet_validate_invalid(stub):  # pylint: disable=unused-argument
+    """
+    Validate an invalid submission to the Akismet contact form, which is rejected
+    without a spam check.
+
+    """
+    return _akismet_validation(dict(PAYLOAD, email="not an email address"))
+
+
+def run(iterations: int) -> dict:
+    """
+    Run all the benchmarks, and return their results.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.core import mail
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    from .stub_akismet import StubAkismet
+    from .urls import BenchmarkAkismetForm
+
+    setup_test_environment()
+    call_command("migrate", verbosity=0, interactive=False)
+    results = []
+    with StubAkismet() as stub:
+        BenchmarkAkismetForm.akismet_client = stub.client()
+        for function in BENCHMARKS:
+            setup, timed = function(stub)
+            results.append(measure(function.__name__, setup, timed, iterations))
+        client = Client()
+        results.append(
+            measure_memory(
+                "view_post_memory",
+                mail.outbox.clear,
+                lambda _: client.post("/akismet/", PAYLOAD),
+                max(1, iterations // 10),
+            )
+        )
+    for module in IMPORTS:
+        results.append(measure_import(module, max(1, iterations // 50)))
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    """
+    Parse command-line arguments, run the benchmarks and write the results.
+
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument(
+        "--iterations", type=int, default=500, help="Timed iterations per benchmark."
+    )
+    parser.add_argument(
+        "--output", help="File to write the JSON results to (default: standard output)."
+    )
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    django.setup()
+    results = json.dumps(run(args.iterations), indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(results + "\n")
+    else:
+        sys.stdout.write(results + "\n")
+
+
+if __name__ == "__main__":
+    main()
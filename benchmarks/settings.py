@@ -0,0 +1,13 @@
+"""
+Django settings for benchmark runs: the test settings, with Django's in-memory mail
+backend and the benchmark URLConf.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from tests.settings import *  # noqa: F401,F403 pylint: disable=wildcard-import
+
+ALLOWED_HOSTS = ["testserver"]
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+ROOT_URLCONF = "benchmarks.urls"
@@ -0,0 +1,98 @@
+"""
+A local stub of the Akismet web service, so that benchmarks measure the cost of a
+real HTTP round-trip without depending on (or abusing) the real service.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import http.server
+import threading
+
+import akismet
+import httpx
+
+
+class StubAkismetHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer Akismet API requests: every key is valid, and nothing is spam.
+
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Read the request and send the canned response for its endpoint.
+
+        """
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"valid" if self.path.endswith("verify-key") else b"false"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Don't log requests.
+
+        """
+
+
+class StubTransport(httpx.HTTPTransport):
+    """
+    HTTP transport which sends all requests to the stub server instead.
+
+    """
+
+    def __init__(self, port: int):
+        super().__init__()
+        self.port = port
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Redirect the request to the stub server.
+
+        """
+        request.url = request.url.copy_with(
+            scheme="http", host="127.0.0.1", port=self.port
+        )
+        return super().handle_request(request)
+
+
+class StubAkismet:
+    """
+    Run a stub Akismet server in a background thread, and hand out clients which talk
+    to it.
+
+    """
+
+    config = akismet.Config(key="benchmark-key", url="http://example.com/")
+
+    def __init__(self):
+        self.server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), StubAkismetHandler
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self) -> akismet.SyncClient:
+        """
+        Return a synchronous Akismet client which talks to the stub server.
+
+        """
+        http_client = httpx.Client(
+            transport=StubTransport(self.server.server_address[1]),
+            headers={"User-Agent": akismet.USER_AGENT},
+        )
+        return akismet.SyncClient(config=self.config, http_client=http_client)
@@ -0,0 +1,50 @@
+"""
+URLConf for benchmark runs.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.urls import path
+from django.views.generic import TemplateView
+
+from django_contact_form.forms import AkismetContactForm
+from django_contact_form.views import ContactFormView
+
+
+class BenchmarkAkismetForm(AkismetContactForm):
+    """
+    Akismet contact form which checks submissions with the stub Akismet server.
+
+    """
+
+    akismet_client = None
+
+    def get_akismet_client(self):
+        """
+        Return the client set up by the benchmark runner.
+
+        """
+        return self.akismet_client
+
+
+urlpatterns = [
+    path("", ContactFormView.as_view(), name="django_contact_form"),
+    path(
+        "akismet/",
+        ContactFormView.as_view(form_class=BenchmarkAkismetForm),
+        name="benchmark_akismet",
+    ),
+    path(
+        "cached/",
+        ContactFormView.as_view(page_cache_alias="default"),
+        name="benchmark_cached",
+    ),
+    path(
+        "sent/",
+        TemplateView.as_view(
+            template_name="django_contact_form/contact_form_sent.html"
+        ),
+        name="django_contact_form_sent",
+    ),
+]
@@ -103,6 +103,29 @@ def tests_with_coverage(session: nox.Session, django: str) -> None:
     clean()
 
 
+# Benchmarks.
+# -----------------------------------------------------------------------------------
+
+
+@nox.session(python=["3.12"], tags=["benchmarks"])
+def benchmarks(session: nox.Session) -> None:
+    """
+    Run the package's benchmarks, writing the results as JSON. Pass arguments for the
+    benchmark runner after ``--``; for example, ``nox -s benchmarks -- --output
+    results.json``.
+
+    """
+    session.install(".[akismet]")
+    session.run(
+        f"{session.bin}/python{session.python}",
+        "-m",
+        "benchmarks",
+        *session.posargs,
+        env={"DJANGO_SETTINGS_MODULE": "benchmarks.settings"},
+    )
+    clean()
+
+
 # Tasks which test the package's documentation.
 # -----------------------------------------------------------------------------------
 
@@ -145,6 +168,7 @@ def docs_docstrings(session: nox.Session) -> None:
         "-Im",
         "interrogate",
         "-v",
+        "benchmarks/",
         "src/",
         "tests/",
         "noxfile.py",
@@ -201,6 +225,7 @@ def format_black(session: nox.Session) -> None:
         "black",
         "--check",
         "--diff",
+        "benchmarks/",
         "src/",
         "tests/",
         "docs/",
@@ -223,6 +248,7 @@ def format_isort(session: nox.Session) -> None:
         "isort",
         "--check-only",
         "--diff",
+        "benchmarks/",
         "src/",
         "tests/",
         "docs/",
@@ -268,6 +294,7 @@ def lint_flake8(session: nox.Session) -> None:
         f"{session.bin}/python{session.python}",
         "-Im",
         "flake8",
+        "benchmarks/",
         "src/",
         "tests/",
         "docs/",
@@ -5,20 +5,66 @@ Helper code for obtaining an Akismet API client.
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import asyncio
+import concurrent.futures
+import hashlib
+import os
 import textwrap
+import threading
 import warnings
+import weakref
 
 import akismet
+import httpx
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ImproperlyConfigured
 
-_akismet_client = None  # pylint: disable=invalid-name
+# Registry of Akismet API client instances, keyed by (client class, API key, site
+# URL), so that sync and async clients, and clients for different sites, can coexist
+# in the same process.
+_akismet_clients = {}  # pylint: disable=invalid-name
 
+# Registries of async Akismet API client instances, one per event loop: an async
+# client's connection pool belongs to the loop it was first used in, and Django runs
+# async code called from synchronous code in a new loop each time. Each registry
+# disappears along with its loop.
+_async_akismet_clients = weakref.WeakKeyDictionary()  # pylint: disable=invalid-name
 
-def _client_from_settings(client_class):
+# Per-registry-key locks serializing client creation, and the lock guarding both
+# dictionaries.
+_registry_locks = {}  # pylint: disable=invalid-name
+_registry_lock = threading.Lock()
+
+# Exceptions which indicate that a spam check failed because of a problem talking to
+# Akismet, rather than a problem with the configuration or the calling code.
+_CHECK_FAILURES = (
+    akismet.RequestError,
+    akismet.ProtocolError,
+    asyncio.TimeoutError,
+    concurrent.futures.TimeoutError,
+)
+
+# Thread pool used to enforce deadlines on synchronous spam checks, and the lock
+# guarding its creation.
+_deadline_executor = None  # pylint: disable=invalid-name
+_deadline_executor_lock = threading.Lock()
+
+_INVALID_SETTINGS_MESSAGE = (
+    "The Akismet configuration specified in your Django settings is invalid."
+)
+_INVALID_ENVIRONMENT_MESSAGE = (
+    "The Akismet configuration specified in your environment variables is "
+    "missing or invalid."
+)
+_INVALID_CONFIG_MESSAGE = "The Akismet configuration for this site is invalid."
+
+
+def _config_from_settings():
     """
-    Attempt to obtain an Akismet client from legacy configuration in Django
-    settings.
+    Return an Akismet configuration from legacy configuration in Django settings, or
+    :data:`None` if those settings are not present.
 
     """
     key = getattr(settings, "AKISMET_API_KEY", None)  # noqa: B009
@@ -42,55 +88,330 @@ def _client_from_settings(client_class):
         DeprecationWarning,
         stacklevel=2,
     )
-    client = client_class(config=akismet.Config(key, url))
-    if client.verify_key(key, url):
-        return client
-    raise ImproperlyConfigured(
-        "The Akismet configuration specified in your Django settings is invalid."
-    )
+    return akismet.Config(key, url)
 
 
-def _client_from_environment(client_class):
+def _config_from_environment():
     """
-    Attempt to obtain an Akismet client from configuration in environment variables.
+    Return an Akismet configuration from the environment variables read by the Akismet
+    client, or :data:`None` if they are not present.
+
+    :raises django.core.exceptions.ImproperlyConfigured: When the site URL is not a
+       full ``http://`` or ``https://`` URL.
 
     """
-    try:
-        return client_class.validated_client()
-    except akismet.ConfigurationError as exc:
-        raise ImproperlyConfigured(
-            "The Akismet configuration specified in your environment variables is "
-            "missing or invalid."
-        ) from exc
+    key = os.environ.get("PYTHON_AKISMET_API_KEY")
+    url = os.environ.get("PYTHON_AKISMET_BLOG_URL")
+    if not all([key, url]):
+        return None
+    if not url.startswith(("http://", "https://")):
+        raise ImproperlyConfigured(_INVALID_ENVIRONMENT_MESSAGE)
+    return akismet.Config(key, url)
+
+
+def _default_config():
+    """
+    Return the default Akismet configuration, from legacy configuration in Django
+    settings or else from environment variables, along with the error message to use
+    if it turns out to be invalid.
+
+    :raises django.core.exceptions.ImproperlyConfigured: When there is no Akismet
+       configuration.
+
+    """
+    config = _config_from_settings()
+    if config is not None:
+        return config, _INVALID_SETTINGS_MESSAGE
+    config = _config_from_environment()
+    if config is not None:
+        return config, _INVALID_ENVIRONMENT_MESSAGE
+    raise ImproperlyConfigured(_INVALID_ENVIRONMENT_MESSAGE)
+
+
+def _registry_key(client_class, config, timeout=None):
+    """
+    Return the configuration to use for a client, along with its key in the client
+    registry and the error message to use if the configuration is invalid.
+
+    """
+    if config is None:
+        config, message = _default_config()
+    else:
+        message = _INVALID_CONFIG_MESSAGE
+    return config, (client_class, config.key, config.url, timeout), message
+
+
+def _verification_cache_key(config):
+    """
+    Return the cache key under which to record that a configuration is valid.
+
+    """
+    digest = hashlib.sha256(f"{config.key}\n{config.url}".encode()).hexdigest()
+    return f"django_contact_form:akismet-verified:{digest}"
+
+
+def _record_verified(config, cache_alias, timeout):
+    """
+    Record in the given cache that a configuration is valid, for ``timeout`` seconds.
+
+    """
+    caches[cache_alias].set(_verification_cache_key(config), True, timeout)
+
+
+def _verify(client, config, cache_alias=None, timeout=None):
+    """
+    Return whether a configuration is valid, consulting (and, after verifying with
+    Akismet, updating) the given cache if any.
+
+    """
+    if cache_alias is not None and caches[cache_alias].get(
+        _verification_cache_key(config)
+    ):
+        return True
+    if not client.verify_key(config.key, config.url):
+        return False
+    if cache_alias is not None:
+        _record_verified(config, cache_alias, timeout)
+    return True
 
 
-def _try_get_akismet_client(  # pylint: disable=inconsistent-return-statements
+async def _averify(client, config, cache_alias=None, timeout=None):
+    """
+    Async version of :func:`_verify`.
+
+    """
+    key = _verification_cache_key(config)
+    if cache_alias is not None and await caches[cache_alias].aget(key):
+        return True
+    if not await client.verify_key(config.key, config.url):
+        return False
+    if cache_alias is not None:
+        await caches[cache_alias].aset(key, True, timeout)
+    return True
+
+
+def _lock_for(key):
+    """
+    Return the lock serializing creation of the client with the given registry key.
+
+    """
+    with _registry_lock:
+        return _registry_locks.setdefault(key, threading.Lock())
+
+
+def _try_get_akismet_client(
     client_class=akismet.SyncClient,
+    config=None,
+    verification_cache=None,
+    verification_timeout=None,
+    timeout=None,
 ):
     """
-    Attempt to obtain and return an instance of the given Akismet API client class..
+    Obtain and return an instance of the given Akismet API client class for the given
+    configuration (by default, the configuration in Django settings or environment
+    variables) and, if given, HTTP timeout in seconds (by default, the Akismet
+    client's own).
+
+    Each distinct client class, API key and site URL gets its own client, which is
+    created and verified the first time it is requested, and reused thereafter. Only
+    one thread at a time will create and verify any given client. If
+    ``verification_cache`` (a cache alias) is given, a successful verification is
+    recorded there for ``verification_timeout`` seconds, and not repeated by other
+    processes meanwhile.
 
     :raises django.core.exceptions.ImproperlyConfigured: When the Akismet client
        configuration is missing or invalid.
 
     """
-    global _akismet_client  # pylint: disable=global-statement
+    config, key, message = _registry_key(client_class, config, timeout)
+    client = _akismet_clients.get(key)
+    if client is None:
+        with _lock_for(key):
+            client = _akismet_clients.get(key)
+            if client is None:
+                client = client_class(
+                    config=config,
+                    http_client=(
+                        None
+                        if timeout is None
+                        else httpx.Client(
+                            headers={"User-Agent": akismet.USER_AGENT},
+                            timeout=timeout,
+                        )
+                    ),
+                )
+                if not _verify(
+                    client, config, verification_cache, verification_timeout
+                ):
+                    raise ImproperlyConfigured(message)
+                _akismet_clients[key] = client
+    return client
 
-    if _akismet_client is None:
-        for attempt in [
-            _client_from_settings,
-            _client_from_environment,
-        ]:
-            _akismet_client = attempt(client_class)
-            if _akismet_client is not None:
-                return _akismet_client
+
+async def _atry_get_akismet_client(
+    client_class=akismet.AsyncClient,
+    config=None,
+    verification_cache=None,
+    verification_timeout=None,
+):
+    """
+    Obtain and return an instance of the given async Akismet API client class for the
+    given configuration, as :func:`_try_get_akismet_client` does, except that clients
+    are kept per event loop.
+
+    Concurrent first requests for the same client may each create and verify one, but
+    only the first to finish is kept.
+
+    :raises django.core.exceptions.ImproperlyConfigured: When the Akismet client
+       configuration is missing or invalid.
+
+    """
+    config, key, message = _registry_key(client_class, config)
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients = _async_akismet_clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        client = client_class(config=config)
+        if not await _averify(client, config, verification_cache, verification_timeout):
+            raise ImproperlyConfigured(message)
+        with _registry_lock:
+            client = clients.setdefault(key, client)
+    return client
 
 
 def _clear_cached_instance():
     """
-    Clear the cached Akismet API client instance, so that it will be re-created the
-    next time it is requested.
+    Clear the cached Akismet API client instances, so that they will be re-created
+    the next time they are requested.
+
+    """
+    with _registry_lock:
+        _akismet_clients.clear()
+        _async_akismet_clients.clear()
+        _registry_locks.clear()
+
+
+def _comment_check(akismet_client, arguments, timeout=None):
+    """
+    Perform a spam check with a synchronous Akismet client, giving up with
+    :exc:`concurrent.futures.TimeoutError` after ``timeout`` seconds, if given.
+
+    A check which has already started can't be interrupted, so the client's own HTTP
+    timeout (see :func:`_try_get_akismet_client`) should also be set, to bound how
+    long an abandoned check keeps its thread busy.
+
+    """
+    global _deadline_executor  # pylint: disable=global-statement
+
+    if timeout is None:
+        return akismet_client.comment_check(**arguments)
+    with _deadline_executor_lock:
+        if _deadline_executor is None:
+            _deadline_executor = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="django-contact-form-akismet"
+            )
+    future = _deadline_executor.submit(akismet_client.comment_check, **arguments)
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        # Don't start a check nobody is waiting for any more.
+        future.cancel()
+        raise
+
+
+async def _acomment_check(akismet_client, arguments, timeout=None):
+    """
+    Perform a spam check with an async Akismet client, giving up with
+    :exc:`asyncio.TimeoutError` after ``timeout`` seconds, if given.
 
     """
-    global _akismet_client  # pylint: disable=global-statement
-    _akismet_client = None
+    return await asyncio.wait_for(
+        akismet_client.comment_check(**arguments), timeout=timeout
+    )
+
+
+def _batch_client(http_client, config=None):
+    """
+    Return an async Akismet client, using the given configuration (a 2-tuple of API
+    key and site URL; by default, the default configuration) and HTTP client, for
+    classifying queued submissions.
+
+    The client is not verified: a bad configuration causes each spam check to fail,
+    leaving the submissions queued.
+
+    :raises django.core.exceptions.ImproperlyConfigured: When no configuration is
+       given, and there is no default configuration.
+
+    """
+    config = _default_config()[0] if config is None else akismet.Config(*config)
+    return akismet.AsyncClient(config=config, http_client=http_client)
+
+
+async def _aclassify_batch(arguments_list, configs, concurrency, retries, backoff):
+    """
+    Async implementation of :func:`_classify_batch`.
+
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    clients = {}
+
+    def client_for(http_client, config):
+        """
+        Return the client for a configuration, or the exception raised when the
+        configuration is missing.
+
+        """
+        if config not in clients:
+            try:
+                clients[config] = _batch_client(http_client, config)
+            except ImproperlyConfigured as exc:
+                clients[config] = exc
+        return clients[config]
+
+    async def classify(client, arguments):
+        """
+        Check one submission, retrying failures with exponential backoff.
+
+        """
+        if isinstance(client, Exception):
+            return client
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    return bool(await client.comment_check(**arguments))
+                except _CHECK_FAILURES as exc:
+                    if attempt == retries:
+                        return exc
+                await asyncio.sleep(backoff * 2**attempt)
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": akismet.USER_AGENT},
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as http_client:
+        return await asyncio.gather(
+            *(
+                classify(client_for(http_client, config), arguments)
+                for arguments, config in zip(arguments_list, configs)
+            )
+        )
+
+
+def _classify_batch(arguments_list, configs, concurrency=10, retries=2, backoff=0.5):
+    """
+    Check many submissions with Akismet concurrently, over one pool of HTTP
+    connections, and return a list of their verdicts -- or, for submissions which could
+    not be checked, the exception raised by the final attempt.
+
+    Each submission is checked with the corresponding entry of ``configs``: a 2-tuple
+    of API key and site URL, or :data:`None` to use the default configuration. A
+    missing default configuration fails only the submissions which need it.
+
+    At most ``concurrency`` checks are in progress at once. A failed check is retried
+    up to ``retries`` times, after waiting ``backoff`` seconds, doubled after each
+    retry.
+
+    """
+    return async_to_sync(_aclassify_batch)(
+        arguments_list, configs, concurrency, retries, backoff
+    )
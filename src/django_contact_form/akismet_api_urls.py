@@ -0,0 +1,23 @@
+"""
+Example URLConf for a JSON contact-form endpoint with Akismet spam filtering.
+
+If all you want is the basic contact-form plus spam filtering, accepting JSON
+submissions, include this URLConf somewhere in your URL hierarchy (for example, at
+``/api/contact/``).
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.urls import path
+
+from .forms import AkismetContactForm
+from .views import ContactFormAPIView
+
+urlpatterns = [
+    path(
+        "",
+        ContactFormAPIView.as_view(form_class=AkismetContactForm),
+        name="django_contact_form_api",
+    ),
+]
@@ -10,10 +10,9 @@ include this URLConf somewhere in your URL hierarchy (for example, at
 # SPDX-License-Identifier: BSD-3-Clause
 
 from django.urls import path
-from django.views.generic import TemplateView
 
 from .forms import AkismetContactForm
-from .views import ContactFormView
+from .views import ContactFormSentView, ContactFormView
 
 urlpatterns = [
     path(
@@ -23,9 +22,7 @@ urlpatterns = [
     ),
     path(
         "sent/",
-        TemplateView.as_view(
-            template_name="django_contact_form/contact_form_sent.html"
-        ),
+        ContactFormSentView.as_view(),
         name="django_contact_form_sent",
     ),
 ]
@@ -0,0 +1,18 @@
+"""
+Example URLConf for a JSON contact-form endpoint.
+
+If all you want is the basic ContactForm with default behavior, accepting JSON
+submissions (for example, from a JavaScript front end or a mobile app), include this
+URLConf somewhere in your URL hierarchy (for example, at ``/api/contact/``).
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.urls import path
+
+from django_contact_form.views import ContactFormAPIView
+
+urlpatterns = [
+    path("", ContactFormAPIView.as_view(), name="django_contact_form_api"),
+]
@@ -0,0 +1,45 @@
+"""
+Application configuration for django-contact-form.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.apps import AppConfig
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.utils.autoreload import file_changed
+from django.utils.translation import gettext_lazy as _
+
+
+class DjangoContactFormConfig(AppConfig):
+    """
+    Application configuration for django-contact-form.
+
+    """
+
+    default_auto_field = "django.db.models.AutoField"
+    name = "django_contact_form"
+    verbose_name = _("Contact form")
+
+    def ready(self):
+        """
+        Pre-compile the message templates, and arrange for the compiled-template cache
+        to be cleared when templates may have changed, and for the routing tables to
+        be reloaded when routes change.
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from . import routing
+        from .forms import prewarm_templates
+        from .models import Route
+        from .renderers import clear_template_cache
+
+        setting_changed.connect(clear_template_cache)
+        file_changed.connect(clear_template_cache)
+        setting_changed.connect(
+            routing._settings_changed  # pylint: disable=protected-access
+        )
+        post_save.connect(routing.database_routes.reload, sender=Route)
+        post_delete.connect(routing.database_routes.reload, sender=Route)
+        prewarm_templates()
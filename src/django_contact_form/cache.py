@@ -0,0 +1,84 @@
+"""
+A small in-process cache, for use where a shared Django cache is not required.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import collections
+import threading
+import time
+
+
+class LRUCache:
+    """
+    A thread-safe, in-process cache of at most ``max_entries`` entries, each of which
+    expires after its timeout. When full, the least-recently-used entry is evicted.
+
+    This implements the subset of the Django cache API -- ``get()``, ``add()`` and
+    ``delete()`` -- used by ``django-contact-form``, so it can be used wherever a
+    Django cache would be.
+
+    :param max_entries: The maximum number of entries to keep.
+
+    .. automethod:: get
+
+    .. automethod:: add
+
+    .. automethod:: delete
+
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key, now: float) -> bool:
+        """
+        Return whether the key has an unexpired entry, discarding it if expired. The
+        lock must be held.
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[1] <= now:
+            del self._entries[key]
+            return False
+        return True
+
+    def get(self, key, default=None):
+        """
+        Return the value for the key, or ``default`` if there is none or it has
+        expired.
+
+        """
+        with self._lock:
+            if not self._live(key, time.monotonic()):
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def add(self, key, value, timeout: float) -> bool:
+        """
+        Set the key to the value for ``timeout`` seconds, unless it already has an
+        unexpired value, and return whether it was set.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._live(key, now):
+                return False
+            self._entries[key] = (value, now + timeout)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete(self, key) -> None:
+        """
+        Remove the key's entry, if any.
+
+        """
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,319 @@
+"""
+Backends for delivering contact-form messages outside the request/response cycle.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import json
+import logging
+import queue
+import threading
+
+from django.core.mail import get_connection, send_mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .mail import ConnectionPool, build_message
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_message_dict(message_dict: dict) -> dict:
+    """
+    Return a copy of ``message_dict`` (as returned from
+    :meth:`~django_contact_form.forms.ContactForm.get_message_dict`) containing only
+    JSON-compatible values, so that it can be stored and sent later.
+
+    Lazy translation strings are converted to :class:`str`, and tuples (for example, a
+    :attr:`~django_contact_form.forms.ContactForm.recipient_list` given as a tuple) to
+    :class:`list`.
+
+    """
+    return json.loads(json.dumps(message_dict, cls=DjangoJSONEncoder))
+
+
+class BaseDeliveryBackend:  # pylint: disable=too-few-public-methods
+    """
+    Base class for delivery backends. Subclasses must implement :meth:`enqueue`.
+
+    .. automethod:: enqueue
+
+    """
+
+    def enqueue(
+        self, message_dict: dict, fail_silently: bool = False, submission=None
+    ) -> None:
+        """
+        Accept a message for later delivery. ``message_dict`` is the return value of
+        :meth:`~django_contact_form.forms.ContactForm.get_message_dict`, suitable for
+        passing as keyword arguments to :func:`~django.core.mail.send_mail`.
+
+        ``submission`` is the stored :class:`~django_contact_form.models.Submission`
+        of the message (if the form's
+        :attr:`~django_contact_form.forms.ContactForm.store_submissions` is set), or
+        :data:`None`. Backends should record the outcome of delivering the message in
+        its ``status``.
+
+        """
+        raise NotImplementedError
+
+
+def _set_submission_status(submission_pk, status) -> None:
+    """
+    Record the outcome of delivering a message on its stored submission, if any.
+
+    """
+    if submission_pk is None:
+        return
+    from .models import Submission  # pylint: disable=import-outside-toplevel
+
+    Submission.objects.filter(pk=submission_pk).update(status=status)
+
+
+class ThreadDeliveryBackend(BaseDeliveryBackend):
+    """
+    Delivery backend which sends messages from a background thread in the current
+    process.
+
+    A single worker thread is shared by all instances of this class, and is started the
+    first time a message is enqueued. The worker reuses mail-server connections between
+    messages, via a :class:`~django_contact_form.mail.ConnectionPool`. Messages which
+    are still queued when the process exits will be lost; if that is unacceptable, use
+    :class:`DatabaseDeliveryBackend`.
+
+    Failures to send are logged (to the logger ``django_contact_form.delivery``)
+    unless ``fail_silently`` was passed, and the status of each message's stored
+    submission, if any, is updated once it has been sent or has failed.
+
+    .. automethod:: join
+
+    """
+
+    _lock = threading.Lock()
+    _pool = ConnectionPool()
+    _queue = queue.Queue()
+    _worker = None
+
+    def enqueue(
+        self, message_dict: dict, fail_silently: bool = False, submission=None
+    ) -> None:
+        """
+        Add a message to the in-process queue.
+
+        """
+        self._ensure_worker()
+        self._queue.put(
+            (
+                serialize_message_dict(message_dict),
+                fail_silently,
+                submission.pk if submission is not None else None,
+            )
+        )
+
+    def join(self) -> None:
+        """
+        Block until all currently-queued messages have been processed.
+
+        """
+        self._queue.join()
+
+    @classmethod
+    def _ensure_worker(cls) -> None:
+        """
+        Start the worker thread, if it isn't already running.
+
+        """
+        with cls._lock:
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(
+                    target=cls._run, name="django-contact-form-delivery", daemon=True
+                )
+                cls._worker.start()
+
+    @classmethod
+    def _run(cls) -> None:
+        """
+        Worker loop: send each queued message in turn.
+
+        """
+        from .models import Submission  # pylint: disable=import-outside-toplevel
+
+        while True:
+            message_dict, fail_silently, submission_pk = cls._queue.get()
+            status = Submission.Status.FAILED
+            try:
+                if cls._pool.send_messages(
+                    [build_message(**message_dict)], fail_silently=fail_silently
+                ):
+                    status = Submission.Status.SENT
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to send contact-form message.")
+            try:
+                _set_submission_status(submission_pk, status)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to record contact-form message status.")
+            finally:
+                cls._queue.task_done()
+
+
+class DatabaseDeliveryBackend(  # pylint: disable=too-few-public-methods
+    BaseDeliveryBackend
+):
+    """
+    Delivery backend which stores messages in the database, as instances of
+    :class:`~django_contact_form.models.QueuedMessage`, to be sent later by the
+    ``drain_contact_form_queue`` management command (or by calling
+    :func:`drain_queue`).
+
+    """
+
+    def enqueue(
+        self, message_dict: dict, fail_silently: bool = False, submission=None
+    ) -> None:
+        """
+        Store a message in the database queue, linked to its stored submission.
+
+        """
+        from .models import QueuedMessage  # pylint: disable=import-outside-toplevel
+
+        QueuedMessage.objects.create(
+            message=serialize_message_dict(message_dict), submission=submission
+        )
+
+
+def drain_queue(
+    batch_size: int = 100,
+    max_attempts: int = 5,
+    concurrency: int = 10,
+    retries: int = 2,
+    backoff: float = 0.5,
+) -> tuple:
+    """
+    Send all messages currently stored in the database queue, in batches of
+    ``batch_size`` messages which each share one mail-server connection, and return a
+    3-tuple of the number of messages sent, the number which failed, and the number
+    discarded as spam.
+
+    Messages which were queued without a spam check (see
+    :attr:`~django_contact_form.forms.AkismetContactForm.akismet_deferred` and
+    :attr:`~django_contact_form.forms.AkismetContactForm.akismet_failure_policy`) are
+    checked with Akismet first, using the Akismet configuration stored with them, and
+    discarded if they are spam. The messages in each
+    batch are checked concurrently, with up to ``concurrency`` checks in progress at
+    once; a failed check is retried up to ``retries`` times, waiting ``backoff``
+    seconds (doubled after each retry) in between.
+
+    Messages which are sent or discarded are removed from the queue. Messages which
+    fail to send (or to be checked) remain queued and will be retried on later runs,
+    until they have failed ``max_attempts`` times.
+
+    The spam verdict and status of each message's stored
+    :class:`~django_contact_form.models.Submission`, if any, are updated to match.
+
+    """
+    from .models import QueuedMessage  # pylint: disable=import-outside-toplevel
+
+    sent = failed = discarded = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                QueuedMessage.objects.select_for_update(skip_locked=True)
+                .filter(pk__gt=last_pk, attempts__lt=max_attempts)
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                return sent, failed, discarded
+            last_pk = batch[-1].pk
+            delivered, spam, batch_failed = _send_batch(
+                batch, _classify(batch, concurrency, retries, backoff)
+            )
+            _update_submissions(batch, delivered, spam, max_attempts)
+            QueuedMessage.objects.filter(pk__in=delivered + spam).delete()
+            sent += len(delivered)
+            failed += batch_failed
+            discarded += len(spam)
+
+
+def _send_batch(batch, verdicts) -> tuple:
+    """
+    Send a batch of queued messages over one mail-server connection, skipping those
+    with a spam verdict, and return a 3-tuple of the primary keys of the messages
+    sent, the primary keys of those which are spam, and the number which failed.
+
+    """
+    delivered = []
+    spam = []
+    failed = 0
+    with get_connection() as connection:
+        for queued in batch:
+            verdict = verdicts.get(queued.pk, False)
+            try:
+                if isinstance(verdict, Exception):
+                    raise verdict
+                if verdict:
+                    spam.append(queued.pk)
+                    continue
+                send_mail(connection=connection, **queued.message)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                queued.attempts += 1
+                queued.last_error = str(exc)
+                queued.save(update_fields=["attempts", "last_error"])
+                failed += 1
+            else:
+                delivered.append(queued.pk)
+    return delivered, spam, failed
+
+
+def _update_submissions(batch, delivered, spam, max_attempts) -> None:
+    """
+    Record the outcome of processing a batch of queued messages on their stored
+    submissions.
+
+    """
+    from .models import Submission  # pylint: disable=import-outside-toplevel
+
+    outcomes = {}
+    for queued in batch:
+        if queued.submission_id is None:
+            continue
+        if queued.pk in spam:
+            outcome = {"is_spam": True, "status": Submission.Status.SPAM}
+        elif queued.pk in delivered:
+            outcome = {"status": Submission.Status.SENT}
+            if queued.akismet_arguments is not None:
+                outcome["is_spam"] = False
+        elif queued.attempts >= max_attempts:
+            outcome = {"status": Submission.Status.FAILED}
+        else:
+            continue
+        outcomes.setdefault(tuple(sorted(outcome.items())), []).append(
+            queued.submission_id
+        )
+    for outcome, pks in outcomes.items():
+        Submission.objects.filter(pk__in=pks).update(**dict(outcome))
+
+
+def _classify(batch, concurrency, retries, backoff) -> dict:
+    """
+    Check the queued messages in a batch which are awaiting a spam check, and return a
+    dictionary mapping their primary keys to their verdicts.
+
+    """
+    pending = [queued for queued in batch if queued.akismet_arguments is not None]
+    if not pending:
+        return {}
+    from ._akismet import _classify_batch  # pylint: disable=import-outside-toplevel
+
+    verdicts = _classify_batch(
+        [queued.akismet_arguments for queued in pending],
+        configs=[
+            (queued.akismet_key, queued.akismet_url) if queued.akismet_key else None
+            for queued in pending
+        ],
+        concurrency=concurrency,
+        retries=retries,
+        backoff=backoff,
+    )
+    return {queued.pk: verdict for queued, verdict in zip(pending, verdicts)}
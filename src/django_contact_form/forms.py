@@ -5,14 +5,100 @@ interface.
 """
 
 # SPDX-License-Identifier: BSD-3-Clause
+# pylint: disable=too-many-lines
 
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
 from django import forms
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
-from django.template import loader
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import UploadedFile
+from django.core.mail import get_connection, send_mail
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.defaultfilters import filesizeformat
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
+from .cache import LRUCache
+from .instrumentation import timed
+from .mail import DeliveryError, build_message, send_individually
+from .renderers import TemplateRenderer, _get_template
+from .spam import CircuitOpenError, run_checks
+
+# Recently-saved submissions, for duplicate detection when no Django cache is
+# configured.
+_recent_submissions = LRUCache()
+
+# The renderer used by forms which don't set their own message_renderer.
+_default_renderer = TemplateRenderer()
+
+
+def prewarm_templates():
+    """
+    Load and compile the subject and body templates of :class:`ContactForm` and every
+    currently-defined subclass of it, so that the first message sent doesn't pay the
+    cost of loading them.
+
+    This is called automatically at startup. Templates whose names are supplied by a
+    method rather than an attribute are skipped, as are templates which can't be
+    loaded, and the templates of form classes whose
+    :attr:`~ContactForm.message_renderer` doesn't use the Django template engine.
+
+    """
+    form_classes = [ContactForm]
+    while form_classes:
+        form_class = form_classes.pop()
+        form_classes.extend(form_class.__subclasses__())
+        if not isinstance(
+            form_class.message_renderer or _default_renderer, TemplateRenderer
+        ):
+            continue
+        for template_name in (
+            form_class.template_name,
+            form_class.subject_template_name,
+        ):
+            if callable(template_name):
+                continue
+            try:
+                _get_template(template_name)
+            except (TemplateDoesNotExist, TemplateSyntaxError):
+                continue
+
+
+def _content_hash_default(value):
+    """
+    Return a JSON-serializable stand-in for a value in a form's cleaned data, for
+    :meth:`ContactForm.get_content_hash`. Uploaded files are represented by their size
+    and a digest of their contents, rather than just their names.
+
+    """
+    if isinstance(value, UploadedFile):
+        digest = hashlib.sha256()
+        for chunk in value.chunks():
+            digest.update(chunk)
+        return f"{value.size}:{digest.hexdigest()}"
+    return str(value)
+
+
+class _SettingDefault:  # pylint: disable=too-few-public-methods
+    """
+    A class attribute whose default value is computed from Django settings each time
+    it is read, rather than when the class is defined, so that importing this module
+    doesn't require settings to be configured, and later changes to settings take
+    effect. Subclasses and instances can still override it as usual.
+
+    """
+
+    def __init__(self, compute):
+        self.compute = compute
+
+    def __get__(self, instance, owner=None):
+        return self.compute()
+
 
 class ContactForm(forms.Form):
     """
@@ -42,6 +128,9 @@ class ContactForm(forms.Form):
     are handled normally, through the :meth:`~django.forms.Form.is_valid` method and the
     :attr:`~django.forms.Form.cleaned_data` dictionary.
 
+    If you're working in async code, use :meth:`ais_valid` and :meth:`asave` in place
+    of :meth:`~django.forms.Form.is_valid` and :meth:`save`.
+
     Under the hood, this form uses a somewhat abstracted interface in order to make it
     easier to subclass and add functionality.
 
@@ -56,13 +145,13 @@ class ContactForm(forms.Form):
     .. attribute:: from_email
 
        The email address (:class:`str`) to use in the ``From:`` header of the
-       message. By default, this is the value of the Django setting
+       message. By default, this is the current value of the Django setting
        :setting:`DEFAULT_FROM_EMAIL`.
 
     .. attribute:: recipient_list
 
        A :class:`list` of recipients for the message. By default, this is the email
-       addresses specified in the setting :setting:`MANAGERS`.
+       addresses currently specified in the setting :setting:`MANAGERS`.
 
     .. attribute:: subject_template_name
 
@@ -75,6 +164,95 @@ class ContactForm(forms.Form):
        A :class:`str`, the name of the template to use when rendering the body of the
        message. By default, this is ``"django_contact_form/contact_form.txt"``.
 
+    .. attribute:: message_renderer
+
+       The renderer (see :ref:`the renderer documentation <renderers>`) with which
+       to render :attr:`subject_template_name` and :attr:`template_name`. Set this
+       to a :class:`~django_contact_form.renderers.TemplateRenderer` which skips
+       context processors, or to a
+       :class:`~django_contact_form.renderers.FormatRenderer`, to make rendering
+       cheaper. By default, this is :data:`None`, and the templates are rendered by
+       the Django template engine with the current request, running every context
+       processor in the :setting:`TEMPLATES` setting.
+
+    .. attribute:: delivery_backend
+
+       A delivery backend instance (see :ref:`the delivery documentation
+       <delivery>`) which :meth:`save` will hand the message to, instead of sending
+       it immediately. By default, this is :data:`None`, and the message is sent
+       immediately.
+
+    .. attribute:: routing_table
+
+       A :class:`~django_contact_form.routing.RoutingTable` from which to look up the
+       recipients of each message, by the value of the form's :attr:`topic_field`
+       field, the domain of the current site, and the active language; see
+       :ref:`the routing documentation <routing>`. If no route matches, or a
+       ``recipient_list`` was passed to the form, :attr:`recipient_list` is used. By
+       default, this is :data:`None`, and :attr:`recipient_list` is always used.
+
+    .. attribute:: topic_field
+
+       The name of the field whose value is the topic used by :attr:`routing_table`.
+       By default, this is ``"topic"``; forms without such a field are routed by site
+       and language alone.
+
+    .. attribute:: store_submissions
+
+       Whether :meth:`save` should also store a record of each submission in the
+       database, as a :class:`~django_contact_form.models.Submission`, before
+       delivering the message, and update its status afterwards. Submissions which
+       :class:`AkismetContactForm` rejects as spam are stored too. The stored
+       submission is then available as the form's ``submission`` attribute (which is
+       otherwise :data:`None`). By default, this is :data:`False`.
+
+    .. attribute:: duplicate_window
+
+       If set, a number of seconds within which a repeated identical submission (for
+       example, from a double-clicked submit button, or a bot replaying a request) is
+       acknowledged, but not sent (or spam-checked, by :class:`AkismetContactForm`)
+       again; see :meth:`is_duplicate`. By default, this is :data:`None`, and every
+       submission is sent.
+
+    .. attribute:: duplicate_cache_alias
+
+       The alias of the Django cache in which to record recent submissions for
+       :attr:`duplicate_window`. By default, this is :data:`None`, and they are
+       recorded in a per-process :class:`~django_contact_form.cache.LRUCache`, which
+       only detects duplicates handled by the same process.
+
+    .. attribute:: connection_pool
+
+       A :class:`~django_contact_form.mail.ConnectionPool` from which to obtain the
+       mail-server connection used to send the message, so that connections are
+       reused across submissions. By default, this is :data:`None`, and each message
+       is sent over a new connection.
+
+    .. attribute:: fan_out
+
+       Whether to send a separate copy of the message to each recipient, so that no
+       recipient sees the others' addresses and one rejected recipient doesn't
+       prevent delivery to the rest (see
+       :func:`~django_contact_form.mail.send_individually`). The copies are sent
+       concurrently, by up to :attr:`fan_out_workers` threads, and each is retried
+       up to :attr:`fan_out_retries` times. Afterwards, the form's
+       :attr:`delivery_results` attribute maps each recipient to :data:`None`, or to
+       the exception which prevented sending their copy; unless ``fail_silently`` was
+       passed, :meth:`save` then raises
+       :exc:`~django_contact_form.mail.DeliveryError` if any copy wasn't sent. By
+       default, this is :data:`False`, and one message is sent to all the
+       recipients. This has no effect when :attr:`delivery_backend` is set.
+
+    .. attribute:: fan_out_workers
+
+       The maximum number of copies of the message to send at once, when
+       :attr:`fan_out` is set. By default, this is ``10``.
+
+    .. attribute:: fan_out_retries
+
+       The number of times to retry sending a copy of the message, when
+       :attr:`fan_out` is set. By default, this is ``2``.
+
     And two methods are involved in producing the contents of the message to send:
 
     .. automethod:: message
@@ -105,6 +283,14 @@ class ContactForm(forms.Form):
 
     .. automethod:: save
 
+    .. automethod:: ais_valid
+
+    .. automethod:: asave
+
+    .. automethod:: get_content_hash
+
+    .. automethod:: is_duplicate
+
     Note that subclasses which override ``__init__`` or :meth:`save` need to accept
     ``*args`` and ``**kwargs``, and pass them via :func:`super`, in order to preserve
     behavior (each of those methods accepts at least one additional argument, and this
@@ -116,14 +302,48 @@ class ContactForm(forms.Form):
     email = forms.EmailField(max_length=200, label=_("Your email address"))
     body = forms.CharField(widget=forms.Textarea, label=_("Your message"))
 
-    from_email = settings.DEFAULT_FROM_EMAIL
+    from_email = _SettingDefault(lambda: settings.DEFAULT_FROM_EMAIL)
 
-    recipient_list = [mail_tuple[1] for mail_tuple in settings.MANAGERS]
+    recipient_list = _SettingDefault(
+        lambda: [mail_tuple[1] for mail_tuple in settings.MANAGERS]
+    )
 
     subject_template_name = "django_contact_form/contact_form_subject.txt"
 
     template_name = "django_contact_form/contact_form.txt"
 
+    message_renderer = None
+
+    delivery_backend = None
+
+    connection_pool = None
+
+    fan_out = False
+
+    fan_out_workers = 10
+
+    fan_out_retries = 2
+
+    store_submissions = False
+
+    routing_table = None
+
+    topic_field = "topic"
+
+    duplicate_window = None
+
+    duplicate_cache_alias = None
+
+    # Per-recipient results of the most recent fan-out send.
+    delivery_results = None
+
+    # Per-instance caches used by get_message_context().
+    _message_context = None
+    _site = None
+
+    # The stored record of the most recent submission, if any.
+    submission = None
+
     def __init__(
         self, *args, data=None, files=None, request=None, recipient_list=None, **kwargs
     ):
@@ -134,10 +354,25 @@ class ContactForm(forms.Form):
             self.recipient_list = recipient_list
         super().__init__(data=data, files=files, *args, **kwargs)  # noqa: B026
 
+    def full_clean(self):
+        """
+        Validate the form, discarding any cached message context.
+
+        """
+        self._message_context = None
+        with timed("validation", self) as record:
+            super().full_clean()
+            record["outcome"] = "invalid" if self._errors else "valid"
+
     def message(self) -> str:
         """
         Return the body of the message to send. By default, this is accomplished by
-        rendering the template name specified in :attr:`template_name`.
+        rendering the template name specified in :attr:`template_name`, with
+        :attr:`message_renderer`.
+
+        Compiled templates are cached (in a cache shared by all form classes, holding
+        up to 128 templates), so the template loaders are only consulted the first
+        time a given template name is used.
 
         """
         template_name = (
@@ -145,15 +380,17 @@ class ContactForm(forms.Form):
             if callable(self.template_name)
             else self.template_name
         )
-        return loader.render_to_string(
-            template_name, self.get_message_context(), request=self.request
-        )
+        context = self.get_message_context()
+        with timed("render_message", self) as record:
+            message = self._render(template_name, context)
+            record["payload_size"] = len(message)
+        return message
 
     def subject(self) -> str:
         """
         Return the subject line of the message to send. By default, this is
         accomplished by rendering the template name specified in
-        :attr:`subject_template_name`.
+        :attr:`subject_template_name`, with :attr:`message_renderer`.
 
         .. warning:: **Subject must be a single line**
 
@@ -172,11 +409,19 @@ class ContactForm(forms.Form):
             if callable(self.subject_template_name)
             else self.subject_template_name
         )
-        subject = loader.render_to_string(
-            template_name, self.get_message_context(), request=self.request
-        )
+        context = self.get_message_context()
+        with timed("render_subject", self):
+            subject = self._render(template_name, context)
         return "".join(subject.splitlines())
 
+    def _render(self, template_name, context) -> str:
+        """
+        Render a template with :attr:`message_renderer`.
+
+        """
+        renderer = self.message_renderer or _default_renderer
+        return renderer.render(template_name, context, self.request)
+
     def get_message_context(self) -> dict:
         """
         Return the context used to render the templates for the email
@@ -193,10 +438,33 @@ class ContactForm(forms.Form):
           :class:`~django.contrib.sites.requests.RequestSite` object generated from the
           request.
 
+        The context is computed once per form instance (and recomputed only if the
+        form is re-validated or its :attr:`~django.forms.Form.cleaned_data` changes),
+        so calling this repeatedly -- as :meth:`message` and :meth:`subject` both do --
+        does not repeat the site lookup. Each call returns a new copy of the context.
+
         """
         if not self.is_valid():
             raise ValueError("Cannot generate Context from invalid contact form")
-        return dict(self.cleaned_data, site=get_current_site(self.request))
+        if (
+            self._message_context is None
+            or self._message_context[0] != self.cleaned_data
+        ):
+            self._message_context = (
+                dict(self.cleaned_data),
+                dict(self.cleaned_data, site=self._get_site()),
+            )
+        return dict(self._message_context[1])
+
+    def _get_site(self):
+        """
+        Return the current site, looking it up only once per form instance.
+
+        """
+        if self._site is None:
+            with timed("site_lookup", self):
+                self._site = get_current_site(self.request)
+        return self._site
 
     def get_message_dict(self) -> dict:
         """
@@ -210,6 +478,8 @@ class ContactForm(forms.Form):
         that for compatibility, implementations which override this should support
         callables for the values of :attr:`from_email` and :attr:`recipient_list`.
 
+        If :attr:`routing_table` is set, the recipients are looked up there first.
+
         """
         if not self.is_valid():
             raise ValueError("Message cannot be sent from invalid contact form")
@@ -217,18 +487,288 @@ class ContactForm(forms.Form):
         for message_part in ("from_email", "message", "recipient_list", "subject"):
             attr = getattr(self, message_part)
             message_dict[message_part] = attr() if callable(attr) else attr
+        recipients = self._route()
+        if recipients is not None:
+            message_dict["recipient_list"] = recipients
         return message_dict
 
+    def _route(self) -> "list | None":
+        """
+        Return the recipients found in :attr:`routing_table`, or :data:`None` if
+        there is no routing table or matching route, or a recipient list was passed to
+        the form.
+
+        """
+        if self.routing_table is None or "recipient_list" in self.__dict__:
+            return None
+        return self.routing_table.resolve(
+            topic=self.cleaned_data.get(self.topic_field),
+            site=self._get_site().domain,
+            language=get_language(),
+        )
+
     def save(self, fail_silently=False):
         """
         If the form has data and is valid, construct and send the email.
 
         By default, this is done by obtaining the parts of the email from
         :meth:`get_message_dict` and passing the result to Django's
-        :func:`~django.core.mail.send_mail` function.
+        :func:`~django.core.mail.send_mail` function (over a connection from
+        :attr:`connection_pool`, if set) or, if :attr:`delivery_backend` is set, to that
+        backend's ``enqueue()`` method.
+
+        """
+        if not self._claim_submission():
+            return
+        try:
+            self._process(fail_silently)
+        except BaseException:
+            self._release_submission()
+            raise
+
+    def _process(self, fail_silently):
+        """
+        Construct the message, record the submission, deliver the message, and record
+        the outcome.
+
+        """
+        message_dict = self.get_message_dict()
+        submission = self._record(message_dict)
+        try:
+            self._deliver(message_dict, fail_silently)
+        except Exception:
+            self._update_submission(submission, failed=True)
+            raise
+        self._update_submission(submission)
+
+    def get_content_hash(self) -> str:
+        """
+        Return a hash (a SHA-256 hex digest) of the submitted data, so that
+        submissions of the same data can be recognized. Text is normalized before
+        hashing, so that differences in case and whitespace are ignored, and uploaded
+        files are compared by their contents.
+
+        """
+        normalized = {
+            name: (
+                " ".join(value.split()).casefold() if isinstance(value, str) else value
+            )
+            for name, value in self.cleaned_data.items()
+        }
+        return hashlib.sha256(
+            json.dumps(
+                normalized, sort_keys=True, default=_content_hash_default
+            ).encode()
+        ).hexdigest()
+
+    def is_duplicate(self) -> bool:
+        """
+        Return whether an identical submission -- the same data (as compared by
+        :meth:`get_content_hash`) from the same IP address -- has been saved within the
+        last :attr:`duplicate_window` seconds.
+
+        """
+        if self.duplicate_window is None:
+            return False
+        return self._duplicate_cache().get(self._duplicate_key()) is not None
+
+    def _duplicate_cache(self):
+        """
+        Return the cache recording recent submissions.
+
+        """
+        if self.duplicate_cache_alias is None:
+            return _recent_submissions
+        return caches[self.duplicate_cache_alias]
+
+    def _duplicate_key(self) -> str:
+        """
+        Return the key under which to record this submission for duplicate detection.
+
+        """
+        digest = hashlib.sha256(
+            f"{self.get_content_hash()}:{self.request.META.get('REMOTE_ADDR', '')}".encode()
+        ).hexdigest()
+        return f"django_contact_form:duplicate:{digest}"
+
+    def _claim_submission(self) -> bool:
+        """
+        Record the submission as saved, and return whether it should be processed:
+        :data:`False` if an identical submission was saved within
+        :attr:`duplicate_window`.
+
+        """
+        if self.duplicate_window is None:
+            return True
+        # The duplicate key is computed from the cleaned data.
+        if not self.is_valid():
+            raise ValueError("Message cannot be sent from invalid contact form")
+        return self._duplicate_cache().add(
+            self._duplicate_key(), True, self.duplicate_window
+        )
 
+    def _release_submission(self):
         """
-        send_mail(fail_silently=fail_silently, **self.get_message_dict())
+        Forget the record of the submission, after it failed to be processed.
+
+        """
+        if self.duplicate_window is not None:
+            self._duplicate_cache().delete(self._duplicate_key())
+
+    def _delivery_is_thread_sensitive(self) -> bool:
+        """
+        Return whether processing the submission must happen in the thread used for
+        synchronous database access, because it writes to the database.
+
+        """
+        return self.store_submissions or self.delivery_backend is not None
+
+    def _spam_verdict(self):
+        """
+        Return the spam verdict to record for the submission: :data:`None`, since this
+        form performs no spam check.
+
+        """
+        return None
+
+    def _record(self, message_dict, status=None):
+        """
+        Store a record of the submission, with the given status (by default,
+        pending delivery), if :attr:`store_submissions` is set, and return it.
+
+        """
+        self.submission = None
+        if self.store_submissions:
+            from .models import Submission  # pylint: disable=import-outside-toplevel
+
+            self.submission = Submission.from_form(
+                self,
+                message_dict=message_dict,
+                status=status or Submission.Status.PENDING,
+            )
+            self.submission.save()
+        return self.submission
+
+    def _delivery_status(self) -> str:
+        """
+        Return the status to record for the submission once the message has been
+        delivered without an exception.
+
+        """
+        from .models import Submission  # pylint: disable=import-outside-toplevel
+
+        if self.delivery_backend is not None:
+            return Submission.Status.QUEUED
+        if self.delivery_results is not None and any(
+            exc is not None for exc in self.delivery_results.values()
+        ):
+            return Submission.Status.FAILED
+        return Submission.Status.SENT
+
+    def _update_submission(self, submission, failed=False):
+        """
+        Record the outcome of delivering the message on the stored submission, if
+        any. Only a pending submission is updated, since a delivery backend may
+        already have recorded the final outcome.
+
+        """
+        if submission is None:
+            return
+        from .models import Submission  # pylint: disable=import-outside-toplevel
+
+        status = Submission.Status.FAILED if failed else self._delivery_status()
+        if Submission.objects.filter(
+            pk=submission.pk, status=Submission.Status.PENDING
+        ).update(status=status):
+            submission.status = status
+
+    def _deliver(self, message_dict, fail_silently):
+        """
+        Send a message, or hand it to the delivery backend.
+
+        """
+        with timed("send", self, payload_size=len(message_dict["message"])):
+            if self.delivery_backend is not None:
+                self.delivery_backend.enqueue(
+                    message_dict,
+                    fail_silently=fail_silently,
+                    submission=self.submission,
+                )
+            elif self.fan_out:
+                self._send_individually(message_dict, fail_silently)
+            else:
+                self._send(message_dict, fail_silently)
+
+    def _send_individually(self, message_dict, fail_silently):
+        """
+        Send a copy of a message to each recipient, recording the results in
+        :attr:`delivery_results`.
+
+        """
+        self.delivery_results = send_individually(
+            message_dict,
+            connection_pool=self.connection_pool,
+            max_workers=self.fan_out_workers,
+            retries=self.fan_out_retries,
+        )
+        if not fail_silently and any(
+            exc is not None for exc in self.delivery_results.values()
+        ):
+            raise DeliveryError(self.delivery_results)
+
+    def _send(self, message_dict, fail_silently):
+        """
+        Send a message immediately.
+
+        """
+        if self.connection_pool is not None:
+            self.connection_pool.send_messages(
+                [build_message(**message_dict)], fail_silently=fail_silently
+            )
+        else:
+            send_mail(fail_silently=fail_silently, **message_dict)
+
+    async def ais_valid(self) -> bool:
+        """
+        Async version of :meth:`~django.forms.Form.is_valid`.
+
+        By default, this simply runs the form's normal validation. Subclasses which need
+        to perform network I/O during validation (such as
+        :class:`AkismetContactForm`) override this to do that I/O asynchronously.
+
+        """
+        if self._errors is not None:
+            # Already validated; nothing to run in a thread.
+            return self.is_valid()
+        return await sync_to_async(self.is_valid)()
+
+    async def asave(self, fail_silently=False):
+        """
+        Async version of :meth:`save`.
+
+        Django's email framework is synchronous, so the message is still sent the same
+        way as by :meth:`save`, but the sending runs in a thread pool rather than
+        being serialized behind other synchronous work for the current request, so
+        that many messages can be sent concurrently. (If the submission is stored or
+        handed to a delivery backend, which write to the database, it runs in the
+        thread used for synchronous database access instead.)
+
+        """
+        # Each hop to a thread has a cost, so the cache is only consulted if duplicate
+        # detection is enabled, and the rest of the work happens in a single hop.
+        if (
+            self.duplicate_window is not None
+            and not await sync_to_async(self._claim_submission)()
+        ):
+            return
+        try:
+            await sync_to_async(
+                self._process, thread_sensitive=self._delivery_is_thread_sensitive()
+            )(fail_silently)
+        except BaseException:
+            if self.duplicate_window is not None:
+                await sync_to_async(self._release_submission)()
+            raise
 
 
 class AkismetContactForm(ContactForm):
@@ -255,16 +795,179 @@ class AkismetContactForm(ContactForm):
     ``django_contact_form.akismet_urls``, which will set up :class:`AkismetContactForm`
     for you in place of the base contact form class.
 
-    If you want to customize the spam-filtering behavior, there are two methods you can
-    override:
+    If you want to customize the spam-filtering behavior, there are four methods you
+    can override:
 
     .. automethod:: get_akismet_check_arguments
+    .. automethod:: get_akismet_config
     .. automethod:: get_akismet_client
+    .. automethod:: aget_akismet_client
+
+    If one process serves several sites, set the following attribute to check each
+    submission against the site it was made to:
+
+    .. attribute:: akismet_per_site
+
+       Whether to identify each submission to Akismet by the URL of the current site
+       (as found by :func:`~django.contrib.sites.shortcuts.get_current_site`), rather
+       than the configured site URL. The configured API key is still used. Each site
+       gets its own Akismet client. By default, this is :data:`False`.
+
+    Before a newly-created Akismet client is first used, its API key is verified with
+    Akismet. To avoid every new worker process repeating that verification on its
+    first request, successful verifications can be shared through a cache (see also
+    the ``verify_akismet_key`` management command):
+
+    .. attribute:: akismet_verification_cache_alias
+
+       The alias of the Django cache in which to record successful verifications. Use
+       a cache shared by all your processes, such as a database, file-based or
+       Memcached/Redis cache. By default, this is :data:`None`, and each process
+       verifies the key itself.
+
+    .. attribute:: akismet_verification_timeout
+
+       The number of seconds for which a recorded verification is trusted. By default,
+       this is ``86400`` (one day).
+
+    The spam check is the last stage of validation: it runs only once every field,
+    and the form's :meth:`~django.forms.Form.clean` method, have validated
+    successfully, so submissions with other errors never cost a call to Akismet, and
+    :meth:`get_akismet_check_arguments` can rely on all of the form's cleaned data
+    being present. A submission classified as spam gets the error
+    :attr:`SPAM_MESSAGE` on its ``body`` field.
+
+    When validated through :meth:`ais_valid` (as
+    :class:`~django_contact_form.views.AsyncContactFormView` does), the spam check is
+    performed with an async Akismet client, and does not block a thread while waiting
+    on the Akismet web service.
+
+    Akismet's verdicts can also be cached, so that repeated submissions of identical
+    content (for example, a spam bot re-posting the same message from the same IP
+    address) are answered without contacting Akismet again. This is controlled by the
+    following attributes:
+
+    .. attribute:: akismet_cache_alias
+
+       The alias (a key of the :setting:`CACHES` setting) of the Django cache in which
+       to store verdicts. By default, this is :data:`None`, and verdicts are not
+       cached.
+
+    .. attribute:: akismet_spam_cache_timeout
+
+       The number of seconds for which to cache a verdict of spam. By default, this is
+       ``3600`` (one hour).
+
+    .. attribute:: akismet_ham_cache_timeout
+
+       The number of seconds for which to cache a verdict of non-spam. By default, this
+       is ``300`` (five minutes).
+
+    Verdicts are cached using a hash of the return value of
+    :meth:`get_akismet_check_arguments`, so only submissions which would have been
+    sent to Akismet with exactly the same arguments share a verdict.
+
+    Finally, much spam can be detected without asking Akismet at all:
+
+    .. attribute:: spam_checks
+
+       A list of cheap local spam checks (see :ref:`the spam-check documentation
+       <spam>`) to run, in order, before the Akismet check. The first check to reach
+       a verdict decides whether the submission is spam, and Akismet is only
+       consulted if none of them can decide. By default, this is an empty list.
+
+    And to keep a slow or failing Akismet service from slowing down or breaking your
+    contact form:
+
+    .. attribute:: akismet_timeout
+
+       The maximum number of seconds to wait for Akismet to respond to a spam check.
+       The default Akismet client is also created with this as its HTTP timeout, so
+       that a check which overruns the deadline is abandoned rather than left
+       running; if you override :meth:`get_akismet_client`, configure your client's
+       timeout likewise. By default, this is :data:`None`, and the Akismet client's
+       own timeout applies.
+
+    .. attribute:: akismet_circuit_breaker
+
+       A :class:`~django_contact_form.spam.CircuitBreaker` which stops Akismet from
+       being consulted at all for a time after repeated failures. Since it tracks
+       failures across submissions, set it as a class attribute. By default, this is
+       :data:`None`.
+
+    .. attribute:: akismet_failure_policy
+
+       What to do when the Akismet check fails (because of a network or protocol
+       error, a timeout, or an open circuit breaker). One of:
+
+       ``"open"``
+          Accept the submission, and send the message without a spam check.
+
+       ``"closed"``
+          Reject the submission with the error message :attr:`UNAVAILABLE_MESSAGE`.
+
+       ``"queue"``
+          Accept the submission, but rather than sending the message, store it in the
+          :ref:`database delivery queue <delivery>` along with the arguments for the
+          spam check. The ``drain_contact_form_queue`` management command will check
+          it for spam before sending it.
+
+       By default, this is :data:`None`, and the exception raised by the failure
+       propagates.
+
+    For high volumes of submissions, the Akismet check can be taken out of the
+    request/response cycle entirely:
+
+    .. attribute:: akismet_deferred
+
+       Whether to accept submissions without waiting for Akismet, queueing them in the
+       :ref:`database delivery queue <delivery>` to be checked later. The
+       ``drain_contact_form_queue`` management command checks the queued submissions
+       in batches, with many concurrent requests to Akismet, then sends the messages
+       which are not spam and discards those which are. Local :attr:`spam_checks` and
+       the verdict cache are still consulted first, so submissions they can classify
+       are handled immediately. By default, this is :data:`False`.
 
     """
 
     SPAM_MESSAGE = _("Your message was classified as spam.")
 
+    UNAVAILABLE_MESSAGE = _(
+        "Your message could not be checked for spam right now. Please try again later."
+    )
+
+    akismet_per_site = False
+
+    akismet_verification_cache_alias = None
+    akismet_verification_timeout = 86400
+
+    akismet_cache_alias = None
+    akismet_spam_cache_timeout = 3600
+    akismet_ham_cache_timeout = 300
+
+    spam_checks = []
+
+    akismet_timeout = None
+    akismet_circuit_breaker = None
+    akismet_failure_policy = None
+
+    akismet_deferred = False
+
+    # Set when the spam check could not be performed and the message should be queued
+    # to be checked later.
+    _spam_check_deferred = False
+
+    # Set when the spam check could not be performed and the submission was accepted
+    # anyway.
+    _spam_check_skipped = False
+
+    # Set when the submission was rejected as spam.
+    _spam_detected = False
+
+    # Set while validating via ais_valid(), to tell _post_clean() the spam check will
+    # be performed asynchronously afterward.
+    _async_spam_check = False
+
     def get_akismet_check_arguments(self) -> dict:
         """
         Return the arguments which will be passed to the Akismet spam check.
@@ -282,33 +985,526 @@ class AkismetContactForm(ContactForm):
             "comment_type": "contact-form",
         }
 
+    def get_akismet_config(self) -> "akismet.Config | None":  # noqa: F821
+        """
+        Return the Akismet configuration (API key and site URL) to check this
+        submission with, or :data:`None` to use the configuration from your environment
+        variables.
+
+        By default, this returns :data:`None` unless :attr:`akismet_per_site` is set.
+        Override this if, for example, your sites use different API keys.
+
+        This configuration is also stored with submissions whose spam check is
+        deferred (see :attr:`akismet_deferred`), and used when they are checked later.
+        If you override :meth:`get_akismet_client` to use a different configuration,
+        override this method to return that configuration too.
+
+        """
+        if not self.akismet_per_site:
+            return None
+        import akismet  # pylint: disable=import-outside-toplevel
+
+        from ._akismet import _default_config  # pylint: disable=import-outside-toplevel
+
+        scheme = "https" if self.request.is_secure() else "http"
+        return akismet.Config(
+            key=_default_config()[0].key, url=f"{scheme}://{self._get_site().domain}/"
+        )
+
     def get_akismet_client(self) -> "akismet.SyncClient":  # noqa: F821
         """
         Obtain and return an Akismet API client.
 
-        By default, this will create a single API client instance and keep it resident
-        in memory for the life of the Python process.
+        By default, this will create an API client instance for each distinct
+        configuration returned by :meth:`get_akismet_config` and keep it resident in
+        memory for the life of the Python process.
 
         If you need to customize the Akismet client creation (for example, to pass
         custom arguments to the Akismet API client), override this method.
 
-        *Note:* Only synchronous Akismet clients (:class:`akismet.SyncClient`) are
-        supported here; async clients (:class:`akismet.AsyncClient`) are not.
+        This method must return a synchronous Akismet client
+        (:class:`akismet.SyncClient`); the async client is obtained from
+        :meth:`aget_akismet_client`.
 
         """
         from ._akismet import (  # pylint: disable=import-outside-toplevel
             _try_get_akismet_client,
         )
 
-        return _try_get_akismet_client()
+        return _try_get_akismet_client(
+            config=self.get_akismet_config(),
+            verification_cache=self.akismet_verification_cache_alias,
+            verification_timeout=self.akismet_verification_timeout,
+            timeout=self.akismet_timeout,
+        )
+
+    async def aget_akismet_client(self) -> "akismet.AsyncClient":  # noqa: F821
+        """
+        Obtain and return an async Akismet API client, for use by :meth:`ais_valid`.
+
+        As with :meth:`get_akismet_client`, by default an API client instance will be
+        created for each distinct configuration and kept resident in memory for the life
+        of the Python process, and you can override this method to customize the client
+        creation.
+
+        """
+        from ._akismet import (  # pylint: disable=import-outside-toplevel
+            _atry_get_akismet_client,
+        )
+
+        config = await sync_to_async(self.get_akismet_config)()
+        return await _atry_get_akismet_client(
+            config=config,
+            verification_cache=self.akismet_verification_cache_alias,
+            verification_timeout=self.akismet_verification_timeout,
+        )
+
+    def full_clean(self):
+        """
+        Validate the form, discarding any earlier deferral of the spam check.
+
+        """
+        self._spam_check_deferred = False
+        self._spam_check_skipped = False
+        self._spam_detected = False
+        super().full_clean()
+
+    def _post_clean(self):
+        """
+        Apply Akismet spam filtering to the submission, once all other validation --
+        of the individual fields, and by :meth:`~django.forms.Form.clean` -- has
+        passed.
+
+        """
+        super()._post_clean()
+        if self._async_spam_check or self._errors:
+            return
+        try:
+            if self._is_spam():
+                self._record_spam()
+                self.add_error("body", self.SPAM_MESSAGE)
+        except forms.ValidationError as exc:
+            self.add_error("body", exc)
+
+    async def ais_valid(self) -> bool:
+        """
+        Validate the form, applying Akismet spam filtering with an async Akismet
+        client.
+
+        """
+        if self._errors is not None:
+            # Already validated (and spam-checked); don't check again.
+            return self.is_valid()
+        self._async_spam_check = True
+        try:
+            if not await super().ais_valid():
+                return False
+        finally:
+            self._async_spam_check = False
+        try:
+            if await self._ais_spam():
+                if self.store_submissions:
+                    await sync_to_async(self._record_spam)()
+                else:
+                    self._record_spam()
+                self.add_error("body", self.SPAM_MESSAGE)
+        except forms.ValidationError as exc:
+            self.add_error("body", exc)
+        return self.is_valid()
+
+    def _deliver(self, message_dict, fail_silently):
+        """
+        Send the message or, if the spam check was deferred, queue it to be checked
+        and sent later.
+
+        """
+        if self._spam_check_deferred:
+            self._queue_for_review(message_dict)
+        else:
+            super()._deliver(message_dict, fail_silently)
+
+    def _delivery_is_thread_sensitive(self) -> bool:
+        """
+        Return whether processing the submission writes to the database.
+
+        """
+        return self._spam_check_deferred or super()._delivery_is_thread_sensitive()
+
+    def _queue_for_review(self, message_dict):
+        """
+        Store the message in the database queue, along with the arguments and the
+        Akismet configuration for the spam check which must be performed before it is
+        sent.
+
+        """
+        # pylint: disable=import-outside-toplevel
+        from .delivery import serialize_message_dict
+        from .models import QueuedMessage
+
+        config = self.get_akismet_config()
+        QueuedMessage.objects.create(
+            message=serialize_message_dict(message_dict),
+            akismet_arguments=serialize_message_dict(
+                self.get_akismet_check_arguments()
+            ),
+            akismet_key=config.key if config is not None else "",
+            akismet_url=config.url if config is not None else "",
+            submission=self.submission,
+        )
+
+    def _delivery_status(self) -> str:
+        """
+        Return the status to record for the submission once the message has been
+        delivered or, if the spam check was deferred, queued.
+
+        """
+        if self._spam_check_deferred:
+            from .models import Submission  # pylint: disable=import-outside-toplevel
+
+            return Submission.Status.QUEUED
+        return super()._delivery_status()
+
+    def _spam_verdict(self):
+        """
+        Return the spam verdict to record for the submission: :data:`True` if it was
+        rejected as spam, :data:`False` if it passed the spam check, or :data:`None`
+        if the check was skipped or deferred.
+
+        """
+        if self._spam_detected:
+            return True
+        if self._spam_check_deferred or self._spam_check_skipped:
+            return None
+        return False
+
+    def _record_spam(self):
+        """
+        Note that the submission was rejected as spam and, if
+        :attr:`~ContactForm.store_submissions` is set, store it.
+
+        """
+        self._spam_detected = True
+        if self.store_submissions:
+            from .models import Submission  # pylint: disable=import-outside-toplevel
+
+            self._record(self.get_message_dict(), Submission.Status.SPAM)
+
+    def _akismet_failed(self, exc):
+        """
+        Apply the failure policy when the Akismet check could not be completed,
+        returning :data:`None` if the submission should be accepted.
+
+        """
+        if self.akismet_failure_policy == "open":
+            self._spam_check_skipped = True
+            return None
+        if self.akismet_failure_policy == "closed":
+            raise forms.ValidationError(self.UNAVAILABLE_MESSAGE)
+        if self.akismet_failure_policy == "queue":
+            self._spam_check_deferred = True
+            return None
+        raise exc
+
+    def _akismet_verdict(self, arguments):
+        """
+        Return Akismet's verdict for the given arguments or, if the check fails and the
+        failure policy accepts the submission, :data:`None`.
+
+        """
+        from ._akismet import (  # pylint: disable=import-outside-toplevel
+            _CHECK_FAILURES,
+            _comment_check,
+        )
+
+        if self.akismet_deferred:
+            self._spam_check_deferred = True
+            return None
+        breaker = self.akismet_circuit_breaker
+        if breaker is not None and not breaker.allow():
+            return self._akismet_failed(CircuitOpenError())
+        try:
+            verdict = _comment_check(
+                self.get_akismet_client(), arguments, self.akismet_timeout
+            )
+        except _CHECK_FAILURES as exc:
+            if breaker is not None:
+                breaker.record_failure()
+            return self._akismet_failed(exc)
+        if breaker is not None:
+            breaker.record_success()
+        return bool(verdict)
+
+    async def _aakismet_verdict(self, arguments):
+        """
+        Async version of :meth:`_akismet_verdict`.
+
+        """
+        from ._akismet import (  # pylint: disable=import-outside-toplevel
+            _CHECK_FAILURES,
+            _acomment_check,
+        )
+
+        if self.akismet_deferred:
+            self._spam_check_deferred = True
+            return None
+        breaker = self.akismet_circuit_breaker
+        if breaker is not None and not breaker.allow():
+            return self._akismet_failed(CircuitOpenError())
+        try:
+            verdict = await _acomment_check(
+                await self.aget_akismet_client(), arguments, self.akismet_timeout
+            )
+        except _CHECK_FAILURES as exc:
+            if breaker is not None:
+                breaker.record_failure()
+            return self._akismet_failed(exc)
+        if breaker is not None:
+            breaker.record_success()
+        return bool(verdict)
+
+    def _verdict_cache_key(self, arguments):
+        """
+        Return the cache key under which to store the verdict for the given Akismet
+        arguments.
+
+        """
+        digest = hashlib.sha256(
+            json.dumps(arguments, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"django_contact_form:akismet:{digest}"
 
-    def clean_body(self):
+    def _verdict_timeout(self, is_spam):
         """
-        Apply Akismet spam filtering to the submission.
+        Return the cache timeout for a verdict.
 
         """
-        akismet_client = self.get_akismet_client()
+        if is_spam:
+            return self.akismet_spam_cache_timeout
+        return self.akismet_ham_cache_timeout
+
+    def _is_spam(self) -> bool:
+        """
+        Return whether the submission is spam.
+
+        """
+        with timed(
+            "spam_check", self, payload_size=len(self.cleaned_data["body"])
+        ) as record:
+            is_spam = self._classify()
+            record["outcome"] = "spam" if is_spam else "ham"
+        return is_spam
+
+    async def _ais_spam(self) -> bool:
+        """
+        Async version of :meth:`_is_spam`.
+
+        """
+        with timed(
+            "spam_check", self, payload_size=len(self.cleaned_data["body"])
+        ) as record:
+            is_spam = await self._aclassify()
+            record["outcome"] = "spam" if is_spam else "ham"
+        return is_spam
+
+    def _classify(self) -> bool:
+        """
+        Return whether the submission is spam, consulting the local spam checks and
+        then the verdict cache before Akismet. Duplicates of a submission which was
+        accepted are not checked again.
+
+        """
+        if self.is_duplicate():
+            return False
+        verdict = run_checks(self.spam_checks, self)
+        if verdict is not None:
+            return verdict
+        arguments = self.get_akismet_check_arguments()
+        if self.akismet_cache_alias is None:
+            return bool(self._akismet_verdict(arguments))
+        cache = caches[self.akismet_cache_alias]
+        key = self._verdict_cache_key(arguments)
+        verdict = cache.get(key)
+        if verdict is None:
+            verdict = self._akismet_verdict(arguments)
+            if verdict is None:
+                return False
+            cache.set(key, verdict, self._verdict_timeout(verdict))
+        return verdict
+
+    async def _aclassify(self) -> bool:
+        """
+        Async version of :meth:`_classify`.
+
+        """
+        if (
+            self.duplicate_window is not None
+            and await sync_to_async(self.is_duplicate)()
+        ):
+            return False
+        verdict = run_checks(self.spam_checks, self)
+        if verdict is not None:
+            return verdict
+        arguments = self.get_akismet_check_arguments()
+        if self.akismet_cache_alias is None:
+            return bool(await self._aakismet_verdict(arguments))
+        cache = caches[self.akismet_cache_alias]
+        key = self._verdict_cache_key(arguments)
+        verdict = await cache.aget(key)
+        if verdict is None:
+            verdict = await self._aakismet_verdict(arguments)
+            if verdict is None:
+                return False
+            await cache.aset(key, verdict, self._verdict_timeout(verdict))
+        return verdict
+
+
+class AttachmentContactForm(ContactForm):
+    """
+    A subclass of :class:`ContactForm` which accepts an uploaded file, sent as an
+    attachment to the message, and which can send an HTML version of the message
+    alongside the plain-text one.
+
+    The message is sent as a single :class:`~django.core.mail.EmailMultiAlternatives`
+    (see :func:`~django_contact_form.mail.build_message`). Uploaded files are only
+    read when the message is sent, and then a chunk at a time (Django keeps uploads
+    larger than :setting:`FILE_UPLOAD_MAX_MEMORY_SIZE` in temporary files), so large
+    attachments are not held in memory twice. To reject oversized files before they
+    have been received in full, also install
+    :class:`~django_contact_form.uploads.MaxSizeUploadHandler`.
+
+    :class:`~django_contact_form.views.ContactFormView` passes uploaded files to the
+    form; remember to give the HTML ``<form>`` element the attribute
+    ``enctype="multipart/form-data"``. Every :class:`~django.forms.FileField` of the
+    form is attached, so subclasses can add more.
 
-        if akismet_client.comment_check(**self.get_akismet_check_arguments()):
-            raise forms.ValidationError(self.SPAM_MESSAGE)
-        return self.cleaned_data["body"]
+    Uploaded files cannot be stored for later delivery, so this form cannot be used
+    with a :attr:`~ContactForm.delivery_backend` when a file was uploaded. Stored
+    :attr:`~ContactForm.store_submissions` records include only the names of the
+    attached files.
+
+    .. attribute:: html_template_name
+
+       A :class:`str`, the name of the template to use when rendering the HTML
+       version of the message. It is always rendered by the Django template engine,
+       whatever the :attr:`~ContactForm.message_renderer`, so that values are
+       HTML-escaped. By default, this is :data:`None`, and only a plain-text version
+       is sent.
+
+    .. attribute:: max_attachment_size
+
+       The largest permitted uploaded file, in bytes. By default, this is 10 MiB.
+
+    .. automethod:: html_message
+
+    .. automethod:: get_attachments
+
+    """
+
+    ATTACHMENT_TOO_LARGE_MESSAGE = _("Attachments must be no larger than %(size)s.")
+
+    attachment = forms.FileField(required=False, label=_("Attachment"))
+
+    html_template_name = None
+
+    max_attachment_size = 10 * 1024 * 1024
+
+    def clean(self):
+        """
+        Reject uploaded files larger than :attr:`max_attachment_size`.
+
+        """
+        cleaned_data = super().clean()
+        for name, value in list(cleaned_data.items()):
+            if (
+                isinstance(value, UploadedFile)
+                and value.size > self.max_attachment_size
+            ):
+                self.add_error(
+                    name,
+                    forms.ValidationError(
+                        self.ATTACHMENT_TOO_LARGE_MESSAGE,
+                        code="file_too_large",
+                        params={"size": filesizeformat(self.max_attachment_size)},
+                    ),
+                )
+        return cleaned_data
+
+    def html_message(self) -> "str | None":
+        """
+        Return the HTML version of the message, by rendering the template named by
+        :attr:`html_template_name`, or :data:`None` if that is not set.
+
+        """
+        template_name = (
+            self.html_template_name()  # pylint: disable=not-callable
+            if callable(self.html_template_name)
+            else self.html_template_name
+        )
+        if template_name is None:
+            return None
+        context = self.get_message_context()
+        with timed("render_html_message", self) as record:
+            message = _default_renderer.render(template_name, context, self.request)
+            record["payload_size"] = len(message)
+        return message
+
+    def get_attachments(self) -> list:
+        """
+        Return the uploaded files to attach to the message.
+
+        """
+        return [
+            value
+            for value in self.cleaned_data.values()
+            if isinstance(value, UploadedFile)
+        ]
+
+    def get_message_dict(self) -> dict:
+        """
+        Generate the parts of the message as :meth:`ContactForm.get_message_dict`
+        does, adding ``html_message`` and, if any files were uploaded,
+        ``attachments``.
+
+        """
+        message_dict = super().get_message_dict()
+        message_dict["html_message"] = self.html_message()
+        attachments = self.get_attachments()
+        if attachments:
+            message_dict["attachments"] = attachments
+        return message_dict
+
+    def _deliver(self, message_dict, fail_silently):
+        """
+        Send a message, refusing to hand attachments to a delivery backend.
+
+        """
+        if self.delivery_backend is not None and "attachments" in message_dict:
+            raise ImproperlyConfigured(
+                "Messages with attachments cannot be sent through a delivery backend."
+            )
+        super()._deliver(message_dict, fail_silently)
+
+    def _send(self, message_dict, fail_silently):
+        """
+        Send a message immediately, with its HTML version and attachments.
+
+        """
+        if self.connection_pool is not None:
+            super()._send(message_dict, fail_silently)
+        else:
+            build_message(
+                connection=get_connection(fail_silently=fail_silently), **message_dict
+            ).send(fail_silently=fail_silently)
+
+    def _record(self, message_dict, status=None):
+        """
+        Store a record of the submission, replacing the attached files with their
+        names.
+
+        """
+        if "attachments" in message_dict:
+            message_dict = dict(
+                message_dict,
+                attachments=[upload.name for upload in message_dict["attachments"]],
+            )
+        return super()._record(message_dict, status)
@@ -0,0 +1,172 @@
+"""
+Timing instrumentation for each stage of handling a contact-form submission.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import contextlib
+import logging
+import time
+
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Sent when a stage of handling a submission finishes. Arguments: ``instance`` (the
+# form or view), ``stage``, ``duration`` (seconds), ``outcome`` and ``payload_size``.
+stage_finished = Signal()
+
+
+@contextlib.contextmanager
+def timed(stage: str, instance, payload_size=None):
+    """
+    Time the enclosed block as the given stage, and send :data:`stage_finished` when
+    it finishes. The block may set ``"outcome"`` (by default ``"ok"``, or ``"error"``
+    if the block raises an exception) and ``"payload_size"`` in the yielded dictionary.
+
+    """
+    record = {"outcome": "ok", "payload_size": payload_size}
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record["outcome"] = "error"
+        raise
+    finally:
+        stage_finished.send(
+            sender=instance.__class__,
+            instance=instance,
+            stage=stage,
+            duration=time.perf_counter() - start,
+            **record,
+        )
+
+
+def log_stage(
+    sender, stage, duration, outcome, payload_size, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Receiver for :data:`stage_finished` which logs each stage to the logger
+    ``django_contact_form.instrumentation``, at level ``INFO``. The stage, its
+    duration in milliseconds, outcome and payload size are attached to the log record
+    as the attributes ``stage``, ``duration_ms``, ``outcome`` and ``payload_size``, for
+    use by structured-logging formatters.
+
+    """
+    duration_ms = duration * 1000
+    logger.info(
+        "%s.%s: %s in %.2fms",
+        sender.__name__,
+        stage,
+        outcome,
+        duration_ms,
+        extra={
+            "stage": stage,
+            "duration_ms": duration_ms,
+            "outcome": outcome,
+            "payload_size": payload_size,
+        },
+    )
+
+
+class MetricsReceiver:
+    """
+    Base class for receivers of :data:`stage_finished` which report to a metrics
+    system. Subclasses must implement :meth:`record`.
+
+    .. automethod:: connect
+
+    .. automethod:: disconnect
+
+    .. automethod:: record
+
+    """
+
+    def __call__(
+        self, sender, stage, duration, outcome, **kwargs
+    ):  # pylint: disable=unused-argument
+        self.record(stage, duration, outcome)
+
+    def connect(self) -> None:
+        """
+        Start receiving :data:`stage_finished`. The signal holds a strong reference to
+        this receiver, so it need not be kept alive elsewhere.
+
+        """
+        stage_finished.connect(self, weak=False)
+
+    def disconnect(self) -> None:
+        """
+        Stop receiving :data:`stage_finished`.
+
+        """
+        stage_finished.disconnect(self)
+
+    def record(self, stage: str, duration: float, outcome: str) -> None:
+        """
+        Report the duration, in seconds, and outcome of a stage.
+
+        """
+        raise NotImplementedError
+
+
+class StatsdMetrics(MetricsReceiver):
+    """
+    Report stage timings to a StatsD client (any object with ``timing()`` and
+    ``incr()`` methods, such as a :class:`statsd.StatsClient`): a timer
+    ``<prefix>.<stage>``, in milliseconds, and a counter
+    ``<prefix>.<stage>.<outcome>``.
+
+    :param client: The StatsD client.
+
+    :param prefix: The prefix for metric names.
+
+    """
+
+    def __init__(self, client, prefix: str = "django_contact_form"):
+        self.client = client
+        self.prefix = prefix
+
+    def record(self, stage: str, duration: float, outcome: str) -> None:
+        """
+        Send the timer and counter.
+
+        """
+        name = f"{self.prefix}.{stage}"
+        self.client.timing(name, duration * 1000)
+        self.client.incr(f"{name}.{outcome}")
+
+
+class PrometheusMetrics(MetricsReceiver):
+    """
+    Report stage timings to a Prometheus histogram with the labels ``stage`` and
+    ``outcome``; for example:
+
+    .. code-block:: python
+
+        from prometheus_client import Histogram
+
+        from django_contact_form.instrumentation import PrometheusMetrics
+
+        PrometheusMetrics(
+            Histogram(
+                "contact_form_stage_seconds",
+                "Time taken by each stage of handling a contact-form submission.",
+                ["stage", "outcome"],
+            )
+        ).connect()
+
+    :param histogram: The histogram.
+
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def record(self, stage: str, duration: float, outcome: str) -> None:
+        """
+        Observe the duration.
+
+        """
+        self.histogram.labels(stage=stage, outcome=outcome).observe(duration)
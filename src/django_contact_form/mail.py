@@ -0,0 +1,313 @@
+"""
+Helpers for sending contact-form messages efficiently: a pool of reusable
+mail-server connections, and batch sending of many forms' messages.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import base64
+import concurrent.futures
+import smtplib
+import threading
+import time
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+# Uploaded files are read in chunks of a multiple of 57 bytes, each of which
+# base64-encodes to a whole number of 76-character lines.
+_ATTACHMENT_CHUNK_SIZE = 57 * 1150
+
+
+def build_message(  # pylint: disable=too-many-arguments
+    subject,
+    message,
+    from_email,
+    recipient_list,
+    *,
+    html_message=None,
+    connection=None,
+    attachments=None,
+) -> EmailMultiAlternatives:
+    """
+    Build and return an email message object from the return value of
+    :meth:`~django_contact_form.forms.ContactForm.get_message_dict`, exactly as
+    :func:`~django.core.mail.send_mail` would, attaching any uploaded files (see
+    :func:`attachment_part`) given as ``attachments``. Attachments which are already
+    MIME parts are attached as they are.
+
+    """
+    email = EmailMultiAlternatives(
+        subject, message, from_email, recipient_list, connection=connection
+    )
+    if html_message:
+        email.attach_alternative(html_message, "text/html")
+    for upload in attachments or ():
+        email.attach(
+            upload if isinstance(upload, MIMEBase) else attachment_part(upload)
+        )
+    return email
+
+
+def attachment_part(upload) -> MIMEBase:
+    """
+    Return a MIME part attaching an uploaded file
+    (:class:`~django.core.files.uploadedfile.UploadedFile`) to an email message.
+
+    The file is read and base64-encoded a chunk at a time -- from the temporary file
+    in which Django stores large uploads -- rather than being read into memory whole
+    and then encoded.
+
+    """
+    maintype, _, subtype = (upload.content_type or "").partition("/")
+    if not maintype or not subtype:
+        maintype, subtype = "application", "octet-stream"
+    part = MIMEBase(maintype, subtype)
+    part.set_payload(
+        "".join(
+            base64.encodebytes(chunk).decode("ascii")
+            for chunk in upload.chunks(_ATTACHMENT_CHUNK_SIZE)
+        )
+    )
+    part["Content-Transfer-Encoding"] = "base64"
+    filename = upload.name
+    try:
+        filename.encode("ascii")
+    except UnicodeEncodeError:
+        filename = ("utf-8", "", filename)
+    part.add_header("Content-Disposition", "attachment", filename=filename)
+    return part
+
+
+def _is_usable(connection) -> bool:
+    """
+    Check whether a pooled connection is still usable. For SMTP connections, this
+    sends a ``NOOP`` command, which is far cheaper than reconnecting but detects
+    connections the server has closed.
+
+    """
+    smtp = getattr(connection, "connection", None)
+    if isinstance(smtp, smtplib.SMTP):
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    return True
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of open mail-server connections, which can be reused across
+    many sends in order to avoid the cost of establishing a new connection (including,
+    for SMTP, a TLS handshake) for every message.
+
+    Connections are pooled separately for each combination of the email-related Django
+    settings (:setting:`EMAIL_BACKEND`, :setting:`EMAIL_HOST`, and so on), so changes
+    to those settings take effect for subsequent sends. Each connection is used by only
+    one thread at a time.
+
+    :param idle_timeout: The number of seconds a connection may sit unused in the pool
+       before it is closed rather than reused. Keep this below your mail server's own
+       idle timeout.
+
+    :param max_messages: The number of messages after which a connection is closed
+       rather than returned to the pool.
+
+    .. automethod:: send_messages
+
+    .. automethod:: close_all
+
+    """
+
+    def __init__(self, idle_timeout: float = 30, max_messages: int = 100):
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+        # Maps a settings key to a list of (connection, last used, messages sent).
+        self._idle = {}
+
+    @staticmethod
+    def _settings_key() -> tuple:
+        """
+        Return the key identifying the currently-configured mail backend.
+
+        """
+        return tuple(
+            getattr(settings, name, None)
+            for name in (
+                "EMAIL_BACKEND",
+                "EMAIL_HOST",
+                "EMAIL_PORT",
+                "EMAIL_HOST_USER",
+                "EMAIL_USE_TLS",
+                "EMAIL_USE_SSL",
+            )
+        )
+
+    def _checkout(self, key: tuple) -> tuple:
+        """
+        Return a usable idle connection (and its message count) for the given key, or
+        :data:`None` if there isn't one.
+
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None, 0
+                connection, last_used, sent = idle.pop()
+            if time.monotonic() - last_used < self.idle_timeout and _is_usable(
+                connection
+            ):
+                return connection, sent
+            connection.close()
+
+    def _checkin(self, key: tuple, connection, sent: int) -> None:
+        """
+        Return a connection to the pool, or close it if it's been used enough.
+
+        """
+        if sent >= self.max_messages:
+            connection.close()
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append((connection, time.monotonic(), sent))
+
+    def send_messages(self, messages: list, fail_silently: bool = False) -> int:
+        """
+        Send a list of email messages over a single pooled connection, and return the
+        number sent.
+
+        """
+        key = self._settings_key()
+        connection, sent = self._checkout(key)
+        if connection is None:
+            connection = get_connection(fail_silently=fail_silently)
+            connection.open()
+        connection.fail_silently = fail_silently
+        try:
+            count = connection.send_messages(messages) or 0
+        except BaseException:
+            connection.close()
+            raise
+        self._checkin(key, connection, sent + count)
+        return count
+
+    def close_all(self) -> None:
+        """
+        Close all idle connections in the pool.
+
+        """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _, _ in connections:
+                connection.close()
+
+
+def send_many(forms, fail_silently: bool = False, connection_pool=None) -> int:
+    """
+    Send the messages of many valid contact forms at once, over a single mail-server
+    connection, and return the number of messages sent.
+
+    Each form's message is generated by its
+    :meth:`~django_contact_form.forms.ContactForm.get_message_dict` method (so
+    :exc:`ValueError` is raised if any form is invalid). If ``connection_pool`` is
+    given, the connection is taken from (and returned to) that
+    :class:`ConnectionPool`; otherwise a new connection is opened and closed.
+
+    """
+    messages = [build_message(**form.get_message_dict()) for form in forms]
+    if not messages:
+        return 0
+    if connection_pool is not None:
+        return connection_pool.send_messages(messages, fail_silently=fail_silently)
+    with get_connection(fail_silently=fail_silently) as connection:
+        return connection.send_messages(messages) or 0
+
+
+class DeliveryError(Exception):
+    """
+    Raised when a message sent to each of its recipients individually (see
+    :func:`send_individually`) could not be sent to some of them.
+
+    .. attribute:: results
+
+       The return value of :func:`send_individually`.
+
+    """
+
+    def __init__(self, results: dict):
+        self.results = results
+        failed = [recipient for recipient, exc in results.items() if exc is not None]
+        super().__init__(
+            f"Failed to send to {len(failed)} of {len(results)} recipients: "
+            + ", ".join(failed)
+        )
+
+
+def send_individually(
+    message_dict: dict,
+    connection_pool=None,
+    max_workers: int = 10,
+    retries: int = 2,
+) -> dict:
+    """
+    Send a separate copy of a message (the return value of
+    :meth:`~django_contact_form.forms.ContactForm.get_message_dict`) to each of its
+    recipients, so that no recipient sees the others' addresses and one rejected
+    recipient doesn't prevent delivery to the rest.
+
+    The copies are sent concurrently from a pool of up to ``max_workers`` threads,
+    over connections from ``connection_pool`` (or, if that isn't given, from a
+    temporary :class:`ConnectionPool`). A copy which fails to send is retried up to
+    ``retries`` times, independently of the others.
+
+    Any ``attachments`` are read and encoded once, before the copies are sent, and
+    every copy attaches the same encoded parts, which sending only reads.
+
+    Returns a dictionary mapping each recipient to :data:`None` if their copy was
+    sent, or to the exception raised by the final attempt to send it.
+
+    """
+    recipients = list(dict.fromkeys(message_dict["recipient_list"]))
+    if not recipients:
+        return {}
+    pool = connection_pool if connection_pool is not None else ConnectionPool()
+    # Uploaded files can't be read by several threads at once.
+    attachments = [
+        part if isinstance(part, MIMEBase) else attachment_part(part)
+        for part in message_dict.get("attachments") or ()
+    ]
+
+    def send(recipient):
+        """
+        Send the copy for one recipient, retrying failures.
+
+        """
+        message = dict(
+            message_dict,
+            recipient_list=[recipient],
+            attachments=attachments,
+        )
+        attempts_left = retries + 1
+        while True:
+            attempts_left -= 1
+            try:
+                pool.send_messages([build_message(**message)])
+                return None
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                if not attempts_left:
+                    return exc
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(recipients)),
+            thread_name_prefix="django-contact-form-send",
+        ) as executor:
+            return dict(zip(recipients, executor.map(send, recipients)))
+    finally:
+        if connection_pool is None:
+            pool.close_all()
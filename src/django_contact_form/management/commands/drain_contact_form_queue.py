@@ -0,0 +1,64 @@
+"""
+Management command to send contact-form messages stored in the database queue.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.core.management.base import BaseCommand
+
+from django_contact_form.delivery import drain_queue
+
+
+class Command(BaseCommand):
+    """
+    Send contact-form messages queued by the database delivery backend.
+
+    """
+
+    help = "Send contact-form messages queued by the database delivery backend."
+
+    def add_arguments(self, parser):
+        """
+        Add the batching, retry and concurrency arguments.
+
+        """
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of messages to send over each mail-server connection.",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Skip messages which have already failed this many times.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Maximum number of concurrent Akismet spam checks.",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=2,
+            help="Number of times to retry a failed Akismet spam check.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Drain the queue and report the result.
+
+        """
+        sent, failed, discarded = drain_queue(
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            concurrency=options["concurrency"],
+            retries=options["retries"],
+        )
+        self.stdout.write(
+            f"Sent {sent} message(s); {failed} failed; {discarded} discarded as spam."
+        )
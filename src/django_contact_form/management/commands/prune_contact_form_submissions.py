@@ -0,0 +1,49 @@
+"""
+Management command to delete old stored contact-form submissions.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from django_contact_form.models import Submission
+
+
+class Command(BaseCommand):
+    """
+    Delete stored contact-form submissions older than a retention period.
+
+    """
+
+    help = "Delete stored contact-form submissions older than a retention period."
+
+    def add_arguments(self, parser):
+        """
+        Add the retention-period and chunk-size arguments.
+
+        """
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Delete submissions older than this many days.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of submissions to delete in each query.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Prune the submissions and report the result.
+
+        """
+        before = timezone.now() - datetime.timedelta(days=options["days"])
+        deleted = Submission.objects.prune(before, chunk_size=options["chunk_size"])
+        self.stdout.write(f"Deleted {deleted} submission(s).")
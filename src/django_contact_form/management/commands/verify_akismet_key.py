@@ -0,0 +1,51 @@
+"""
+Management command to verify the Akismet configuration, for example when deploying.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import akismet
+from django.core.management.base import BaseCommand, CommandError
+
+from django_contact_form._akismet import _default_config, _record_verified
+
+
+class Command(BaseCommand):
+    """
+    Verify the Akismet API key and site URL with the Akismet web service.
+
+    """
+
+    help = (
+        "Verify the Akismet API key and site URL, optionally recording the result in a "
+        "cache so that running processes need not verify it themselves."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add the cache and timeout arguments.
+
+        """
+        parser.add_argument(
+            "--cache",
+            help="Alias of the cache in which to record a successful verification.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=86400,
+            help="Number of seconds for which to record the verification.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Verify the configuration and report the result.
+
+        """
+        config, message = _default_config()
+        if not akismet.SyncClient(config=config).verify_key(config.key, config.url):
+            raise CommandError(message)
+        if options["cache"] is not None:
+            _record_verified(config, options["cache"], options["timeout"])
+        self.stdout.write(f"Verified the Akismet configuration for {config.url}.")
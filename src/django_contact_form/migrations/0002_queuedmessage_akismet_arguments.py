@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:19
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_contact_form", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queuedmessage",
+            name="akismet_arguments",
+            field=models.JSONField(
+                blank=True,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                null=True,
+                verbose_name="Akismet arguments",
+            ),
+        ),
+    ]
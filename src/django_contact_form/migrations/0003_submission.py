@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:33
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_contact_form", "0002_queuedmessage_akismet_arguments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Submission",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "site",
+                    models.CharField(blank=True, max_length=255, verbose_name="site"),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "email",
+                    models.EmailField(blank=True, max_length=254, verbose_name="email"),
+                ),
+                (
+                    "ip_address",
+                    models.GenericIPAddressField(
+                        blank=True, null=True, verbose_name="IP address"
+                    ),
+                ),
+                (
+                    "message",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="message",
+                    ),
+                ),
+                (
+                    "is_spam",
+                    models.BooleanField(blank=True, null=True, verbose_name="is spam"),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="content hash"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "submission",
+                "verbose_name_plural": "submissions",
+                "ordering": ["-created"],
+                "indexes": [
+                    models.Index(fields=["created"], name="dcf_submission_created"),
+                    models.Index(
+                        fields=["site", "created"], name="dcf_submission_site"
+                    ),
+                    models.Index(
+                        fields=["email", "created"], name="dcf_submission_email"
+                    ),
+                    models.Index(
+                        fields=["is_spam", "created"], name="dcf_submission_spam"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_contact_form", "0003_submission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Route",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "topic",
+                    models.CharField(blank=True, max_length=100, verbose_name="topic"),
+                ),
+                (
+                    "site",
+                    models.CharField(blank=True, max_length=255, verbose_name="site"),
+                ),
+                (
+                    "language",
+                    models.CharField(
+                        blank=True, max_length=15, verbose_name="language"
+                    ),
+                ),
+                ("recipients", models.JSONField(verbose_name="recipients")),
+            ],
+            options={
+                "verbose_name": "route",
+                "verbose_name_plural": "routes",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("topic", "site", "language"), name="dcf_route_unique"
+                    )
+                ],
+            },
+        ),
+    ]
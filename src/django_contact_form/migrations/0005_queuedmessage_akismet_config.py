@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_contact_form", "0004_route"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queuedmessage",
+            name="akismet_key",
+            field=models.CharField(
+                blank=True, max_length=255, verbose_name="Akismet API key"
+            ),
+        ),
+        migrations.AddField(
+            model_name="queuedmessage",
+            name="akismet_url",
+            field=models.CharField(
+                blank=True, max_length=255, verbose_name="Akismet site URL"
+            ),
+        ),
+    ]
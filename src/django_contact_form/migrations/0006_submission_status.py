@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_contact_form", "0005_queuedmessage_akismet_config"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queuedmessage",
+            name="submission",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="django_contact_form.submission",
+                verbose_name="submission",
+            ),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "pending"),
+                    ("sent", "sent"),
+                    ("queued", "queued"),
+                    ("failed", "failed"),
+                    ("spam", "spam"),
+                ],
+                default="pending",
+                max_length=10,
+                verbose_name="status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["status", "created"], name="dcf_submission_status"
+            ),
+        ),
+    ]
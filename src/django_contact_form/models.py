@@ -0,0 +1,313 @@
+"""
+Models used by django-contact-form's optional features.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class QueuedMessage(models.Model):
+    """
+    A contact-form message awaiting delivery, stored by
+    :class:`~django_contact_form.delivery.DatabaseDeliveryBackend`.
+
+    .. attribute:: message
+
+       The return value of
+       :meth:`~django_contact_form.forms.ContactForm.get_message_dict`, stored as JSON.
+
+    .. attribute:: akismet_arguments
+
+       If not :data:`None`, the message has not yet been checked for spam, and these
+       arguments (the return value of
+       :meth:`~django_contact_form.forms.AkismetContactForm.get_akismet_check_arguments`)
+       will be passed to Akismet before the message is sent.
+
+    .. attribute:: akismet_key
+
+       The Akismet API key to check the message with, from the form's
+       :meth:`~django_contact_form.forms.AkismetContactForm.get_akismet_config`, or
+       blank to use the configuration in your environment variables.
+
+    .. attribute:: akismet_url
+
+       The site URL to identify the message to Akismet by, alongside
+       :attr:`akismet_key`.
+
+    .. attribute:: submission
+
+       The stored :class:`Submission` the message was generated from, if any, whose
+       spam verdict and status are updated when the message is checked and sent.
+
+    .. attribute:: created
+
+       The date and time the message was queued.
+
+    .. attribute:: attempts
+
+       The number of failed attempts to send the message.
+
+    .. attribute:: last_error
+
+       The error message from the most recent failed attempt to send the message.
+
+    """
+
+    message = models.JSONField(_("message"), encoder=DjangoJSONEncoder)
+    akismet_arguments = models.JSONField(
+        _("Akismet arguments"), encoder=DjangoJSONEncoder, blank=True, null=True
+    )
+    akismet_key = models.CharField(_("Akismet API key"), max_length=255, blank=True)
+    akismet_url = models.CharField(_("Akismet site URL"), max_length=255, blank=True)
+    submission = models.ForeignKey(
+        "Submission",
+        verbose_name=_("submission"),
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    created = models.DateTimeField(_("created"), auto_now_add=True, db_index=True)
+    attempts = models.PositiveIntegerField(_("attempts"), default=0)
+    last_error = models.TextField(_("last error"), blank=True)
+
+    class Meta:
+        """
+        Model options: the queue is processed oldest first.
+
+        """
+
+        ordering = ["created"]
+        verbose_name = _("queued message")
+        verbose_name_plural = _("queued messages")
+
+    def __str__(self):
+        return str(self.message.get("subject", ""))
+
+
+class Route(models.Model):
+    """
+    A route sending contact-form messages on a topic, to a site, or in a language, to
+    a list of recipients, used by :data:`~django_contact_form.routing.database_routes`.
+
+    .. attribute:: topic
+
+       The topic the route applies to, or blank for any topic.
+
+    .. attribute:: site
+
+       The domain of the site the route applies to, or blank for any site.
+
+    .. attribute:: language
+
+       The language code the route applies to, or blank for any language.
+
+    .. attribute:: recipients
+
+       The list of email addresses to send matching messages to.
+
+    """
+
+    topic = models.CharField(_("topic"), max_length=100, blank=True)
+    site = models.CharField(_("site"), max_length=255, blank=True)
+    language = models.CharField(_("language"), max_length=15, blank=True)
+    recipients = models.JSONField(_("recipients"))
+
+    class Meta:
+        """
+        Model options: each combination of topic, site and language has one route.
+
+        """
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "site", "language"], name="dcf_route_unique"
+            )
+        ]
+        verbose_name = _("route")
+        verbose_name_plural = _("routes")
+
+    def __str__(self):
+        return ", ".join(self.recipients)
+
+
+class SubmissionQuerySet(models.QuerySet):
+    """
+    Query methods for :class:`Submission`.
+
+    .. automethod:: record_many
+
+    .. automethod:: prune
+
+    """
+
+    def record_many(self, forms, batch_size: int = 500) -> list:
+        """
+        Store the submissions of many valid contact forms, in bulk, and return the
+        created :class:`Submission` instances.
+
+        """
+        return self.bulk_create(
+            [Submission.from_form(form) for form in forms], batch_size=batch_size
+        )
+
+    def prune(self, before, chunk_size: int = 1000) -> int:
+        """
+        Delete submissions created before the given date and time, in chunks of
+        ``chunk_size`` rows so that no single query locks much of the table, and
+        return the number deleted.
+
+        """
+        deleted = 0
+        while True:
+            chunk = list(
+                self.filter(created__lt=before)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not chunk:
+                return deleted
+            deleted += self.filter(pk__in=chunk).delete()[0]
+
+
+class Submission(models.Model):
+    """
+    A record of a contact-form submission, stored when the form's
+    :attr:`~django_contact_form.forms.ContactForm.store_submissions` attribute is
+    set: by :meth:`~django_contact_form.forms.ContactForm.save`, before the message
+    is delivered, or, for a submission rejected as spam, during validation.
+
+    .. attribute:: site
+
+       The domain of the site the submission was made to.
+
+    .. attribute:: created
+
+       The date and time of the submission.
+
+    .. attribute:: email
+
+       The sender's email address, if the form has an ``email`` field.
+
+    .. attribute:: ip_address
+
+       The IP address the submission came from.
+
+    .. attribute:: message
+
+       The return value of
+       :meth:`~django_contact_form.forms.ContactForm.get_message_dict`, stored as JSON,
+       so that the message can be sent again.
+
+    .. attribute:: is_spam
+
+       The spam verdict: :data:`True` for a submission rejected as spam,
+       :data:`False` for one which passed a spam check, or :data:`None` if it wasn't
+       checked (for example, by a form without spam filtering, or one which deferred
+       the check and whose message is still queued).
+
+    .. attribute:: status
+
+       The delivery status of the message, one of the :class:`Submission.Status`
+       values:
+
+       ``"pending"``
+          Stored, but not yet delivered.
+
+       ``"sent"``
+          Sent.
+
+       ``"queued"``
+          Handed to a delivery backend, or queued to be checked for spam and sent
+          later.
+
+       ``"failed"``
+          Could not be sent, and can be re-sent from :attr:`message`.
+
+       ``"spam"``
+          Rejected as spam, and not sent.
+
+    .. attribute:: content_hash
+
+       A hash of the submitted data (see
+       :meth:`~django_contact_form.forms.ContactForm.get_content_hash`), for finding
+       duplicate submissions.
+
+    .. automethod:: from_form
+
+    """
+
+    class Status(models.TextChoices):  # pylint: disable=too-many-ancestors
+        """
+        The delivery statuses of a submission.
+
+        """
+
+        PENDING = "pending", _("pending")
+        SENT = "sent", _("sent")
+        QUEUED = "queued", _("queued")
+        FAILED = "failed", _("failed")
+        SPAM = "spam", _("spam")
+
+    site = models.CharField(_("site"), max_length=255, blank=True)
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    email = models.EmailField(_("email"), blank=True)
+    ip_address = models.GenericIPAddressField(_("IP address"), blank=True, null=True)
+    message = models.JSONField(_("message"), encoder=DjangoJSONEncoder)
+    is_spam = models.BooleanField(_("is spam"), blank=True, null=True)
+    status = models.CharField(
+        _("status"), max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    content_hash = models.CharField(_("content hash"), max_length=64, db_index=True)
+
+    objects = SubmissionQuerySet.as_manager()
+
+    class Meta:
+        """
+        Model options: indexes support listing each site's, sender's, verdict's and
+        status's submissions newest first, and pruning by age.
+
+        """
+
+        ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["created"], name="dcf_submission_created"),
+            models.Index(fields=["site", "created"], name="dcf_submission_site"),
+            models.Index(fields=["email", "created"], name="dcf_submission_email"),
+            models.Index(fields=["is_spam", "created"], name="dcf_submission_spam"),
+            models.Index(fields=["status", "created"], name="dcf_submission_status"),
+        ]
+        verbose_name = _("submission")
+        verbose_name_plural = _("submissions")
+
+    def __str__(self):
+        return str(self.message.get("subject", ""))
+
+    @classmethod
+    def from_form(cls, form, message_dict=None, status=Status.PENDING) -> "Submission":
+        """
+        Return a new, unsaved, instance recording the submission of a valid contact
+        form, with the given :attr:`status`. Pass ``message_dict`` if the form's
+        :meth:`~django_contact_form.forms.ContactForm.get_message_dict` has already
+        been called, to avoid generating the message again.
+
+        """
+        if message_dict is None:
+            message_dict = form.get_message_dict()
+        return cls(
+            site=form.get_message_context()["site"].domain,
+            email=form.cleaned_data.get("email") or "",
+            ip_address=form.request.META.get("REMOTE_ADDR") or None,
+            # As delivery.serialize_message_dict() does; that module imports this
+            # one, so isn't imported here.
+            message=json.loads(json.dumps(message_dict, cls=DjangoJSONEncoder)),
+            is_spam=form._spam_verdict(),  # pylint: disable=protected-access
+            status=status,
+            content_hash=form.get_content_hash(),
+        )
@@ -0,0 +1,139 @@
+"""
+Rate limiting for contact-form submissions, applied before the form is even
+constructed.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import hashlib
+import time
+import typing
+
+from asgiref.sync import sync_to_async
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import caches
+
+
+def _ip(request, data) -> typing.Optional[str]:  # pylint: disable=unused-argument
+    """
+    Return the IP address a request came from.
+
+    """
+    return request.META.get("REMOTE_ADDR")
+
+
+def _email(request, data) -> typing.Optional[str]:  # pylint: disable=unused-argument
+    """
+    Return the (normalized) email address submitted with a request, if any.
+
+    """
+    email = data.get("email")
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower() or None
+
+
+def _site(request, data) -> typing.Optional[str]:  # pylint: disable=unused-argument
+    """
+    Return the domain of the site a request was made to.
+
+    """
+    return get_current_site(request).domain
+
+
+class RateLimit:
+    """
+    Limit the number of submissions sharing some property -- the IP address they came
+    from, the email address they give, or the site they were made to -- to ``rate``
+    per ``period`` seconds.
+
+    Submissions are counted in a Django cache, using its atomic increment operation,
+    so the limit is shared by all processes using the cache. Each property value gets
+    a bucket of ``rate`` submissions, refilled at the start of each period.
+
+    :param key: What to limit submissions by: ``"ip"``, ``"email"`` or ``"site"``, or a
+       callable which takes the request and the submitted data (see :meth:`allow`)
+       and returns a string (or :data:`None` to exempt the request from this limit).
+
+    :param rate: The number of submissions permitted per period.
+
+    :param period: The length of the period, in seconds.
+
+    :param cache_alias: The alias of the Django cache in which to count submissions.
+
+    .. automethod:: allow
+
+    .. automethod:: aallow
+
+    """
+
+    KEY_FUNCTIONS = {"ip": _ip, "email": _email, "site": _site}
+
+    def __init__(
+        self,
+        key: typing.Union[str, typing.Callable] = "ip",
+        rate: int = 5,
+        period: int = 60,
+        cache_alias: str = "default",
+    ):
+        self.key = key
+        self.key_function = self.KEY_FUNCTIONS[key] if isinstance(key, str) else key
+        self.rate = rate
+        self.period = period
+        self.cache_alias = cache_alias
+
+    def _cache_key(self, request, data) -> typing.Optional[str]:
+        """
+        Return the cache key counting the current period's submissions for the
+        request, or :data:`None` if the request is exempt.
+
+        """
+        value = self.key_function(request, request.POST if data is None else data)
+        if value is None:
+            return None
+        name = self.key if isinstance(self.key, str) else self.key.__name__
+        digest = hashlib.sha256(value.encode()).hexdigest()
+        window = int(time.time() // self.period)
+        return f"django_contact_form:ratelimit:{name}:{self.rate}:{digest}:{window}"
+
+    def allow(self, request, data: typing.Optional[dict] = None) -> bool:
+        """
+        Count a submission, and return whether it is within the limit.
+
+        ``data`` is the submitted data, for keys which depend on it. By default, this
+        is the request's :attr:`~django.http.HttpRequest.POST` data; views which
+        accept other kinds of request body, such as
+        :class:`~django_contact_form.views.ContactFormAPIView`, pass the parsed body.
+
+        """
+        key = self._cache_key(request, data)
+        if key is None:
+            return True
+        cache = caches[self.cache_alias]
+        cache.add(key, 0, self.period)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # The count expired between the add() and the incr().
+            cache.add(key, 1, self.period)
+            count = 1
+        return count <= self.rate
+
+    async def aallow(self, request, data: typing.Optional[dict] = None) -> bool:
+        """
+        Async version of :meth:`allow`.
+
+        """
+        # Looking up the site may query the database.
+        key = await sync_to_async(self._cache_key)(request, data)
+        if key is None:
+            return True
+        cache = caches[self.cache_alias]
+        await cache.aadd(key, 0, self.period)
+        try:
+            count = await cache.aincr(key)
+        except ValueError:
+            await cache.aadd(key, 1, self.period)
+            count = 1
+        return count <= self.rate
@@ -0,0 +1,119 @@
+"""
+Renderers which produce the subject and body of contact-form messages from their
+templates.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import functools
+import string
+
+from django.template import TemplateDoesNotExist, loader
+
+
+@functools.lru_cache(maxsize=128)
+def _load_template(template_name):
+    """
+    Load and return the compiled template for a template name (or tuple of template
+    names, to select the first one which exists), caching the result.
+
+    """
+    if isinstance(template_name, tuple):
+        return loader.select_template(template_name)
+    return loader.get_template(template_name)
+
+
+def _get_template(template_name):
+    """
+    Return the compiled template for a template name or list of template names.
+
+    """
+    if isinstance(template_name, list):
+        template_name = tuple(template_name)
+    return _load_template(template_name)
+
+
+def clear_template_cache(**kwargs):
+    """
+    Clear the cache of compiled templates used for rendering messages.
+
+    This is called automatically when templates are reloaded during development, or
+    when the :setting:`TEMPLATES` setting is changed during tests.
+
+    """
+    if kwargs.get("setting", "TEMPLATES") == "TEMPLATES":
+        _load_template.cache_clear()
+
+
+class TemplateRenderer:  # pylint: disable=too-few-public-methods
+    """
+    Render messages with the Django template engine, as
+    :func:`django.template.loader.render_to_string` would, but using a cache of
+    compiled templates (shared by all renderers, and holding up to 128 templates), so
+    the template loaders are only consulted the first time a given template name is
+    used.
+
+    :param context_processors: Whether to render with the current request, so that
+       the context processors configured in the :setting:`TEMPLATES` setting run and
+       add their variables to the context. Every context processor runs for every
+       message, so if your templates don't use their variables, set this to
+       :data:`False` to skip them.
+
+    """
+
+    def __init__(self, context_processors: bool = True):
+        self.context_processors = context_processors
+
+    def render(self, template_name, context: dict, request) -> str:
+        """
+        Render the template with the given name (or the first which exists, of a list
+        of names).
+
+        """
+        return _get_template(template_name).render(
+            context, request if self.context_processors else None
+        )
+
+
+class FormatRenderer:  # pylint: disable=too-few-public-methods
+    """
+    Render messages from Python format strings (see :meth:`str.format`), bypassing
+    the Django template engine entirely.
+
+    Each format string is checked when the renderer is created, and is filled in
+    with the message context (for example, ``"{name} <{email}> wrote:\\n\\n{body}"``
+    or ``"Message via {site.domain}"``). Values are inserted as they are, without
+    HTML escaping, so don't use this renderer for HTML messages.
+
+    :param templates: A :class:`dict` mapping template names (such as the form's
+       :attr:`~django_contact_form.forms.ContactForm.template_name` and
+       :attr:`~django_contact_form.forms.ContactForm.subject_template_name`) to the
+       format strings to render in their place.
+
+    :raises ValueError: When a format string is malformed.
+
+    """
+
+    def __init__(self, templates: dict):
+        formatter = string.Formatter()
+        for template in templates.values():
+            list(formatter.parse(template))
+        self.templates = dict(templates)
+
+    def render(  # pylint: disable=unused-argument
+        self, template_name, context: dict, request
+    ) -> str:
+        """
+        Fill in the format string for the given template name (or the first which
+        exists, of a list of names).
+
+        :raises django.template.TemplateDoesNotExist: When there is no format string
+           for the template name.
+
+        """
+        names = [template_name] if isinstance(template_name, str) else template_name
+        for name in names:
+            if name in self.templates:
+                return self.templates[name].format_map(context)
+        raise TemplateDoesNotExist(", ".join(names))
@@ -0,0 +1,148 @@
+"""
+Routing of contact-form messages to recipients by topic, site and language.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import threading
+import time
+import typing
+
+from django.conf import settings
+
+
+def compile_routes(routes: typing.Iterable) -> dict:
+    """
+    Compile an iterable of routes into a routing table: a dictionary mapping
+    ``(topic, site, language)`` tuples to lists of recipients.
+
+    Each route is a dictionary with the key ``recipients`` (a list of email
+    addresses), and optionally the keys ``topic``, ``site`` (a domain) and
+    ``language`` (a language code). An omitted or empty key matches any value.
+
+    """
+    table = {}
+    for route in routes:
+        key = tuple(route.get(part) or None for part in ("topic", "site", "language"))
+        table[key] = list(route["recipients"])
+    return table
+
+
+class RoutingTable:
+    """
+    A compiled, in-memory table of routes (see :func:`compile_routes`), loaded from
+    a source of routes when first needed and reused until :meth:`reload` is called.
+
+    :param loader: A callable returning an iterable of routes.
+
+    :param max_age: If given, the number of seconds after which the routes are
+       loaded again, so that changes made by other processes are picked up.
+
+    .. automethod:: resolve
+
+    .. automethod:: reload
+
+    """
+
+    def __init__(self, loader: typing.Callable, max_age: "float | None" = None):
+        self.loader = loader
+        self.max_age = max_age
+        self._table = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _get_table(self) -> dict:
+        """
+        Return the compiled table, loading it if necessary.
+
+        """
+        table = self._table
+        if self._is_fresh(table):
+            return table
+        with self._lock:
+            # Another thread may have loaded the table, or discarded it, meanwhile.
+            if not self._is_fresh(self._table):
+                self._table = compile_routes(self.loader())
+                self._loaded_at = time.monotonic()
+            return self._table
+
+    def _is_fresh(self, table) -> bool:
+        """
+        Return whether the given compiled table is loaded and not too old to use.
+
+        """
+        return table is not None and (
+            self.max_age is None or time.monotonic() - self._loaded_at < self.max_age
+        )
+
+    def resolve(
+        self, topic=None, site: "str | None" = None, language: "str | None" = None
+    ) -> "list | None":
+        """
+        Return the recipients for a message on the given topic, to the given site (a
+        domain), in the given language, or :data:`None` if no route matches.
+
+        The most specific matching route is used: a route matching the topic is
+        preferred to one matching any topic, then likewise for the site, and then
+        for the language.
+
+        """
+        table = self._get_table()
+        for key in (
+            (topic, site, language),
+            (topic, site, None),
+            (topic, None, language),
+            (topic, None, None),
+            (None, site, language),
+            (None, site, None),
+            (None, None, language),
+            (None, None, None),
+        ):
+            recipients = table.get(key)
+            if recipients is not None:
+                return list(recipients)
+        return None
+
+    def reload(self, **kwargs) -> None:  # pylint: disable=unused-argument
+        """
+        Discard the compiled table, so that the routes are loaded again when next
+        needed. Accepts (and ignores) keyword arguments, so that it can be connected
+        directly to signals.
+
+        """
+        with self._lock:
+            self._table = None
+
+
+def _routes_from_settings() -> list:
+    """
+    Return the routes in the :setting:`CONTACT_FORM_ROUTES` setting.
+
+    """
+    return getattr(settings, "CONTACT_FORM_ROUTES", [])
+
+
+def _routes_from_database() -> list:
+    """
+    Return the routes stored as :class:`~django_contact_form.models.Route` instances.
+
+    """
+    from .models import Route  # pylint: disable=import-outside-toplevel
+
+    return Route.objects.values("topic", "site", "language", "recipients")
+
+
+def _settings_changed(setting, **kwargs) -> None:  # pylint: disable=unused-argument
+    """
+    Reload :data:`settings_routes` when the :setting:`CONTACT_FORM_ROUTES` setting
+    changes.
+
+    """
+    if setting == "CONTACT_FORM_ROUTES":
+        settings_routes.reload()
+
+
+settings_routes = RoutingTable(_routes_from_settings)
+
+database_routes = RoutingTable(_routes_from_database, max_age=60)
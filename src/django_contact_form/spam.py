@@ -0,0 +1,252 @@
+"""
+Cheap local spam checks, which can run before (and avoid the need for) a remote
+Akismet spam check.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import ipaddress
+import re
+import threading
+import time
+import typing
+
+from django.core import signing
+
+# Each check is a callable which takes the form instance and returns one of these, or
+# None if it cannot decide.
+SPAM = True
+HAM = False
+
+
+class HoneypotCheck:  # pylint: disable=too-few-public-methods
+    """
+    Classify a submission as spam if a "honeypot" field -- one which is hidden from
+    human users, so that only bots fill it in -- has a value.
+
+    You are responsible for adding the field to your form and hiding it; for
+    example, with a ``forms.CharField(required=False)`` hidden via CSS.
+
+    :param field_name: The name of the honeypot field.
+
+    """
+
+    def __init__(self, field_name: str = "website"):
+        self.field_name = field_name
+
+    def __call__(self, form) -> typing.Optional[bool]:
+        if form.cleaned_data.get(self.field_name):
+            return SPAM
+        return None
+
+
+class MinimumTimeCheck:
+    """
+    Classify a submission as spam if it was submitted less than ``min_seconds`` after
+    the form was displayed, which is faster than a human can fill in a form.
+
+    The time the form was displayed is read from a hidden field containing a signed
+    timestamp, which you must add to your form; for example:
+
+    .. code-block:: python
+
+        rendered_at = forms.CharField(
+            widget=forms.HiddenInput,
+            required=False,
+            initial=MinimumTimeCheck.timestamp,
+        )
+
+    Submissions in which the field is missing, has been tampered with, or is older
+    than ``max_age`` are classified as spam, so that a timestamp harvested once can't
+    be replayed indefinitely. Since the timestamp is computed each time the form is
+    rendered, a view with a page cache renders such a form afresh instead.
+
+    :param field_name: The name of the timestamp field.
+
+    :param min_seconds: The minimum plausible time to fill in the form.
+
+    :param max_age: The maximum plausible time to fill in the form, in seconds, or
+       :data:`None` to accept timestamps of any age.
+
+    .. automethod:: timestamp
+
+    """
+
+    salt = "django_contact_form.spam.MinimumTimeCheck"
+
+    def __init__(
+        self,
+        field_name: str = "rendered_at",
+        min_seconds: float = 2,
+        max_age: typing.Optional[float] = 86400,
+    ):
+        self.field_name = field_name
+        self.min_seconds = min_seconds
+        self.max_age = max_age
+
+    @classmethod
+    def timestamp(cls) -> str:
+        """
+        Return a signed timestamp of the current time, for use as the initial value of
+        the timestamp field.
+
+        """
+        return signing.dumps(time.time(), salt=cls.salt)
+
+    def __call__(self, form) -> typing.Optional[bool]:
+        try:
+            rendered_at = signing.loads(
+                str(form.cleaned_data.get(self.field_name) or ""),
+                salt=self.salt,
+                max_age=self.max_age,
+            )
+        except signing.BadSignature:  # Including signing.SignatureExpired.
+            return SPAM
+        if time.time() - rendered_at < self.min_seconds:
+            return SPAM
+        return None
+
+
+class LinkCountCheck:  # pylint: disable=too-few-public-methods
+    """
+    Classify a submission as spam if a field contains more than ``max_links`` links.
+
+    :param max_links: The maximum number of links permitted.
+
+    :param field_name: The name of the field to check.
+
+    """
+
+    link_pattern = re.compile(r"https?://|www\.", re.IGNORECASE)
+
+    def __init__(self, max_links: int = 3, field_name: str = "body"):
+        self.max_links = max_links
+        self.field_name = field_name
+
+    def __call__(self, form) -> typing.Optional[bool]:
+        value = form.cleaned_data.get(self.field_name) or ""
+        if len(self.link_pattern.findall(value)) > self.max_links:
+            return SPAM
+        return None
+
+
+class NetworkCheck:  # pylint: disable=too-few-public-methods
+    """
+    Classify a submission by the IP address it was submitted from.
+
+    :param networks: An iterable of IP networks, as strings (for example,
+       ``"192.0.2.0/24"``) or :mod:`ipaddress` network objects.
+
+    :param is_spam: The verdict to return for submissions from those networks:
+       :data:`True` (the default) to block the networks, or :data:`False` to trust
+       them and skip remote spam checks for them.
+
+    """
+
+    def __init__(self, networks: typing.Iterable, is_spam: bool = SPAM):
+        self.networks = [ipaddress.ip_network(network) for network in networks]
+        self.is_spam = is_spam
+
+    def __call__(self, form) -> typing.Optional[bool]:
+        try:
+            address = ipaddress.ip_address(form.request.META.get("REMOTE_ADDR", ""))
+        except ValueError:
+            return None
+        if any(address in network for network in self.networks):
+            return self.is_spam
+        return None
+
+
+def run_checks(checks: typing.Iterable, form) -> typing.Optional[bool]:
+    """
+    Run the given checks against a form in order, and return the first verdict
+    (:data:`True` for spam, :data:`False` for non-spam) any of them reaches, or
+    :data:`None` if none of them could decide.
+
+    """
+    for check in checks:
+        verdict = check(form)
+        if verdict is not None:
+            return verdict
+    return None
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a remote spam check is skipped because its circuit breaker is open.
+
+    """
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker for a remote spam-check service.
+
+    The breaker starts out closed, allowing calls through. After ``failure_threshold``
+    consecutive failures it opens, and calls are refused (so that a slow or failing
+    service doesn't tie up your workers) until ``reset_timeout`` seconds have passed.
+    It then becomes half-open, allowing a single probe call through: if the probe
+    succeeds the breaker closes, and if it fails the breaker opens again.
+
+    :param failure_threshold: The number of consecutive failures after which to open.
+
+    :param reset_timeout: The number of seconds to wait before probing the service
+       again once open.
+
+    .. automethod:: allow
+
+    .. automethod:: record_success
+
+    .. automethod:: record_failure
+
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Return whether a call should be attempted now.
+
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let one probe through; further probes wait for another timeout, in
+                # case this one never reports back.
+                self.state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call, closing the breaker.
+
+        """
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call, opening the breaker if the failure threshold has been
+        reached or a probe call has failed.
+
+        """
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,80 @@
+"""
+An upload handler which enforces a size limit on uploaded files while they are being
+received.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """
+    An upload handler which stops accepting the contents of an uploaded file as soon
+    as it exceeds :attr:`max_size` bytes, so that oversized files are never held in
+    memory or written to temporary files in full.
+
+    An oversized file is replaced by an empty placeholder whose ``size`` is the number
+    of bytes received, so that form validation (for example, of
+    :attr:`~django_contact_form.forms.AttachmentContactForm.max_attachment_size`)
+    rejects it as usual.
+
+    Upload handlers must be installed before the request's files are first read,
+    which for most sites means in the :setting:`FILE_UPLOAD_HANDLERS` setting, ahead
+    of Django's own handlers:
+
+    .. code-block:: python
+
+        FILE_UPLOAD_HANDLERS = [
+            "django_contact_form.uploads.MaxSizeUploadHandler",
+            "django.core.files.uploadhandler.MemoryFileUploadHandler",
+            "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+        ]
+
+    The limit then applies to every upload to the site. To change it, subclass this
+    handler, set :attr:`max_size`, and install the subclass instead.
+
+    .. attribute:: max_size
+
+       The largest permitted file, in bytes. By default, this is 10 MiB.
+
+    """
+
+    max_size = 10 * 1024 * 1024
+
+    received = 0
+
+    def new_file(self, *args, **kwargs):
+        """
+        Start receiving a file.
+
+        """
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Pass a chunk of the file on to the next handler, until the file exceeds
+        :attr:`max_size`.
+
+        """
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        """
+        Return a placeholder for the file if it exceeded :attr:`max_size`, or
+        :data:`None` to let the next handler return the file.
+
+        """
+        if self.received <= self.max_size:
+            return None
+        placeholder = SimpleUploadedFile(
+            self.file_name, b"", content_type=self.content_type
+        )
+        placeholder.size = self.received
+        return placeholder
@@ -5,10 +5,66 @@ View which can render and send email from a contact form.
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.middleware.csrf import get_token
 from django.urls import reverse_lazy
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import TemplateView, View
 from django.views.generic.edit import FormView
 
 from .forms import ContactForm
+from .instrumentation import timed
+
+# Rendered in place of the CSRF token in cached pages, and replaced by the real token
+# when a page is served.
+_CSRF_TOKEN_PLACEHOLDER = "django-contact-form-csrf-token-placeholder"
+
+
+def _content_length(request) -> int:
+    """
+    Return the size of a request's body, according to its headers.
+
+    """
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+
+
+class RequestBodyError(Exception):
+    """
+    Raised by :meth:`ContactFormAPIView.get_data` when a request's body can't be
+    accepted as a submission.
+
+    .. attribute:: message
+
+       The error message to send in the response.
+
+    .. attribute:: status
+
+       The HTTP status code of the response.
+
+    """
+
+    def __init__(self, message, status: int):
+        self.message = message
+        self.status = status
+        super().__init__(message, status)
 
 
 class ContactFormView(FormView):
@@ -61,19 +117,247 @@ class ContactFormView(FormView):
 
     .. automethod:: get_form_kwargs
 
+    To protect the form against floods of submissions, set:
+
+    .. attribute:: rate_limits
+
+       A list of :class:`~django_contact_form.ratelimit.RateLimit` instances. A
+       submission exceeding any of them is rejected before the form is even
+       constructed, by returning the response from :meth:`rate_limited`. By default,
+       this is an empty list.
+
+    .. automethod:: rate_limited
+
+    Much of a contact form's traffic is usually visits which only display the form.
+    To avoid rendering the form page afresh for each of them, set:
+
+    .. attribute:: page_cache_alias
+
+       The alias of a Django cache in which to keep the rendered form page, for
+       :attr:`page_cache_timeout` seconds. The page is cached once for each view,
+       form class, template, site and language (see :meth:`get_page_cache_key`), with
+       a placeholder in place of the CSRF token, which is replaced by the current
+       user's token each time the page is served. Served pages carry an ``ETag``, so
+       that browsers can revalidate them cheaply, and a ``Vary`` header naming
+       ``Cookie`` and ``Accept-Language``. Only use this if the page is otherwise the
+       same for every user; for example, if your template displays the logged-in
+       user's name, do not. The page is never cached if any of the form's fields has
+       a callable ``initial`` value, such as the signed timestamp read by
+       :class:`~django_contact_form.spam.MinimumTimeCheck`, since that value must be
+       computed afresh each time the page is rendered. By default, this is
+       :data:`None`, and the page is rendered for each request.
+
+    .. attribute:: page_cache_timeout
+
+       The number of seconds to cache the rendered form page for, when
+       :attr:`page_cache_alias` is set. By default, this is ``300``.
+
+    .. automethod:: get_page_cache_key
+
+    After a successful submission, the view redirects to :attr:`success_url`, which
+    costs the user's browser another request. To respond with a page directly
+    instead, set:
+
+    .. attribute:: success_template_name
+
+       A :class:`str`, the name of a template to render (with a
+       :class:`~django.template.RequestContext`, but no additional context variables)
+       as the response to a successful submission, in place of the redirect. If
+       :attr:`page_cache_alias` is set, the rendered page is cached there, once for
+       each view, template, site and language. Note that, without the redirect,
+       reloading the page in the browser will offer to submit the form again. By
+       default, this is :data:`None`, and the view redirects.
+
+    .. automethod:: render_success
+
     """
 
+    RATE_LIMITED_MESSAGE = _(
+        "Too many messages have been sent. Please try again later."
+    )
+
     form_class = ContactForm
+    page_cache_alias = None
+    page_cache_timeout = 300
+    success_template_name = None
+    rate_limits = []
     recipient_list = None
     success_url = reverse_lazy("django_contact_form_sent")
     template_name = "django_contact_form/contact_form.html"
 
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests by displaying an unbound form, from the page cache if
+        :attr:`page_cache_alias` is set and the page can be cached.
+
+        """
+        if self.page_cache_alias is None or not self._page_is_cacheable():
+            return super().get(request, *args, **kwargs)
+        content, content_type, digest = self._cached_page(
+            self.get_page_cache_key, self._render_page
+        )
+        token = get_token(request)
+        # The token embedded in a page stays valid as long as the CSRF secret does, so
+        # a page the browser already has can be reused until either changes.
+        etag = quote_etag(
+            hashlib.sha256(
+                f"{digest}:{request.META['CSRF_COOKIE']}".encode()
+            ).hexdigest()
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                content.replace(_CSRF_TOKEN_PLACEHOLDER, token),
+                content_type=content_type,
+            )
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Cookie", "Accept-Language"))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_page_cache_key(self) -> str:
+        """
+        Return the key under which to cache the rendered form page, when
+        :attr:`page_cache_alias` is set. By default, this distinguishes pages by
+        view class, URL path, form class, template, site and language; override it if
+        your page varies in other ways.
+
+        """
+        form_class = self.get_form_class()
+        return self._page_cache_key(
+            self.request.path,
+            f"{form_class.__module__}.{form_class.__qualname__}",
+            ",".join(self.get_template_names()),
+        )
+
+    def render_success(self) -> HttpResponse:
+        """
+        Return the response to a successful submission when
+        :attr:`success_template_name` is set: the rendered template, from the page
+        cache if :attr:`page_cache_alias` is set.
+
+        """
+        content, content_type, _ = self._cached_page(
+            lambda: self._page_cache_key("success", self.success_template_name),
+            lambda: self._render(
+                self.response_class(
+                    request=self.request,
+                    template=self.success_template_name,
+                    context={},
+                    using=self.template_engine,
+                )
+            ),
+        )
+        return HttpResponse(content, content_type=content_type)
+
+    def _page_cache_key(self, *parts) -> str:
+        """
+        Return a page-cache key distinguished by the view class, the given parts, and
+        the current site and language.
+
+        """
+        digest = hashlib.sha256(
+            "\n".join(
+                [
+                    f"{type(self).__module__}.{type(self).__qualname__}",
+                    *parts,
+                    get_current_site(self.request).domain,
+                    get_language(),
+                ]
+            ).encode()
+        ).hexdigest()
+        return f"django_contact_form:page:{digest}"
+
+    def _page_is_cacheable(self) -> bool:
+        """
+        Return whether the form page can be cached: not if the form has initial
+        values which are computed when it's rendered.
+
+        """
+        # base_fields is set by the form metaclass.
+        fields = self.get_form_class().base_fields  # pylint: disable=no-member
+        return not any(
+            callable(field.initial) for field in fields.values()
+        ) and not any(callable(value) for value in self.get_initial().values())
+
+    def _cached_page(self, get_key, render) -> tuple:
+        """
+        Return a rendered page from the page cache, under the key returned by
+        ``get_key``, rendering it with ``render`` and caching it if it isn't cached.
+        Without :attr:`page_cache_alias`, just render it.
+
+        """
+        if self.page_cache_alias is None:
+            return render()
+        cache = caches[self.page_cache_alias]
+        key = get_key()
+        page = cache.get(key)
+        if page is None:
+            page = render()
+            cache.set(key, page, self.page_cache_timeout)
+        return page
+
+    def _render_page(self) -> tuple:
+        """
+        Render the form page with a placeholder CSRF token, for caching.
+
+        """
+        return self._render(
+            self.render_to_response(
+                self.get_context_data(csrf_token=_CSRF_TOKEN_PLACEHOLDER)
+            )
+        )
+
+    @staticmethod
+    def _render(response) -> tuple:
+        """
+        Render a template response, and return its content, content type and a
+        digest of its content.
+
+        """
+        response.render()
+        return (
+            response.content.decode(response.charset),
+            response["Content-Type"],
+            hashlib.sha256(response.content).hexdigest(),
+        )
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests by validating the form and, if it's valid, sending the
+        email.
+
+        """
+        with timed("request", self, payload_size=_content_length(request)) as record:
+            for limit in self.rate_limits:
+                if not limit.allow(request):
+                    record["outcome"] = "rate_limited"
+                    return self.rate_limited(limit)
+            return super().post(request, *args, **kwargs)
+
+    def rate_limited(self, limit):
+        """
+        Return the response to a submission which exceeded the given rate limit. By
+        default, this is a plain-text response with status 429 ("Too Many Requests")
+        and a ``Retry-After`` header of the limit's period.
+
+        """
+        response = HttpResponse(
+            self.RATE_LIMITED_MESSAGE,
+            status=429,
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Retry-After"] = str(limit.period)
+        return response
+
     def form_valid(self, form):
         """
         Handle a valid form by sending the email.
 
         """
         form.save()
+        if self.success_template_name is not None:
+            return self.render_success()
         return super().form_valid(form)
 
     def get_form_kwargs(self) -> dict:
@@ -106,3 +390,311 @@ class ContactFormView(FormView):
         if self.recipient_list is not None:
             kwargs.update({"recipient_list": self.recipient_list})
         return kwargs
+
+
+class AsyncContactFormView(ContactFormView):
+    """
+    An async version of :class:`ContactFormView`, for use when serving your site via
+    ASGI.
+
+    This view accepts all the same attributes and methods as :class:`ContactFormView`,
+    but validates the form via its
+    :meth:`~django_contact_form.forms.ContactForm.ais_valid` method and sends the
+    message via its :meth:`~django_contact_form.forms.ContactForm.asave` method, so
+    that (for example) the Akismet spam check of
+    :class:`~django_contact_form.forms.AkismetContactForm` does not block a worker
+    thread.
+
+    To customize the handling of a valid form, override the following method (rather
+    than ``form_valid()``):
+
+    .. automethod:: aform_valid
+
+    """
+
+    async def get(  # pylint: disable=invalid-overridden-method
+        self, request, *args, **kwargs
+    ):
+        """
+        Handle GET requests by displaying an unbound form.
+
+        """
+        if self.page_cache_alias is not None:
+            return await sync_to_async(super().get)(request, *args, **kwargs)
+        return super().get(request, *args, **kwargs)
+
+    async def post(  # pylint: disable=invalid-overridden-method
+        self, request, *args, **kwargs
+    ):
+        """
+        Handle POST requests by validating the form and, if it's valid, sending the
+        email.
+
+        """
+        with timed("request", self, payload_size=_content_length(request)) as record:
+            for limit in self.rate_limits:
+                if not await limit.aallow(request):
+                    record["outcome"] = "rate_limited"
+                    return self.rate_limited(limit)
+            form = self.get_form()
+            if await form.ais_valid():
+                return await self.aform_valid(form)
+            return self.form_invalid(form)
+
+    async def put(self, *args, **kwargs):  # pylint: disable=invalid-overridden-method
+        """
+        Handle PUT requests the same as POST.
+
+        """
+        return await self.post(*args, **kwargs)
+
+    async def aform_valid(self, form):
+        """
+        Handle a valid form by sending the email.
+
+        """
+        await form.asave()
+        if self.success_template_name is not None:
+            return await sync_to_async(self.render_success)()
+        return HttpResponseRedirect(self.get_success_url())
+
+
+class ContactFormSentView(TemplateView):
+    """
+    A view displaying the page users are redirected to after sending a message, as
+    used by the provided URLconfs.
+
+    The page is the same for every user, so responses carry a ``Cache-Control``
+    header allowing browsers and shared caches (such as CDNs) to keep it for
+    :attr:`max_age` seconds. If your ``django_contact_form/contact_form_sent.html``
+    template displays anything specific to the user, use
+    :class:`~django.views.generic.base.TemplateView` instead.
+
+    .. attribute:: template_name
+
+       A :class:`str`, the template to render. By default, this is
+       ``django_contact_form/contact_form_sent.html``.
+
+    .. attribute:: max_age
+
+       The number of seconds for which the page may be cached. By default, this is
+       ``86400`` (one day).
+
+    """
+
+    max_age = 86400
+    template_name = "django_contact_form/contact_form_sent.html"
+
+    def get(self, request, *args, **kwargs):
+        """
+        Display the page, with caching headers.
+
+        """
+        response = super().get(request, *args, **kwargs)
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return response
+
+
+# Requests to the JSON views are exempt from CSRF checks: browsers only send a
+# cross-origin request with a JSON content type after a successful CORS preflight,
+# and the views reject any other content type.
+@method_decorator(csrf_exempt, name="dispatch")
+class ContactFormAPIView(View):
+    """
+    A view accepting contact-form submissions as JSON, for JavaScript front ends and
+    mobile apps. It validates and sends submissions exactly as
+    :class:`ContactFormView` does, but never renders a template (other than those of
+    the message itself) or redirects.
+
+    Submissions must be ``POST`` requests with the content type
+    ``application/json``, whose body is a JSON object mapping the form's field names
+    to their values. The response is JSON too:
+
+    * For a valid submission, status 202 ("Accepted") and an object whose ``id``
+      identifies the submission. If the form's
+      :attr:`~django_contact_form.forms.ContactForm.store_submissions` is set, this
+      is the primary key of the stored
+      :class:`~django_contact_form.models.Submission`. Otherwise, it is the
+      submission's :meth:`~django_contact_form.forms.ContactForm.get_content_hash`,
+      which is shared by identical submissions, so it identifies the submitted data
+      rather than an individual submission.
+
+    * For an invalid submission, status 400 ("Bad Request") and an object whose
+      ``errors`` maps each invalid field's name (or ``"__all__"``, for errors not
+      specific to a field, or a malformed body) to a list of error messages.
+
+    * For a request with another content type, status 415 ("Unsupported Media
+      Type"), and for a submission exceeding one of the :attr:`rate_limits`, status
+      429 ("Too Many Requests"), with ``errors`` as above.
+
+    Requests are exempt from Django's CSRF protection, since browsers only send
+    cross-origin requests with a JSON content type if a CORS preflight request
+    allows them.
+
+    .. attribute:: form_class
+
+       The form class to use. By default, this is
+       :class:`~django_contact_form.forms.ContactForm`.
+
+    .. attribute:: recipient_list
+
+       The list of email addresses to send mail to. If not specified, defaults to the
+       :attr:`~django_contact_form.forms.ContactForm.recipient_list` of the form.
+
+    .. attribute:: rate_limits
+
+       A list of :class:`~django_contact_form.ratelimit.RateLimit` instances, as for
+       :class:`ContactFormView`. They are checked after the body is parsed, so that
+       limits by email address (or by custom keys which look at the submitted data)
+       apply to JSON submissions too.
+
+    .. automethod:: get_data
+
+    .. automethod:: get_form
+
+    .. automethod:: form_valid
+
+    .. automethod:: form_invalid
+
+    """
+
+    INVALID_BODY_MESSAGE = _("The request body must be a JSON object.")
+
+    UNSUPPORTED_MEDIA_TYPE_MESSAGE = _(
+        "The request body must have the content type application/json."
+    )
+
+    form_class = ContactForm
+    http_method_names = ["post", "options"]
+    rate_limits = []
+    recipient_list = None
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests by validating the submitted data and, if it's valid,
+        sending the email.
+
+        """
+        with timed("request", self, payload_size=_content_length(request)) as record:
+            try:
+                data = self.get_data()
+            except RequestBodyError as exc:
+                return self.error_response(exc.message, status=exc.status)
+            for limit in self.rate_limits:
+                if not limit.allow(request, data):
+                    record["outcome"] = "rate_limited"
+                    return self.rate_limited(limit)
+            form = self.get_form(data)
+            if form.is_valid():
+                return self.form_valid(form)
+            return self.form_invalid(form)
+
+    def get_data(self) -> dict:
+        """
+        Parse and return the submitted data from the request body.
+
+        :raises RequestBodyError: When the request doesn't have the content type
+           ``application/json`` (with status 415), or its body isn't a JSON object
+           (with status 400).
+
+        """
+        if self.request.content_type != "application/json":
+            raise RequestBodyError(self.UNSUPPORTED_MEDIA_TYPE_MESSAGE, status=415)
+        try:
+            data = json.loads(self.request.body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            raise RequestBodyError(self.INVALID_BODY_MESSAGE, status=400)
+        return data
+
+    def get_form(self, data: dict):
+        """
+        Return an instance of :attr:`form_class` bound to the submitted data.
+
+        """
+        kwargs = {"data": data, "request": self.request}
+        if self.recipient_list is not None:
+            kwargs["recipient_list"] = self.recipient_list
+        return self.form_class(**kwargs)
+
+    def form_valid(self, form):
+        """
+        Handle a valid form by sending the email, and return the response.
+
+        """
+        form.save()
+        return self.accepted(form)
+
+    def form_invalid(self, form):
+        """
+        Return the response to an invalid form, listing its errors.
+
+        """
+        return JsonResponse(
+            {
+                "errors": {
+                    field: [str(message) for message in messages]
+                    for field, messages in form.errors.items()
+                }
+            },
+            status=400,
+        )
+
+    def accepted(self, form):
+        """
+        Return the response to a submission which was accepted.
+
+        """
+        if form.submission is not None:
+            return JsonResponse({"id": form.submission.pk}, status=202)
+        return JsonResponse({"id": form.get_content_hash()}, status=202)
+
+    def error_response(self, message, status):
+        """
+        Return a response with the given status and a single error, not specific to
+        any field.
+
+        """
+        return JsonResponse({"errors": {"__all__": [str(message)]}}, status=status)
+
+    def rate_limited(self, limit):
+        """
+        Return the response to a submission which exceeded the given rate limit.
+
+        """
+        response = self.error_response(ContactFormView.RATE_LIMITED_MESSAGE, status=429)
+        response["Retry-After"] = str(limit.period)
+        return response
+
+
+class AsyncContactFormAPIView(ContactFormAPIView):
+    """
+    An async version of :class:`ContactFormAPIView`, for use when serving your site
+    via ASGI, which validates and sends submissions as :class:`AsyncContactFormView`
+    does.
+
+    """
+
+    async def post(  # pylint: disable=invalid-overridden-method
+        self, request, *args, **kwargs
+    ):
+        """
+        Handle POST requests by validating the submitted data and, if it's valid,
+        sending the email.
+
+        """
+        with timed("request", self, payload_size=_content_length(request)) as record:
+            try:
+                data = self.get_data()
+            except RequestBodyError as exc:
+                return self.error_response(exc.message, status=exc.status)
+            for limit in self.rate_limits:
+                if not await limit.aallow(request, data):
+                    record["outcome"] = "rate_limited"
+                    return self.rate_limited(limit)
+            form = self.get_form(data)
+            if await form.ais_valid():
+                await form.asave()
+                return self.accepted(form)
+            return self.form_invalid(form)
@@ -0,0 +1,36 @@
+"""
+Data and factories shared by the test modules.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from django.test import RequestFactory
+
+from django_contact_form.forms import ContactForm
+
+VALID_DATA = {"name": "Test", "email": "test@example.com", "body": "Test message"}
+
+
+def make_form(form_class=ContactForm, data=None, address="127.0.0.1", **kwargs):
+    """
+    Return a form of the given class, bound to the given data (by default,
+    ``VALID_DATA``) and a POST request from the given address. Other keyword arguments
+    are passed to the form.
+
+    """
+    return form_class(
+        request=RequestFactory().post("/", REMOTE_ADDR=address),
+        data=VALID_DATA if data is None else data,
+        **kwargs,
+    )
+
+
+def valid_form(form_class=ContactForm, data=None, **kwargs):
+    """
+    Return a form as :func:`make_form` does, having checked that it's valid.
+
+    """
+    form = make_form(form_class, data, **kwargs)
+    assert form.is_valid()
+    return form
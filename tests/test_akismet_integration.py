@@ -4,19 +4,39 @@ Tests for the Akismet spam-filtering integration.
 """
 
 # SPDX-License-Identifier: BSD-3-Clause
+# pylint: disable=too-many-lines
 
+import asyncio
+import concurrent.futures
 import os
+import time
 from http import HTTPStatus
+from io import StringIO
 from unittest import mock
 
 import akismet
+from asgiref.sync import async_to_sync
+from django import forms
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 
-from django_contact_form._akismet import _clear_cached_instance, _try_get_akismet_client
+from django_contact_form._akismet import (
+    _atry_get_akismet_client,
+    _batch_client,
+    _clear_cached_instance,
+    _comment_check,
+    _try_get_akismet_client,
+)
+from django_contact_form.delivery import drain_queue
 from django_contact_form.forms import AkismetContactForm
+from django_contact_form.models import QueuedMessage
+from django_contact_form.spam import CircuitBreaker
 
 
 class AlwaysSpamClient(akismet.TestSyncClient):
@@ -37,6 +57,42 @@ class NeverSpamClient(akismet.TestSyncClient):
     comment_check_response = akismet.CheckResponse.HAM
 
 
+class AsyncAlwaysSpamClient(akismet.TestAsyncClient):
+    """
+    Async Akismet client which always marks content as spam.
+
+    """
+
+    comment_check_response = akismet.CheckResponse.SPAM
+
+
+class AsyncNeverSpamClient(akismet.TestAsyncClient):
+    """
+    Async Akismet client which always marks content as non-spam.
+
+    """
+
+    comment_check_response = akismet.CheckResponse.HAM
+
+
+class AsyncValidConfigClient(akismet.TestAsyncClient):
+    """
+    Async Akismet client which marks its configuration as valid.
+
+    """
+
+    verify_key_response = True
+
+
+class AsyncInvalidConfigClient(akismet.TestAsyncClient):
+    """
+    Async Akismet client which marks its configuration as invalid.
+
+    """
+
+    verify_key_response = False
+
+
 class ValidConfigClient(akismet.TestSyncClient):
     """
     Akismet client which marks its configuration as valid.
@@ -56,7 +112,7 @@ class InvalidConfigClient(akismet.TestSyncClient):
 
 
 @override_settings(ROOT_URLCONF="django_contact_form.akismet_urls")
-class AkismetContactFormTests(TestCase):
+class AkismetContactFormTests(TestCase):  # pylint: disable=too-many-public-methods
     """
     Tests for the Akismet contact form.
 
@@ -72,10 +128,11 @@ class AkismetContactFormTests(TestCase):
 
     def setUp(self):
         """
-        Ensure the Akismet client instance is not cached between tests.
+        Ensure the Akismet client instance and verdicts are not cached between tests.
 
         """
         _clear_cached_instance()
+        cache.clear()
 
     def request(self):
         """
@@ -124,6 +181,226 @@ class AkismetContactFormTests(TestCase):
             form = AkismetContactForm(request=self.request(), data=data)
             assert not form.is_valid()
 
+    def test_akismet_form_invalid(self):
+        """
+        The Akismet check is skipped when any other field, or the form's clean()
+        method, fails validation.
+
+        """
+
+        class CleanedForm(AkismetContactForm):
+            """
+            Akismet contact form with a form-wide validation rule.
+
+            """
+
+            def clean(self):
+                """
+                Reject submissions from a particular name.
+
+                """
+                cleaned_data = super().clean()
+                if cleaned_data.get("name") == "Rejected":
+                    raise forms.ValidationError("Rejected.")
+                return cleaned_data
+
+        client_getter = mock.Mock()
+        with mock.patch(
+            "django_contact_form._akismet._try_get_akismet_client", new=client_getter
+        ):
+            for data in (
+                dict(self.payload, email="not an email address"),
+                dict(self.payload, name=""),
+                dict(self.payload, name="Rejected"),
+            ):
+                with self.subTest(data=data):
+                    form = CleanedForm(request=self.request(), data=data)
+                    assert not form.is_valid()
+                    assert "body" not in form.errors
+            client_getter.assert_not_called()
+
+    def test_akismet_form_complete_arguments(self):
+        """
+        The Akismet check runs after all other validation, with all of the form's
+        cleaned data available.
+
+        """
+        with NeverSpamClient(config=self.akismet_config) as akismet_client, mock.patch(
+            "django_contact_form._akismet._try_get_akismet_client",
+            new=mock.Mock(return_value=akismet_client),
+        ), mock.patch.object(
+            akismet_client, "comment_check", wraps=akismet_client.comment_check
+        ) as comment_check:
+            form = AkismetContactForm(request=self.request(), data=self.payload)
+            assert form.is_valid()
+            comment_check.assert_called_once()
+            arguments = comment_check.call_args.kwargs
+            assert arguments["comment_author"] == self.payload["name"]
+            assert arguments["comment_author_email"] == self.payload["email"]
+            assert arguments["comment_content"] == self.payload["body"]
+
+    async def test_akismet_form_async_spam(self):
+        """
+        The Akismet contact form correctly rejects spam when validated asynchronously.
+
+        """
+        akismet_client = AsyncAlwaysSpamClient(config=self.akismet_config)
+        with mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client",
+            new=mock.AsyncMock(return_value=akismet_client),
+        ), mock.patch(
+            "django_contact_form._akismet._try_get_akismet_client",
+            new=mock.Mock(side_effect=AssertionError("sync client used")),
+        ):
+            form = AkismetContactForm(request=self.request(), data=self.payload)
+            assert not await form.ais_valid()
+            assert str(form.SPAM_MESSAGE) in form.errors["body"]
+            # A second validation doesn't repeat the check.
+            assert not await form.ais_valid()
+
+    async def test_akismet_form_async_ham(self):
+        """
+        The Akismet contact form correctly accepts non-spam when validated
+        asynchronously.
+
+        """
+        akismet_client = AsyncNeverSpamClient(config=self.akismet_config)
+        with mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client",
+            new=mock.AsyncMock(return_value=akismet_client),
+        ):
+            form = AkismetContactForm(request=self.request(), data=self.payload)
+            assert await form.ais_valid()
+
+    async def test_akismet_form_async_invalid(self):
+        """
+        The async Akismet check is skipped when the form is otherwise invalid.
+
+        """
+        data = {"name": "Test", "email": "email@example.com"}
+        client_getter = mock.AsyncMock()
+        with mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client", new=client_getter
+        ):
+            form = AkismetContactForm(request=self.request(), data=data)
+            assert not await form.ais_valid()
+            client_getter.assert_not_called()
+
+    def test_akismet_client_cached(self):
+        """
+        The Akismet client is created once and reused for later requests.
+
+        """
+        with self.settings(
+            AKISMET_API_KEY=self.akismet_config.key,
+            AKISMET_BLOG_URL=self.akismet_config.url,
+        ):
+            first = _try_get_akismet_client(ValidConfigClient)
+            assert first is _try_get_akismet_client(ValidConfigClient)
+
+    async def test_akismet_async_django_settings(self):
+        """
+        When the Django settings are present, an async Akismet client is returned using
+        them if valid, and ImproperlyConfigured is raised if not.
+
+        """
+        with self.settings(
+            AKISMET_API_KEY=self.akismet_config.key,
+            AKISMET_BLOG_URL=self.akismet_config.url,
+        ):
+            client = await _atry_get_akismet_client(AsyncValidConfigClient)
+            assert client is await _atry_get_akismet_client(AsyncValidConfigClient)
+            with self.assertRaises(ImproperlyConfigured):
+                await _atry_get_akismet_client(AsyncInvalidConfigClient)
+
+    async def test_akismet_async_env(self):
+        """
+        When the environment variables are present, an async Akismet client is
+        returned using them if valid, and ImproperlyConfigured is raised if not.
+
+        """
+        try:
+            os.environ["PYTHON_AKISMET_API_KEY"] = self.akismet_config.key
+            os.environ["PYTHON_AKISMET_BLOG_URL"] = self.akismet_config.url
+            assert isinstance(
+                await _atry_get_akismet_client(AsyncValidConfigClient),
+                AsyncValidConfigClient,
+            )
+            with self.assertRaises(ImproperlyConfigured):
+                await _atry_get_akismet_client(AsyncInvalidConfigClient)
+        finally:
+            del os.environ["PYTHON_AKISMET_API_KEY"]
+            del os.environ["PYTHON_AKISMET_BLOG_URL"]
+
+    def test_akismet_verdict_cache(self):
+        """
+        With a verdict cache configured, repeated identical submissions are answered
+        from the cache, with spam and ham verdicts cached for their own timeouts.
+
+        """
+
+        class CachingForm(AkismetContactForm):
+            """
+            Akismet form which caches verdicts.
+
+            """
+
+            akismet_cache_alias = "default"
+            akismet_spam_cache_timeout = 100
+            akismet_ham_cache_timeout = 10
+
+        for client_class, is_spam, timeout in (
+            (AlwaysSpamClient, True, 100),
+            (NeverSpamClient, False, 10),
+        ):
+            cache.clear()
+            akismet_client = client_class(config=self.akismet_config)
+            with mock.patch.object(
+                akismet_client, "comment_check", wraps=akismet_client.comment_check
+            ) as comment_check, mock.patch(
+                "django_contact_form._akismet._try_get_akismet_client",
+                new=mock.Mock(return_value=akismet_client),
+            ), mock.patch.object(
+                cache, "set", wraps=cache.set
+            ) as cache_set:
+                for _ in range(3):
+                    form = CachingForm(request=self.request(), data=self.payload)
+                    assert form.is_valid() is not is_spam
+                assert 1 == comment_check.call_count
+                assert timeout == cache_set.call_args.args[2]
+
+                form = CachingForm(
+                    request=self.request(), data=dict(self.payload, body="Other.")
+                )
+                form.is_valid()
+                assert 2 == comment_check.call_count
+
+    async def test_akismet_verdict_cache_async(self):
+        """
+        The verdict cache is also used when validating asynchronously.
+
+        """
+
+        class CachingForm(AkismetContactForm):
+            """
+            Akismet form which caches verdicts.
+
+            """
+
+            akismet_cache_alias = "default"
+
+        akismet_client = AsyncAlwaysSpamClient(config=self.akismet_config)
+        with mock.patch.object(
+            akismet_client, "comment_check", wraps=akismet_client.comment_check
+        ) as comment_check, mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client",
+            new=mock.AsyncMock(return_value=akismet_client),
+        ):
+            for _ in range(3):
+                form = CachingForm(request=self.request(), data=self.payload)
+                assert not await form.ais_valid()
+            assert 1 == comment_check.call_count
+
     def test_akismet_django_settings_valid(self):
         """
         When the Django settings are present and valid, an Akismet client is
@@ -198,3 +475,721 @@ class AkismetContactFormTests(TestCase):
         response = self.client.get(reverse("django_contact_form"))
         assert response.status_code == HTTPStatus.OK
         assert isinstance(response.context["form"], AkismetContactForm)
+
+
+class AkismetFailureTests(TestCase):
+    """
+    Tests for the handling of Akismet failures: deadlines, the circuit breaker and the
+    failure policies.
+
+    """
+
+    payload = AkismetContactFormTests.payload
+
+    def form(self, failure_policy=None, breaker=None, timeout=None, **attrs):
+        """
+        Return an Akismet form with the given failure handling.
+
+        """
+        form_class = type(
+            "FailureHandlingForm",
+            (AkismetContactForm,),
+            {
+                "akismet_failure_policy": failure_policy,
+                "akismet_circuit_breaker": breaker,
+                "akismet_timeout": timeout,
+                **attrs,
+            },
+        )
+        return form_class(request=RequestFactory().request(), data=self.payload)
+
+    def failing_client(self, exc=None):
+        """
+        Patch in a synchronous Akismet client whose spam checks fail, and return the
+        client.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check.side_effect = exc or akismet.RequestError("down")
+        patcher = mock.patch(
+            "django_contact_form._akismet._try_get_akismet_client",
+            new=mock.Mock(return_value=akismet_client),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return akismet_client
+
+    def failing_async_client(self):
+        """
+        Patch in an async Akismet client whose spam checks fail, and return the
+        client.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check = mock.AsyncMock(
+            side_effect=akismet.ProtocolError("bad response")
+        )
+        patcher = mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client",
+            new=mock.AsyncMock(return_value=akismet_client),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return akismet_client
+
+    def test_no_policy(self):
+        """
+        Without a failure policy, Akismet failures propagate.
+
+        """
+        self.failing_client()
+        with self.assertRaises(akismet.RequestError):
+            self.form().is_valid()
+
+    def test_fail_open(self):
+        """
+        The "open" policy accepts and sends the message, without caching a verdict.
+
+        """
+        self.failing_client()
+        form = self.form("open", akismet_cache_alias="default")
+        with mock.patch.object(cache, "set") as cache_set:
+            assert form.is_valid()
+        cache_set.assert_not_called()
+        form.save()
+        assert 1 == len(mail.outbox)
+
+    def test_fail_closed(self):
+        """
+        The "closed" policy rejects the submission.
+
+        """
+        self.failing_client()
+        form = self.form("closed")
+        assert not form.is_valid()
+        assert str(form.UNAVAILABLE_MESSAGE) in form.errors["body"]
+
+    def test_fail_queue(self):
+        """
+        The "queue" policy accepts the submission, and stores it to be spam-checked
+        and sent when the queue is drained.
+
+        """
+        self.failing_client()
+        form = self.form("queue")
+        assert form.is_valid()
+        form.save()
+        assert not mail.outbox
+        queued = QueuedMessage.objects.get()
+        assert self.payload["body"] == queued.akismet_arguments["comment_content"]
+
+        # Still failing: the message stays queued.
+        failing = mock.Mock()
+        failing.comment_check = mock.AsyncMock(side_effect=akismet.RequestError)
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=failing
+        ):
+            assert (0, 1, 0) == drain_queue(retries=0)
+
+        for client_class, expected in (
+            (AsyncAlwaysSpamClient, (0, 0, 1)),
+            (AsyncNeverSpamClient, (1, 0, 0)),
+        ):
+            QueuedMessage.objects.create(
+                message=queued.message, akismet_arguments=queued.akismet_arguments
+            )
+            with mock.patch(
+                "django_contact_form._akismet._batch_client",
+                new=lambda http_client, config, client_class=client_class: client_class(
+                    config=AkismetContactFormTests.akismet_config,
+                    http_client=http_client,
+                ),
+            ):
+                assert expected == drain_queue(max_attempts=1)
+        assert 1 == len(mail.outbox)
+
+    def test_timeout(self):
+        """
+        A spam check which exceeds the deadline is treated as a failure.
+
+        """
+        akismet_client = self.failing_client()
+        akismet_client.comment_check.side_effect = lambda **kwargs: time.sleep(0.5)
+        form = self.form("closed", timeout=0.01)
+        assert not form.is_valid()
+        assert str(form.UNAVAILABLE_MESSAGE) in form.errors["body"]
+
+    def test_timeout_cancels(self):
+        """
+        A spam check still waiting to start when the deadline passes is cancelled.
+
+        """
+        future = mock.Mock()
+        future.result.side_effect = concurrent.futures.TimeoutError
+        executor = mock.Mock(**{"submit.return_value": future})
+        with mock.patch(
+            "django_contact_form._akismet._deadline_executor", new=executor
+        ), self.assertRaises(concurrent.futures.TimeoutError):
+            _comment_check(mock.Mock(), {}, timeout=1)
+        future.cancel.assert_called_once_with()
+
+    def test_circuit_breaker(self):
+        """
+        After repeated failures the circuit breaker stops Akismet being consulted, and
+        a successful probe closes it again.
+
+        """
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        akismet_client = self.failing_client()
+        for _ in range(3):
+            assert self.form("open", breaker).is_valid()
+        assert 2 == akismet_client.comment_check.call_count
+        assert CircuitBreaker.OPEN == breaker.state
+
+        akismet_client.comment_check.side_effect = None
+        akismet_client.comment_check.return_value = True
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 61):
+            assert not self.form("open", breaker).is_valid()
+        assert CircuitBreaker.CLOSED == breaker.state
+
+    async def test_async_fail_closed(self):
+        """
+        The failure policies also apply when validating asynchronously.
+
+        """
+        self.failing_async_client()
+        form = self.form("closed")
+        assert not await form.ais_valid()
+        assert str(form.UNAVAILABLE_MESSAGE) in form.errors["body"]
+
+    async def test_async_fail_queue(self):
+        """
+        The "queue" policy queues the message from asave().
+
+        """
+        self.failing_async_client()
+        form = self.form("queue", timeout=5, akismet_cache_alias="default")
+        assert await form.ais_valid()
+        await form.asave()
+        assert 1 == await QueuedMessage.objects.acount()
+        assert not mail.outbox
+
+    async def test_async_circuit_breaker(self):
+        """
+        The circuit breaker also applies when validating asynchronously.
+
+        """
+        breaker = CircuitBreaker(failure_threshold=1)
+        akismet_client = self.failing_async_client()
+        assert await self.form("open", breaker).ais_valid()
+        assert await self.form("open", breaker).ais_valid()
+        assert 1 == akismet_client.comment_check.call_count
+
+        akismet_client.comment_check.side_effect = None
+        akismet_client.comment_check.return_value = False
+        breaker.record_success()
+        assert await self.form("open", breaker).ais_valid()
+        form = self.form(None, breaker)
+        assert await form.ais_valid()
+        await form.asave()
+        assert 1 == len(mail.outbox)
+
+
+class AkismetClientRegistryTests(TestCase):
+    """
+    Tests for the registry of Akismet clients, and per-site configuration.
+
+    """
+
+    def setUp(self):
+        """
+        Ensure the Akismet client instances are not cached between tests.
+
+        """
+        _clear_cached_instance()
+
+    def test_keyed_by_config(self):
+        """
+        Each distinct client class and configuration gets its own client, created once.
+
+        """
+        first = akismet.Config(key="test-key", url="http://one.example.com/")
+        second = akismet.Config(key="test-key", url="http://two.example.com/")
+        client = _try_get_akismet_client(ValidConfigClient, config=first)
+        assert client is _try_get_akismet_client(ValidConfigClient, config=first)
+        assert client is not _try_get_akismet_client(ValidConfigClient, config=second)
+        assert client is not _try_get_akismet_client(NeverSpamClient, config=first)
+        with self.assertRaises(ImproperlyConfigured):
+            _try_get_akismet_client(InvalidConfigClient, config=first)
+
+    def test_keyed_by_timeout(self):
+        """
+        A client requested with a timeout is distinct, and uses it as its HTTP timeout.
+
+        """
+        config = akismet.Config(key="test-key", url="http://one.example.com/")
+        client_class = mock.Mock(**{"return_value.verify_key.return_value": True})
+        client = _try_get_akismet_client(client_class, config=config, timeout=2)
+        assert client is _try_get_akismet_client(client_class, config=config, timeout=2)
+        _try_get_akismet_client(client_class, config=config)
+        assert 2 == client_class.call_count
+        http_client = client_class.call_args_list[0].kwargs["http_client"]
+        assert 2 == http_client.timeout.read
+        assert akismet.USER_AGENT == http_client.headers["User-Agent"]
+        assert client_class.call_args_list[1].kwargs["http_client"] is None
+
+    def test_concurrent_creation(self):
+        """
+        Concurrent first requests for a client create and verify only one.
+
+        """
+        config = akismet.Config(key="test-key", url="http://example.com/")
+        with mock.patch.object(
+            ValidConfigClient,
+            "verify_key",
+            autospec=True,
+            side_effect=lambda *args: time.sleep(0.05) or True,
+        ) as verify_key, concurrent.futures.ThreadPoolExecutor(8) as executor:
+            clients = set(
+                executor.map(
+                    lambda _: _try_get_akismet_client(ValidConfigClient, config),
+                    range(8),
+                )
+            )
+        assert 1 == len(clients)
+        assert 1 == verify_key.call_count
+
+    async def test_async_keyed_by_config(self):
+        """
+        Async clients are also kept per configuration.
+
+        """
+        config = akismet.Config(key="test-key", url="http://one.example.com/")
+        client = await _atry_get_akismet_client(AsyncValidConfigClient, config=config)
+        assert client is await _atry_get_akismet_client(
+            AsyncValidConfigClient, config=config
+        )
+
+    def test_async_per_event_loop(self):
+        """
+        Async clients aren't shared between event loops, such as the new loop each
+        async_to_sync() call runs in.
+
+        """
+        config = akismet.Config(key="test-key", url="http://one.example.com/")
+
+        async def get_client():
+            """
+            Return the client for the current event loop, checking that it's reused
+            within the loop.
+
+            """
+            client = await _atry_get_akismet_client(
+                AsyncValidConfigClient, config=config
+            )
+            assert client is await _atry_get_akismet_client(
+                AsyncValidConfigClient, config=config
+            )
+            return client
+
+        assert async_to_sync(get_client)() is not async_to_sync(get_client)()
+
+    @mock.patch.dict(
+        os.environ,
+        {"PYTHON_AKISMET_API_KEY": "test-key", "PYTHON_AKISMET_BLOG_URL": "example"},
+    )
+    def test_env_bad_url(self):
+        """
+        A site URL in the environment without a scheme is rejected.
+
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            _try_get_akismet_client(ValidConfigClient)
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "PYTHON_AKISMET_API_KEY": "test-key",
+            "PYTHON_AKISMET_BLOG_URL": "http://example.com/",
+        },
+    )
+    def test_per_site(self):
+        """
+        With akismet_per_site set, each site's submissions are checked using the
+        default API key and that site's URL.
+
+        """
+
+        class PerSiteForm(AkismetContactForm):
+            """
+            Akismet form which checks submissions per site.
+
+            """
+
+            akismet_per_site = True
+
+        Site.objects.create(pk=2, domain="other.example.com", name="Other")
+        with self.settings(SITE_ID=2):
+            config = PerSiteForm(
+                request=RequestFactory().request(), data={}
+            ).get_akismet_config()
+            secure_config = PerSiteForm(
+                request=RequestFactory().request(**{"wsgi.url_scheme": "https"}),
+                data={},
+            ).get_akismet_config()
+        assert "test-key" == config.key
+        assert "http://other.example.com/" == config.url
+        assert "https://other.example.com/" == secure_config.url
+        form = AkismetContactForm(request=RequestFactory().request())
+        assert form.get_akismet_config() is None
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "PYTHON_AKISMET_API_KEY": "test-key",
+            "PYTHON_AKISMET_BLOG_URL": "http://example.com/",
+        },
+    )
+    async def test_per_site_async(self):
+        """
+        The per-site configuration is also used for async clients.
+
+        """
+
+        class PerSiteForm(AkismetContactForm):
+            """
+            Akismet form which checks submissions per site.
+
+            """
+
+            akismet_per_site = True
+
+        client_getter = mock.AsyncMock()
+        with mock.patch(
+            "django_contact_form._akismet._atry_get_akismet_client", new=client_getter
+        ):
+            await PerSiteForm(request=RequestFactory().request()).aget_akismet_client()
+        assert "http://example.com/" == client_getter.call_args.kwargs["config"].url
+
+
+@mock.patch.dict(
+    os.environ,
+    {
+        "PYTHON_AKISMET_API_KEY": "test-key",
+        "PYTHON_AKISMET_BLOG_URL": "http://example.com/",
+    },
+)
+class AkismetVerificationCacheTests(TestCase):
+    """
+    Tests for sharing Akismet key verifications through a cache.
+
+    """
+
+    config = akismet.Config(key="test-key", url="http://example.com/")
+
+    def setUp(self):
+        """
+        Ensure no client or verification is cached between tests.
+
+        """
+        _clear_cached_instance()
+        cache.clear()
+
+    def test_verification_cached(self):
+        """
+        Once a configuration has been verified, new clients for it (as in other
+        processes) skip verification until the recorded verification expires.
+
+        """
+        with mock.patch.object(
+            ValidConfigClient, "verify_key", autospec=True, return_value=True
+        ) as verify_key:
+            for _ in range(2):
+                _clear_cached_instance()
+                _try_get_akismet_client(
+                    ValidConfigClient,
+                    config=self.config,
+                    verification_cache="default",
+                    verification_timeout=60,
+                )
+        assert 1 == verify_key.call_count
+
+    def test_failed_verification_not_cached(self):
+        """
+        Failed verifications are not recorded.
+
+        """
+        for _ in range(2):
+            _clear_cached_instance()
+            with self.assertRaises(ImproperlyConfigured):
+                _try_get_akismet_client(
+                    InvalidConfigClient,
+                    config=self.config,
+                    verification_cache="default",
+                )
+
+    async def test_verification_cached_async(self):
+        """
+        Verifications recorded by async clients are shared with sync clients, and the
+        other way around.
+
+        """
+        with mock.patch.object(
+            AsyncValidConfigClient, "verify_key", autospec=True, return_value=True
+        ) as verify_key:
+            await _atry_get_akismet_client(
+                AsyncValidConfigClient, config=self.config, verification_cache="default"
+            )
+            _clear_cached_instance()
+            await _atry_get_akismet_client(
+                AsyncValidConfigClient, config=self.config, verification_cache="default"
+            )
+        assert 1 == verify_key.call_count
+        with mock.patch.object(
+            InvalidConfigClient, "verify_key", side_effect=AssertionError
+        ):
+            _try_get_akismet_client(
+                InvalidConfigClient, config=self.config, verification_cache="default"
+            )
+
+    def test_form_attributes(self):
+        """
+        The form passes its verification-cache settings and timeout to the client
+        registry.
+
+        """
+
+        class VerifyingForm(AkismetContactForm):
+            """
+            Akismet form which shares key verifications.
+
+            """
+
+            akismet_verification_cache_alias = "default"
+            akismet_verification_timeout = 60
+            akismet_timeout = 5
+
+        client_getter = mock.Mock()
+        with mock.patch(
+            "django_contact_form._akismet._try_get_akismet_client", new=client_getter
+        ):
+            VerifyingForm(request=RequestFactory().request()).get_akismet_client()
+        assert "default" == client_getter.call_args.kwargs["verification_cache"]
+        assert 60 == client_getter.call_args.kwargs["verification_timeout"]
+        assert 5 == client_getter.call_args.kwargs["timeout"]
+
+    def test_command(self):
+        """
+        The verify_akismet_key command verifies the configuration and, if asked,
+        records the verification.
+
+        """
+        with mock.patch(
+            "akismet.SyncClient", new=InvalidConfigClient
+        ), self.assertRaises(CommandError):
+            call_command("verify_akismet_key", stdout=StringIO())
+
+        stdout = StringIO()
+        with mock.patch("akismet.SyncClient", new=ValidConfigClient):
+            call_command("verify_akismet_key", "--cache=default", stdout=stdout)
+        assert "http://example.com/" in stdout.getvalue()
+        with mock.patch.object(
+            ValidConfigClient, "verify_key", side_effect=AssertionError
+        ):
+            _try_get_akismet_client(ValidConfigClient, verification_cache="default")
+
+
+class DeferredClassificationTests(TestCase):
+    """
+    Tests for deferred, batched Akismet classification.
+
+    """
+
+    payload = AkismetContactFormTests.payload
+
+    class DeferredForm(AkismetContactForm):
+        """
+        Akismet form which defers the spam check.
+
+        """
+
+        akismet_deferred = True
+
+    def queue(self, count, form_class=DeferredForm):
+        """
+        Submit and save ``count`` valid forms.
+
+        """
+        for index in range(count):
+            form = form_class(
+                request=RequestFactory().request(),
+                data=dict(self.payload, body=f"Message {index}"),
+            )
+            with mock.patch.object(
+                form_class, "get_akismet_client", side_effect=AssertionError
+            ):
+                assert form.is_valid()
+            form.save()
+
+    def test_deferred(self):
+        """
+        Deferred submissions are accepted without an Akismet check, and classified and
+        sent or discarded when the queue is drained.
+
+        """
+        self.queue(4)
+        assert not mail.outbox
+        assert (
+            4 == QueuedMessage.objects.filter(akismet_arguments__isnull=False).count()
+        )
+
+        async def comment_check(**arguments):
+            """
+            Classify messages with even numbers as spam.
+
+            """
+            return int(arguments["comment_content"].split()[-1]) % 2 == 0
+
+        client = mock.Mock()
+        client.comment_check = comment_check
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=client
+        ):
+            assert (2, 0, 2) == drain_queue(batch_size=3)
+        assert ["Message 1", "Message 3"] == sorted(
+            message.body for message in mail.outbox
+        )
+
+    async def test_deferred_async(self):
+        """
+        Deferred submissions validated asynchronously are queued too.
+
+        """
+        form = self.DeferredForm(request=RequestFactory().request(), data=self.payload)
+        with mock.patch.object(
+            self.DeferredForm, "aget_akismet_client", side_effect=AssertionError
+        ):
+            assert await form.ais_valid()
+        await form.asave()
+        assert 1 == await QueuedMessage.objects.acount()
+
+    def test_concurrency(self):
+        """
+        No more than the given number of checks are in progress at once.
+
+        """
+        self.queue(6)
+        in_progress = []
+        peak = []
+
+        async def comment_check(**arguments):
+            """
+            Record the number of concurrent checks.
+
+            """
+            in_progress.append(arguments)
+            peak.append(len(in_progress))
+            await asyncio.sleep(0.01)
+            in_progress.pop()
+            return False
+
+        client = mock.Mock()
+        client.comment_check = comment_check
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=client
+        ):
+            assert (6, 0, 0) == drain_queue(concurrency=2)
+        assert 2 == max(peak)
+
+    def test_retries(self):
+        """
+        Failed checks are retried with exponential backoff.
+
+        """
+        self.queue(1)
+        client = mock.Mock()
+        client.comment_check = mock.AsyncMock(
+            side_effect=[akismet.RequestError, akismet.ProtocolError, False]
+        )
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=client
+        ), mock.patch("asyncio.sleep", new=mock.AsyncMock()) as sleep:
+            assert (1, 0, 0) == drain_queue(retries=2, backoff=1)
+        assert [mock.call(1), mock.call(2)] == sleep.call_args_list
+
+    def test_stored_config(self):
+        """
+        Deferred submissions are checked with the Akismet configuration of the form
+        they were submitted to.
+
+        """
+
+        class ConfiguredForm(self.DeferredForm):
+            """
+            Deferred form with its own Akismet configuration.
+
+            """
+
+            def get_akismet_config(self):
+                """
+                Return this form's configuration.
+
+                """
+                return akismet.Config(key="site-key", url="http://site.example.com/")
+
+        self.queue(1, form_class=ConfiguredForm)
+        queued = QueuedMessage.objects.get()
+        assert ("site-key", "http://site.example.com/") == (
+            queued.akismet_key,
+            queued.akismet_url,
+        )
+        client = mock.Mock()
+        client.comment_check = mock.AsyncMock(return_value=False)
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=client
+        ) as batch_client:
+            assert (1, 0, 0) == drain_queue()
+        assert ("site-key", "http://site.example.com/") == batch_client.call_args[0][1]
+
+    @mock.patch.dict(os.environ, {"PYTHON_AKISMET_API_KEY": ""})
+    def test_missing_default_config(self):
+        """
+        Without a default Akismet configuration, submissions which need it fail to be
+        checked and stay queued, without preventing other messages being sent.
+
+        """
+        self.queue(1)
+        QueuedMessage.objects.create(
+            message={
+                "subject": "Subject",
+                "message": "Body",
+                "from_email": "from@example.com",
+                "recipient_list": ["to@example.com"],
+            }
+        )
+        assert (1, 1, 0) == drain_queue()
+        queued = QueuedMessage.objects.get()
+        assert queued.akismet_arguments is not None
+        assert 1 == queued.attempts
+        assert 1 == len(mail.outbox)
+
+    @mock.patch.dict(
+        os.environ,
+        {
+            "PYTHON_AKISMET_API_KEY": "test-key",
+            "PYTHON_AKISMET_BLOG_URL": "http://example.com/",
+        },
+    )
+    def test_batch_client(self):
+        """
+        The batch client uses the given or default configuration and the shared HTTP
+        client.
+
+        """
+        http_client = mock.Mock()
+        client = _batch_client(http_client)
+        assert isinstance(client, akismet.AsyncClient)
+        assert "test-key" == client._config.key  # pylint: disable=protected-access
+        assert http_client is client._http_client  # pylint: disable=protected-access
+        client = _batch_client(http_client, ("site-key", "http://site.example.com/"))
+        assert "site-key" == client._config.key  # pylint: disable=protected-access
@@ -0,0 +1,255 @@
+"""
+Tests for the JSON contact-form views.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import json
+from http import HTTPStatus
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from django_contact_form.forms import ContactForm
+from django_contact_form.models import Submission
+from django_contact_form.ratelimit import RateLimit
+from django_contact_form.views import AsyncContactFormAPIView, ContactFormAPIView
+
+from .helpers import VALID_DATA
+
+
+@override_settings(ROOT_URLCONF="tests.test_urls")
+class ContactFormAPIViewTests(TestCase):
+    """
+    Tests for ContactFormAPIView and AsyncContactFormAPIView.
+
+    """
+
+    def setUp(self):
+        """
+        Clear the rate-limit counters.
+
+        """
+        cache.clear()
+
+    def post(self, data, url_name="test_api", **kwargs):
+        """
+        POST the given data as JSON to the named URL.
+
+        """
+        kwargs.setdefault("content_type", "application/json")
+        return self.client.post(reverse(url_name), data, **kwargs)
+
+    def test_send(self):
+        """
+        A valid submission is sent, and accepted with its id.
+
+        """
+        response = self.post(VALID_DATA)
+        assert HTTPStatus.ACCEPTED == response.status_code
+        assert 1 == len(mail.outbox)
+        form = ContactForm(request=response.wsgi_request, data=VALID_DATA)
+        assert form.is_valid()
+        assert response.json() == {"id": form.get_content_hash()}
+
+    def test_stored_submission_id(self):
+        """
+        When submissions are stored, the id is the stored submission's primary key, so
+        identical submissions have different ids.
+
+        """
+        view = ContactFormAPIView.as_view(
+            form_class=type("StoringForm", (ContactForm,), {"store_submissions": True})
+        )
+        ids = []
+        for _ in range(2):
+            request = RequestFactory().post(
+                "/", VALID_DATA, content_type="application/json"
+            )
+            ids.append(json.loads(view(request).content)["id"])
+        assert ids == list(
+            Submission.objects.order_by("pk").values_list("pk", flat=True)
+        )
+
+    def test_invalid(self):
+        """
+        An invalid submission is rejected with its errors.
+
+        """
+        response = self.post({"name": "Test", "email": "invalid", "body": ""})
+        assert HTTPStatus.BAD_REQUEST == response.status_code
+        assert response.json() == {
+            "errors": {
+                "email": ["Enter a valid email address."],
+                "body": ["This field is required."],
+            }
+        }
+        assert 0 == len(mail.outbox)
+
+    def test_malformed_body(self):
+        """
+        A body which isn't a JSON object is rejected.
+
+        """
+        for body in ("not json", "[1, 2]", b"\xff"):
+            response = self.post(body)
+            assert HTTPStatus.BAD_REQUEST == response.status_code
+            assert response.json() == {
+                "errors": {"__all__": ["The request body must be a JSON object."]}
+            }
+
+    def test_content_type(self):
+        """
+        Form-encoded submissions are rejected.
+
+        """
+        response = self.client.post(reverse("test_api"), VALID_DATA)
+        assert HTTPStatus.UNSUPPORTED_MEDIA_TYPE == response.status_code
+        assert 0 == len(mail.outbox)
+
+    def test_get_not_allowed(self):
+        """
+        Only POST is accepted.
+
+        """
+        response = self.client.get(reverse("test_api"))
+        assert HTTPStatus.METHOD_NOT_ALLOWED == response.status_code
+
+    def test_csrf_exempt(self):
+        """
+        JSON submissions don't need a CSRF token.
+
+        """
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(
+            reverse("test_api"), VALID_DATA, content_type="application/json"
+        )
+        assert HTTPStatus.ACCEPTED == response.status_code
+
+    def test_recipient_list(self):
+        """
+        The view's recipient_list is passed to the form.
+
+        """
+        self.post(VALID_DATA, url_name="test_api_recipient_list")
+        assert ["recipient_list@example.com"] == mail.outbox[0].recipients()
+
+    def test_no_templates(self):
+        """
+        Responses don't render the page templates.
+
+        """
+        with mock.patch("django.template.loader.get_template") as get_template:
+            self.post({"name": "Test"})
+        get_template.assert_not_called()
+
+    def test_rate_limited(self):
+        """
+        Submissions over a rate limit are rejected.
+
+        """
+        self.post(VALID_DATA, url_name="test_api_limited")
+        response = self.post(VALID_DATA, url_name="test_api_limited")
+        assert HTTPStatus.TOO_MANY_REQUESTS == response.status_code
+        assert response["Retry-After"] == "60"
+        assert list(response.json()["errors"]) == ["__all__"]
+        assert 1 == len(mail.outbox)
+
+    def test_rate_limited_by_email(self):
+        """
+        Limits by email address apply to the address in the JSON body.
+
+        """
+        view = ContactFormAPIView.as_view(rate_limits=[RateLimit("email", rate=1)])
+
+        def post(data):
+            """
+            POST the given data as JSON to the view.
+
+            """
+            return view(
+                RequestFactory().post(
+                    "/", data, content_type="application/json", REMOTE_ADDR="10.0.0.1"
+                )
+            )
+
+        assert HTTPStatus.ACCEPTED == post(VALID_DATA).status_code
+        response = post(dict(VALID_DATA, email="TEST@example.com"))
+        assert HTTPStatus.TOO_MANY_REQUESTS == response.status_code
+        assert (
+            HTTPStatus.BAD_REQUEST == post({"email": ["test@example.com"]}).status_code
+        )
+        assert (
+            HTTPStatus.ACCEPTED
+            == post(dict(VALID_DATA, email="other@example.com")).status_code
+        )
+        assert 2 == len(mail.outbox)
+
+    async def test_async_send(self):
+        """
+        The async view sends valid submissions.
+
+        """
+        response = await self.async_client.post(
+            reverse("test_async_api"), VALID_DATA, content_type="application/json"
+        )
+        assert HTTPStatus.ACCEPTED == response.status_code
+        assert 1 == len(mail.outbox)
+
+    async def test_async_invalid(self):
+        """
+        The async view rejects invalid and malformed submissions.
+
+        """
+        response = await self.async_client.post(
+            reverse("test_async_api"), {"name": "Test"}, content_type="application/json"
+        )
+        assert HTTPStatus.BAD_REQUEST == response.status_code
+        assert "email" in response.json()["errors"]
+        response = await self.async_client.post(reverse("test_async_api"), VALID_DATA)
+        assert HTTPStatus.UNSUPPORTED_MEDIA_TYPE == response.status_code
+        assert 0 == len(mail.outbox)
+
+    async def test_async_rate_limited(self):
+        """
+        The async view applies rate limits.
+
+        """
+        for _ in range(2):
+            response = await self.async_client.post(
+                reverse("test_async_api_limited"),
+                VALID_DATA,
+                content_type="application/json",
+            )
+        assert HTTPStatus.TOO_MANY_REQUESTS == response.status_code
+        assert 1 == len(mail.outbox)
+
+    async def test_async_rate_limited_by_email(self):
+        """
+        The async view also limits by the email address in the JSON body.
+
+        """
+        view = AsyncContactFormAPIView.as_view(rate_limits=[RateLimit("email", rate=1)])
+        for status in (HTTPStatus.ACCEPTED, HTTPStatus.TOO_MANY_REQUESTS):
+            response = await view(
+                RequestFactory().post("/", VALID_DATA, content_type="application/json")
+            )
+            assert status == response.status_code
+        assert 1 == len(mail.outbox)
+
+    def test_urlconfs(self):
+        """
+        The provided URLconfs route to the JSON view.
+
+        """
+        for urlconf in (
+            "django_contact_form.api_urls",
+            "django_contact_form.akismet_api_urls",
+        ):
+            with override_settings(ROOT_URLCONF=urlconf):
+                response = self.client.get(reverse("django_contact_form_api"))
+            assert HTTPStatus.METHOD_NOT_ALLOWED == response.status_code
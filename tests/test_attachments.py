@@ -0,0 +1,275 @@
+"""
+Tests for the attachment-capable contact form and the size-limiting upload handler.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import base64
+import os
+from unittest import mock
+
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.files.uploadhandler import MemoryFileUploadHandler
+from django.test import RequestFactory, TestCase, override_settings
+
+from django_contact_form.delivery import ThreadDeliveryBackend
+from django_contact_form.forms import AttachmentContactForm
+from django_contact_form.mail import ConnectionPool, attachment_part, build_message
+from django_contact_form.models import Submission
+from django_contact_form.uploads import MaxSizeUploadHandler
+
+from .helpers import make_form
+
+
+class HTMLAttachmentForm(AttachmentContactForm):
+    """
+    Attachment form which also sends an HTML version of the message.
+
+    """
+
+    html_template_name = "django_contact_form/test_html_message.html"
+
+
+class SmallUploadHandler(MaxSizeUploadHandler):
+    """
+    Upload handler with a small size limit.
+
+    """
+
+    max_size = 10
+
+
+@override_settings(MANAGERS=[("Manager", "manager@example.com")])
+class AttachmentContactFormTests(TestCase):
+    """
+    Tests for AttachmentContactForm.
+
+    """
+
+    def upload(self, name="report.txt", content=b"Report contents"):
+        """
+        Return an uploaded file.
+
+        """
+        return {"attachment": SimpleUploadedFile(name, content, "text/plain")}
+
+    def test_attachment_sent(self):
+        """
+        An uploaded file is sent as an attachment.
+
+        """
+        form = make_form(AttachmentContactForm, files=self.upload())
+        assert form.is_valid()
+        form.save()
+        assert len(mail.outbox) == 1
+        message = mail.outbox[0].message()
+        attachment = message.get_payload()[1]
+        assert attachment.get_content_type() == "text/plain"
+        assert attachment.get_filename() == "report.txt"
+        assert attachment.get_payload(decode=True) == b"Report contents"
+
+    def test_no_attachment(self):
+        """
+        The attachment is optional.
+
+        """
+        form = make_form(AttachmentContactForm)
+        assert form.is_valid()
+        assert "attachments" not in form.get_message_dict()
+        form.save()
+        assert len(mail.outbox) == 1
+        assert not mail.outbox[0].attachments
+
+    def test_html_message(self):
+        """
+        With html_template_name, an HTML version of the message is sent too.
+
+        """
+        form = make_form(HTMLAttachmentForm, files=self.upload())
+        assert form.is_valid()
+        form.save()
+        assert mail.outbox[0].alternatives[0][0] == "<p>Test message</p>\n"
+
+    def test_too_large(self):
+        """
+        Files larger than max_attachment_size are rejected.
+
+        """
+        with mock.patch.object(AttachmentContactForm, "max_attachment_size", 4):
+            form = make_form(AttachmentContactForm, files=self.upload())
+            assert not form.is_valid()
+        assert form.errors["attachment"] == [
+            "Attachments must be no larger than 4\xa0bytes."
+        ]
+
+    def test_connection_pool(self):
+        """
+        Attachments are sent over a pooled connection.
+
+        """
+        form = make_form(AttachmentContactForm, files=self.upload())
+        form.connection_pool = ConnectionPool()
+        assert form.is_valid()
+        form.save()
+        assert mail.outbox[0].attachments
+
+    def test_delivery_backend(self):
+        """
+        Messages with attachments can't be handed to a delivery backend; others can.
+
+        """
+        form = make_form(AttachmentContactForm, files=self.upload())
+        form.delivery_backend = ThreadDeliveryBackend()
+        assert form.is_valid()
+        with self.assertRaises(ImproperlyConfigured):
+            form.save()
+        form = make_form(AttachmentContactForm)
+        form.delivery_backend = ThreadDeliveryBackend()
+        assert form.is_valid()
+        form.save()
+        form.delivery_backend.join()
+        assert len(mail.outbox) == 1
+
+    def test_fan_out(self):
+        """
+        When a message is sent to each recipient individually, every copy gets the
+        whole attachment, encoded once and shared between the copies.
+
+        """
+
+        class FanOutForm(AttachmentContactForm):
+            """
+            Attachment form which sends a copy to each of many recipients.
+
+            """
+
+            fan_out = True
+            recipient_list = [f"manager{number}@example.com" for number in range(20)]
+
+        content = os.urandom(390 * 1024)
+        with TemporaryUploadedFile(
+            "data.bin", "application/octet-stream", len(content), None
+        ) as upload:
+            upload.write(content)
+            form = make_form(FanOutForm, files={"attachment": upload})
+            assert form.is_valid()
+            with mock.patch(
+                "django_contact_form.mail.build_message", wraps=build_message
+            ) as build:
+                form.save()
+        assert len(mail.outbox) == 20
+        parts = {id(call.kwargs["attachments"][0]) for call in build.call_args_list}
+        assert 1 == len(parts)
+        shared = build.call_args.kwargs["attachments"][0]
+        assert shared.get_payload(decode=True) == content
+        for message in mail.outbox:
+            attachment = message.message().get_payload()[1]
+            assert attachment.get_payload(decode=True) == content
+
+    def test_content_hash(self):
+        """
+        Submissions attaching different files of the same name have different content
+        hashes, and hashing doesn't consume the upload.
+
+        """
+
+        def content_hash(content):
+            """
+            Return the content hash of a submission attaching the given content.
+
+            """
+            form = make_form(AttachmentContactForm, files=self.upload(content=content))
+            assert form.is_valid()
+            return form, form.get_content_hash()
+
+        form, first = content_hash(b"First report")
+        assert first == content_hash(b"First report")[1]
+        assert first != content_hash(b"Other report")[1]
+        form.save()
+        attachment = mail.outbox[0].message().get_payload()[1]
+        assert attachment.get_payload(decode=True) == b"First report"
+
+    def test_store_submissions(self):
+        """
+        Stored submissions record the names of attached files.
+
+        """
+        form = make_form(AttachmentContactForm, files=self.upload())
+        form.store_submissions = True
+        assert form.is_valid()
+        form.save()
+        assert Submission.objects.get().message["attachments"] == ["report.txt"]
+
+
+class AttachmentPartTests(TestCase):
+    """
+    Tests for building attachment MIME parts.
+
+    """
+
+    def test_chunked_encoding(self):
+        """
+        Files spanning several chunks are encoded correctly.
+
+        """
+        content = bytes(range(256)) * 1000
+        with TemporaryUploadedFile("data.bin", None, len(content), None) as upload:
+            upload.write(content)
+            with mock.patch("django_contact_form.mail._ATTACHMENT_CHUNK_SIZE", 570):
+                part = attachment_part(upload)
+        assert part.get_content_type() == "application/octet-stream"
+        assert base64.b64decode(part.get_payload()) == content
+        assert all(len(line) <= 76 for line in part.get_payload().splitlines())
+
+    def test_non_ascii_filename(self):
+        """
+        Non-ASCII filenames are encoded.
+
+        """
+        part = attachment_part(SimpleUploadedFile("résumé.txt", b"", "text/plain"))
+        assert part.get_filename() == "résumé.txt"
+
+
+class MaxSizeUploadHandlerTests(TestCase):
+    """
+    Tests for MaxSizeUploadHandler.
+
+    """
+
+    def request(self, content):
+        """
+        Return a request uploading the given content, handled by a SmallUploadHandler.
+
+        """
+        request = RequestFactory().post(
+            "/", {"attachment": SimpleUploadedFile("upload.txt", content)}
+        )
+        request.upload_handlers = [
+            SmallUploadHandler(request),
+            MemoryFileUploadHandler(request),
+        ]
+        return request
+
+    def test_small_upload(self):
+        """
+        Files within the limit are passed through.
+
+        """
+        upload = self.request(b"small").FILES["attachment"]
+        assert upload.read() == b"small"
+
+    def test_large_upload(self):
+        """
+        Files over the limit are replaced by an empty placeholder of their size.
+
+        """
+        upload = self.request(b"x" * 100).FILES["attachment"]
+        assert upload.size == 100
+        assert upload.read() == b""
+        assert upload.name == "upload.txt"
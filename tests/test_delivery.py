@@ -0,0 +1,139 @@
+"""
+Tests for the message delivery backends.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+
+from django_contact_form.delivery import (
+    BaseDeliveryBackend,
+    DatabaseDeliveryBackend,
+    ThreadDeliveryBackend,
+    drain_queue,
+    serialize_message_dict,
+)
+from django_contact_form.models import QueuedMessage
+
+from .helpers import VALID_DATA, valid_form
+
+
+class DeliveryBackendTests(TestCase):
+    """
+    Tests for the delivery backends and the queue-draining command.
+
+    """
+
+    def form(self, backend):
+        """
+        Return a valid contact form using the given delivery backend.
+
+        """
+        form = valid_form()
+        form.delivery_backend = backend
+        return form
+
+    def test_serialize(self):
+        """
+        Serializing a message dict converts lazy strings and tuples.
+
+        """
+        serialized = serialize_message_dict(
+            {"subject": gettext_lazy("Subject"), "recipient_list": ("a@example.com",)}
+        )
+        assert {"subject": "Subject", "recipient_list": ["a@example.com"]} == serialized
+        assert isinstance(serialized["subject"], str)
+
+    def test_base_backend(self):
+        """
+        The base backend does not implement enqueue().
+
+        """
+        with self.assertRaises(NotImplementedError):
+            BaseDeliveryBackend().enqueue({})
+
+    def test_thread_backend(self):
+        """
+        The thread backend sends the message in the background.
+
+        """
+        backend = ThreadDeliveryBackend()
+        self.form(backend).save()
+        backend.join()
+        assert 1 == len(mail.outbox)
+        assert VALID_DATA["body"] in mail.outbox[0].body
+
+    def test_thread_backend_failure(self):
+        """
+        The thread backend logs failures and keeps processing the queue.
+
+        """
+        backend = ThreadDeliveryBackend()
+        with mock.patch.object(
+            ThreadDeliveryBackend._pool,  # pylint: disable=protected-access
+            "send_messages",
+            side_effect=[OSError("boom"), 1],
+        ) as send, self.assertLogs("django_contact_form.delivery", "ERROR"):
+            self.form(backend).save()
+            self.form(backend).save()
+            backend.join()
+        assert 2 == send.call_count
+
+    def test_database_backend(self):
+        """
+        The database backend stores the message, and the management command sends it.
+
+        """
+        self.form(DatabaseDeliveryBackend()).save()
+        assert 0 == len(mail.outbox)
+        queued = QueuedMessage.objects.get()
+        assert VALID_DATA["body"] in str(queued.message["message"])
+        assert queued.message["subject"] == str(queued)
+
+        stdout = StringIO()
+        call_command("drain_contact_form_queue", stdout=stdout)
+        assert "Sent 1 message(s); 0 failed; 0 discarded as spam." in stdout.getvalue()
+        assert 1 == len(mail.outbox)
+        assert not QueuedMessage.objects.exists()
+
+    async def test_database_backend_async(self):
+        """
+        The database backend is usable from asave().
+
+        """
+        await self.form(DatabaseDeliveryBackend()).asave()
+        assert 1 == await QueuedMessage.objects.acount()
+
+    def test_drain_batches(self):
+        """
+        Draining the queue processes all batches.
+
+        """
+        for _ in range(5):
+            self.form(DatabaseDeliveryBackend()).save()
+        assert (5, 0, 0) == drain_queue(batch_size=2)
+        assert 5 == len(mail.outbox)
+
+    def test_drain_failure(self):
+        """
+        Messages which fail to send are kept, with the failure recorded, until they
+        reach the maximum number of attempts.
+
+        """
+        self.form(DatabaseDeliveryBackend()).save()
+        with mock.patch(
+            "django_contact_form.delivery.send_mail", side_effect=OSError("boom")
+        ):
+            assert (0, 1, 0) == drain_queue()
+            assert (0, 1, 0) == drain_queue()
+            assert (0, 0, 0) == drain_queue(max_attempts=2)
+        queued = QueuedMessage.objects.get()
+        assert 2 == queued.attempts
+        assert "boom" == queued.last_error
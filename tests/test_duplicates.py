@@ -0,0 +1,232 @@
+"""
+Tests for duplicate-submission suppression.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from django_contact_form import forms as contact_forms
+from django_contact_form.cache import LRUCache
+from django_contact_form.forms import AkismetContactForm, ContactForm
+
+from .helpers import VALID_DATA, make_form, valid_form
+
+
+class DeduplicatingForm(ContactForm):
+    """
+    Contact form which suppresses duplicate submissions.
+
+    """
+
+    duplicate_window = 60
+
+
+class SharedDeduplicatingForm(DeduplicatingForm):
+    """
+    Contact form which records recent submissions in a Django cache.
+
+    """
+
+    duplicate_cache_alias = "default"
+
+
+class DeduplicatingAkismetForm(AkismetContactForm):
+    """
+    Akismet contact form which suppresses duplicate submissions.
+
+    """
+
+    duplicate_window = 60
+
+
+class LRUCacheTests(TestCase):
+    """
+    Tests for the in-process cache.
+
+    """
+
+    def test_add_and_get(self):
+        """
+        add() sets a key only if it has no value.
+
+        """
+        cache = LRUCache()
+        assert cache.get("key") is None
+        assert cache.add("key", "value", 60)
+        assert not cache.add("key", "other", 60)
+        assert cache.get("key") == "value"
+
+    def test_expiry(self):
+        """
+        Entries expire after their timeout.
+
+        """
+        cache = LRUCache()
+        with mock.patch("time.monotonic", return_value=100.0):
+            cache.add("key", "value", 10)
+        with mock.patch("time.monotonic", return_value=110.0):
+            assert cache.get("key", "default") == "default"
+            assert cache.add("key", "other", 10)
+            assert cache.get("key") == "other"
+
+    def test_eviction(self):
+        """
+        When full, the least-recently-used entry is evicted.
+
+        """
+        cache = LRUCache(max_entries=2)
+        cache.add("first", 1, 60)
+        cache.add("second", 2, 60)
+        cache.get("first")
+        cache.add("third", 3, 60)
+        assert cache.get("first") == 1
+        assert cache.get("second") is None
+        assert cache.get("third") == 3
+
+    def test_delete(self):
+        """
+        delete() removes an entry, and ignores missing keys.
+
+        """
+        cache = LRUCache()
+        cache.add("key", "value", 60)
+        cache.delete("key")
+        cache.delete("missing")
+        assert cache.get("key") is None
+
+
+@mock.patch.object(contact_forms, "_recent_submissions", new_callable=LRUCache)
+class DuplicateSubmissionTests(TestCase):
+    """
+    Tests for suppressing duplicate submissions.
+
+    """
+
+    def test_disabled_by_default(self, recent):
+        """
+        Without duplicate_window, identical submissions are all sent.
+
+        """
+        for _ in range(2):
+            form = valid_form(ContactForm)
+            assert not form.is_duplicate()
+            form.save()
+        assert len(mail.outbox) == 2
+        assert not recent._entries  # pylint: disable=protected-access
+
+    def test_duplicate_suppressed(self, _recent):
+        """
+        An identical submission within the window is not sent again.
+
+        """
+        first = valid_form(DeduplicatingForm)
+        assert not first.is_duplicate()
+        first.save()
+        second = valid_form(DeduplicatingForm)
+        assert second.is_duplicate()
+        second.save()
+        assert len(mail.outbox) == 1
+
+    def test_normalized(self, _recent):
+        """
+        Differences in case and whitespace don't distinguish submissions.
+
+        """
+        valid_form(DeduplicatingForm).save()
+        data = dict(VALID_DATA, body="  test   MESSAGE ")
+        assert valid_form(DeduplicatingForm, data=data).is_duplicate()
+
+    def test_different_data_or_address(self, _recent):
+        """
+        Submissions with different data, or from a different address, are sent.
+
+        """
+        valid_form(DeduplicatingForm).save()
+        valid_form(
+            DeduplicatingForm, data=dict(VALID_DATA, body="Another message")
+        ).save()
+        valid_form(DeduplicatingForm, address="192.0.2.1").save()
+        assert len(mail.outbox) == 3
+
+    def test_invalid(self, recent):
+        """
+        Saving an invalid form raises ValueError, as without duplicate_window.
+
+        """
+        form = make_form(DeduplicatingForm, data={})
+        with self.assertRaises(ValueError):
+            form.save()
+        with self.assertRaises(ValueError):
+            async_to_sync(form.asave)()
+        assert not recent._entries  # pylint: disable=protected-access
+
+    def test_failed_send_released(self, _recent):
+        """
+        A submission which fails to send can be retried.
+
+        """
+        form = valid_form(DeduplicatingForm)
+        with mock.patch.object(form, "_send", side_effect=OSError):
+            with self.assertRaises(OSError):
+                form.save()
+        form = valid_form(DeduplicatingForm)
+        assert not form.is_duplicate()
+        form.save()
+        assert len(mail.outbox) == 1
+
+    def test_async(self, _recent):
+        """
+        asave() suppresses duplicates, and releases failed submissions, too.
+
+        """
+        form = valid_form(DeduplicatingForm)
+        with mock.patch.object(form, "_send", side_effect=OSError):
+            with self.assertRaises(OSError):
+                async_to_sync(form.asave)()
+        for _ in range(2):
+            async_to_sync(valid_form(DeduplicatingForm).asave)()
+        assert len(mail.outbox) == 1
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_shared_cache(self, recent):
+        """
+        With duplicate_cache_alias, submissions are recorded in that cache.
+
+        """
+        valid_form(SharedDeduplicatingForm).save()
+        assert valid_form(SharedDeduplicatingForm).is_duplicate()
+        assert not recent._entries  # pylint: disable=protected-access
+
+    @mock.patch("django_contact_form.forms.AkismetContactForm._akismet_verdict")
+    def test_akismet_skipped(self, verdict, _recent):
+        """
+        Duplicates of a saved submission are not checked for spam again.
+
+        """
+        verdict.return_value = False
+        valid_form(DeduplicatingAkismetForm).save()
+        valid_form(DeduplicatingAkismetForm).save()
+        assert verdict.call_count == 1
+        assert len(mail.outbox) == 1
+
+    @mock.patch("django_contact_form.forms.AkismetContactForm._aakismet_verdict")
+    def test_akismet_skipped_async(self, verdict, _recent):
+        """
+        Duplicates are not checked for spam again by async validation.
+
+        """
+        verdict.return_value = False
+        for _ in range(2):
+            form = make_form(DeduplicatingAkismetForm)
+            assert async_to_sync(form.ais_valid)()
+            async_to_sync(form.asave)()
+        assert verdict.call_count == 1
+        assert len(mail.outbox) == 1
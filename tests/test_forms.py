@@ -5,11 +5,19 @@ Tests for the built-in form classes.
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
 from django.core import mail
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
-from django_contact_form.forms import ContactForm
+from django_contact_form.forms import ContactForm, prewarm_templates
+from django_contact_form.renderers import _load_template, clear_template_cache
 
 
 class ContactFormTests(TestCase):
@@ -60,6 +68,60 @@ class ContactFormTests(TestCase):
         assert settings.DEFAULT_FROM_EMAIL == message.from_email
         assert form.recipient_list == message.recipients()
 
+    async def test_async_thread_hops(self):
+        """
+        Async validation and sending each run their synchronous work in a single
+        thread hop, and validating again needs none.
+
+        """
+        form = ContactForm(request=self.request(), data=self.valid_data)
+        with mock.patch(
+            "django_contact_form.forms.sync_to_async", wraps=sync_to_async
+        ) as hop:
+            assert await form.ais_valid()
+            assert await form.ais_valid()
+            await form.asave()
+        assert 2 == hop.call_count
+        assert 1 == len(mail.outbox)
+
+    def test_message_context_cached(self):
+        """
+        The site lookup for the message context happens only once per submission.
+
+        """
+        form = ContactForm(request=self.request(), data=self.valid_data)
+        with mock.patch(
+            "django_contact_form.forms.get_current_site", wraps=get_current_site
+        ) as site_lookup:
+            form.save()
+            assert 1 == site_lookup.call_count
+        assert 1 == len(mail.outbox)
+
+    def test_message_context_copy(self):
+        """
+        Modifying a returned message context doesn't affect later calls.
+
+        """
+        form = ContactForm(request=self.request(), data=self.valid_data)
+        context = form.get_message_context()
+        context["name"] = "Changed"
+        assert "Test" == form.get_message_context()["name"]
+
+    def test_message_context_invalidated(self):
+        """
+        The cached message context is discarded when the form's data changes.
+
+        """
+        form = ContactForm(request=self.request(), data=self.valid_data)
+        assert "Test" == form.get_message_context()["name"]
+
+        form.cleaned_data["name"] = "Changed"
+        assert "Changed" == form.get_message_context()["name"]
+
+        form.data = dict(self.valid_data, name="Revalidated")
+        form.full_clean()
+        assert "Revalidated" == form.get_message_context()["name"]
+
     def test_no_sites(self):
         """
         Sites integration works with or without installed
@@ -91,6 +153,44 @@ class ContactFormTests(TestCase):
         message = mail.outbox[0]
         assert recipient_list == message.recipients()
 
+    def test_settings_defaults(self):
+        """
+        The default sender and recipients follow changes to settings.
+
+        """
+        with override_settings(
+            DEFAULT_FROM_EMAIL="changed@example.com",
+            MANAGERS=[("Changed", "manager@example.com")],
+        ):
+            form = ContactForm(request=self.request(), data=self.valid_data)
+            assert form.is_valid()
+            message_dict = form.get_message_dict()
+        assert message_dict["from_email"] == "changed@example.com"
+        assert message_dict["recipient_list"] == ["manager@example.com"]
+        assert ContactForm.from_email == settings.DEFAULT_FROM_EMAIL
+
+    def test_import_without_settings(self):
+        """
+        The forms and URLconfs can be imported before settings are configured, and
+        doing so doesn't import the Akismet client.
+
+        """
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        environment.pop("DJANGO_SETTINGS_MODULE", None)
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; import django_contact_form.akismet_urls; "
+                "print('akismet' in sys.modules, 'httpx' in sys.modules)",
+            ],
+            env=environment,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        assert result.stdout.split() == ["False", "False"]
+
     def test_callable_template_name(self):
         """
         When a template_name() method is defined, it is used and
@@ -121,6 +221,72 @@ class ContactFormTests(TestCase):
         message = mail.outbox[0]
         assert "Callable template_name used." in message.body
 
+    def test_template_name_list(self):
+        """
+        A list of template names selects the first template which exists.
+
+        """
+
+        class TemplateNameList(ContactForm):
+            """
+            Form with a list of template names.
+
+            """
+
+            template_name = [
+                "django_contact_form/nonexistent.txt",
+                "django_contact_form/test_callable_template_name.html",
+            ]
+
+        form = TemplateNameList(request=self.request(), data=self.valid_data)
+        assert "Callable template_name used." in form.message()
+
+    def test_template_cache(self):
+        """
+        Compiled templates are cached until the cache is cleared, including by a change
+        to the TEMPLATES setting.
+
+        """
+        clear_template_cache()
+        form = ContactForm(request=self.request(), data=self.valid_data)
+        form.save()
+        assert 2 == _load_template.cache_info().currsize
+        with mock.patch("django_contact_form.renderers.loader") as template_loader:
+            form.message()
+            template_loader.get_template.assert_not_called()
+
+        clear_template_cache(setting="DEBUG")
+        assert 2 == _load_template.cache_info().currsize
+        with self.settings(TEMPLATES=settings.TEMPLATES):
+            assert 0 == _load_template.cache_info().currsize
+
+    def test_prewarm_templates(self):
+        """
+        Pre-warming compiles the templates of form classes, skipping template names
+        given by methods and templates which don't exist.
+
+        """
+
+        class MissingTemplate(ContactForm):
+            """
+            Form with a template that doesn't exist, and a callable template name.
+
+            """
+
+            subject_template_name = "django_contact_form/nonexistent.txt"
+
+            def template_name(self):  # pylint: disable=invalid-overridden-method
+                """
+                Return the template name as a method rather than an attribute.
+
+                """
+                return "django_contact_form/contact_form.txt"  # pragma: no cover
+
+        clear_template_cache()
+        prewarm_templates()
+        assert _load_template.cache_info().currsize >= 2
+        del MissingTemplate
+
     def test_callable_message_parts(self):
         """
         Message parts implemented as methods are called and preferred
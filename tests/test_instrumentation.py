@@ -0,0 +1,179 @@
+"""
+Tests for the timing instrumentation.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from django_contact_form.forms import AkismetContactForm, ContactForm
+from django_contact_form.instrumentation import (
+    MetricsReceiver,
+    PrometheusMetrics,
+    StatsdMetrics,
+    log_stage,
+    stage_finished,
+    timed,
+)
+from django_contact_form.views import ContactFormView
+
+from .helpers import VALID_DATA, make_form
+
+
+@override_settings(ROOT_URLCONF="tests.test_urls")
+class InstrumentationTests(TestCase):
+    """
+    Tests for the stage_finished signal and its receivers.
+
+    """
+
+    def setUp(self):
+        """
+        Record the stages reported during each test.
+
+        """
+        self.stages = []
+        stage_finished.connect(self.record, weak=False)
+        self.addCleanup(stage_finished.disconnect, self.record)
+
+    def record(self, sender, **kwargs):
+        """
+        Receiver recording a reported stage.
+
+        """
+        self.stages.append(dict(kwargs, sender=sender))
+
+    def stage(self, name):
+        """
+        Return the report of the named stage.
+
+        """
+        return next(stage for stage in self.stages if stage["stage"] == name)
+
+    def test_view_stages(self):
+        """
+        Submitting the contact form reports each stage, with its outcome and payload
+        size.
+
+        """
+        self.client.post(reverse("django_contact_form"), data=VALID_DATA)
+        assert [
+            "validation",
+            "site_lookup",
+            "render_message",
+            "render_subject",
+            "send",
+            "request",
+        ] == [stage["stage"] for stage in self.stages]
+        assert all(stage["duration"] >= 0 for stage in self.stages)
+        assert "valid" == self.stage("validation")["outcome"]
+        assert ContactForm is self.stage("send")["sender"]
+        assert self.stage("send")["payload_size"] == len(
+            self.stage("send")["instance"].message()
+        )
+        assert ContactFormView is self.stage("request")["sender"]
+        assert self.stage("request")["payload_size"] > 0
+
+    def test_async_view(self):
+        """
+        The async view also reports the request stage.
+
+        """
+        self.client.post(reverse("test_async"), data={})
+        assert "invalid" == self.stage("validation")["outcome"]
+        assert "ok" == self.stage("request")["outcome"]
+
+    def test_spam_check(self):
+        """
+        The spam check reports whether the submission was spam.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check.return_value = True
+        with mock.patch.object(
+            AkismetContactForm, "get_akismet_client", return_value=akismet_client
+        ):
+            form = make_form(AkismetContactForm)
+            form.is_valid()
+        assert "spam" == self.stage("spam_check")["outcome"]
+        assert len(VALID_DATA["body"]) == self.stage("spam_check")["payload_size"]
+
+    def test_error(self):
+        """
+        A stage which raises an exception has the outcome "error".
+
+        """
+        with self.assertRaises(ValueError), timed("test", self):
+            raise ValueError
+        assert "error" == self.stage("test")["outcome"]
+
+    def test_bad_content_length(self):
+        """
+        An unparseable Content-Length is reported as a payload size of zero.
+
+        """
+        request = RequestFactory().post("/", data=VALID_DATA)
+        request.META["CONTENT_LENGTH"] = "garbage"
+        request.POST  # pylint: disable=pointless-statement
+        ContactFormView.as_view()(request)
+        assert 0 == self.stage("request")["payload_size"]
+
+    def test_log_stage(self):
+        """
+        log_stage() logs each stage with structured attributes.
+
+        """
+        stage_finished.connect(log_stage)
+        self.addCleanup(stage_finished.disconnect, log_stage)
+        with self.assertLogs("django_contact_form.instrumentation", "INFO") as logs:
+            with timed("test", self, payload_size=12):
+                pass
+        record = logs.records[0]
+        assert "test" == record.stage
+        assert "ok" == record.outcome
+        assert 12 == record.payload_size
+        assert record.duration_ms >= 0
+
+    def test_statsd(self):
+        """
+        StatsdMetrics reports a timer and an outcome counter for each stage.
+
+        """
+        client = mock.Mock()
+        metrics = StatsdMetrics(client, prefix="contact")
+        metrics.connect()
+        with timed("test", self):
+            pass
+        metrics.disconnect()
+        with timed("test", self):
+            pass
+        client.timing.assert_called_once()
+        assert "contact.test" == client.timing.call_args.args[0]
+        client.incr.assert_called_once_with("contact.test.ok")
+
+    def test_prometheus(self):
+        """
+        PrometheusMetrics observes each stage's duration in a labelled histogram.
+
+        """
+        histogram = mock.Mock()
+        metrics = PrometheusMetrics(histogram)
+        metrics.connect()
+        self.addCleanup(metrics.disconnect)
+        with timed("test", self):
+            pass
+        histogram.labels.assert_called_once_with(stage="test", outcome="ok")
+        histogram.labels.return_value.observe.assert_called_once()
+
+    def test_base_receiver(self):
+        """
+        MetricsReceiver subclasses must implement record().
+
+        """
+        with self.assertRaises(NotImplementedError):
+            MetricsReceiver().record("test", 0.0, "ok")
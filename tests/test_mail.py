@@ -0,0 +1,316 @@
+"""
+Tests for the connection pool and batch-sending helpers.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+# pylint: disable=protected-access
+
+import smtplib
+from unittest import mock
+
+from django.core import mail
+from django.test import RequestFactory, TestCase
+
+from django_contact_form.forms import ContactForm
+from django_contact_form.mail import (
+    ConnectionPool,
+    DeliveryError,
+    build_message,
+    send_individually,
+    send_many,
+)
+
+from .helpers import valid_form
+
+
+class ConnectionPoolTests(TestCase):
+    """
+    Tests for ConnectionPool and send_many().
+
+    """
+
+    def message(self):
+        """
+        Return an email message for test use.
+
+        """
+        return build_message("Subject", "Body", "from@example.com", ["to@example.com"])
+
+    def test_build_message_html(self):
+        """
+        An HTML message is attached as an alternative.
+
+        """
+        message = build_message(
+            "Subject", "Body", None, ["to@example.com"], html_message="<p>Body</p>"
+        )
+        assert [("<p>Body</p>", "text/html")] == message.alternatives
+
+    def test_connection_reused(self):
+        """
+        The pool reuses one connection across sends.
+
+        """
+        pool = ConnectionPool()
+        with mock.patch(
+            "django_contact_form.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            for _ in range(3):
+                assert 1 == pool.send_messages([self.message()])
+        assert 1 == get_connection.call_count
+        assert 3 == len(mail.outbox)
+
+    def test_max_messages(self):
+        """
+        Connections are closed once they have sent the maximum number of messages.
+
+        """
+        pool = ConnectionPool(max_messages=2)
+        with mock.patch(
+            "django_contact_form.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            for _ in range(4):
+                pool.send_messages([self.message()])
+        assert 2 == get_connection.call_count
+
+    def test_idle_timeout(self):
+        """
+        Connections idle for longer than the timeout are not reused.
+
+        """
+        pool = ConnectionPool(idle_timeout=0)
+        with mock.patch(
+            "django_contact_form.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            pool.send_messages([self.message()])
+            pool.send_messages([self.message()])
+        assert 2 == get_connection.call_count
+
+    def test_settings_change(self):
+        """
+        Connections are pooled separately per mail settings.
+
+        """
+        pool = ConnectionPool()
+        pool.send_messages([self.message()])
+        with self.settings(EMAIL_HOST="mail.example.com"):
+            assert pool._checkout(pool._settings_key()) == (None, 0)
+
+    def test_dead_smtp_connection(self):
+        """
+        Pooled SMTP connections which fail a NOOP check are discarded.
+
+        """
+        pool = ConnectionPool()
+        connection = mock.Mock()
+        connection.connection = mock.Mock(spec=smtplib.SMTP)
+        connection.connection.noop.side_effect = smtplib.SMTPServerDisconnected
+        pool._checkin("key", connection, 0)
+        assert (None, 0) == pool._checkout("key")
+        connection.close.assert_called_once_with()
+
+        connection = mock.Mock()
+        connection.connection = mock.Mock(spec=smtplib.SMTP)
+        connection.connection.noop.return_value = (250, b"OK")
+        pool._checkin("key", connection, 1)
+        assert (connection, 1) == pool._checkout("key")
+
+    def test_send_failure(self):
+        """
+        A connection which fails to send is closed rather than pooled.
+
+        """
+        pool = ConnectionPool()
+        connection = mock.Mock()
+        connection.send_messages.side_effect = OSError("boom")
+        with mock.patch(
+            "django_contact_form.mail.get_connection", return_value=connection
+        ), self.assertRaises(OSError):
+            pool.send_messages([self.message()])
+        connection.close.assert_called_once_with()
+        assert (None, 0) == pool._checkout(pool._settings_key())
+
+    def test_close_all(self):
+        """
+        close_all() closes and discards idle connections.
+
+        """
+        pool = ConnectionPool()
+        connection = mock.Mock()
+        pool._checkin("key", connection, 0)
+        pool.close_all()
+        connection.close.assert_called_once_with()
+        assert (None, 0) == pool._checkout("key")
+
+    def test_form_uses_pool(self):
+        """
+        A form with a connection pool sends through it.
+
+        """
+        pool = ConnectionPool()
+        form = valid_form()
+        form.connection_pool = pool
+        with mock.patch.object(pool, "send_messages", return_value=1) as send:
+            form.save()
+        send.assert_called_once()
+
+    async def test_form_uses_pool_async(self):
+        """
+        A form with a connection pool sends through it from asave().
+
+        """
+        form = valid_form()
+        form.connection_pool = ConnectionPool()
+        await form.asave()
+        assert 1 == len(mail.outbox)
+
+    def test_send_many(self):
+        """
+        send_many() sends all the forms' messages over one connection.
+
+        """
+        forms = [valid_form() for _ in range(3)]
+        with mock.patch(
+            "django_contact_form.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            assert 3 == send_many(forms)
+        assert 1 == get_connection.call_count
+        assert 3 == len(mail.outbox)
+        assert 0 == send_many([])
+
+    def test_send_many_pool(self):
+        """
+        send_many() can use a connection pool.
+
+        """
+        pool = ConnectionPool()
+        assert 2 == send_many([valid_form(), valid_form()], connection_pool=pool)
+        assert 2 == len(mail.outbox)
+
+    def test_send_many_invalid(self):
+        """
+        send_many() refuses invalid forms.
+
+        """
+        form = ContactForm(request=RequestFactory().request(), data={})
+        with self.assertRaises(ValueError):
+            send_many([valid_form(), form])
+        assert 0 == len(mail.outbox)
+
+
+class FanOutTests(TestCase):
+    """
+    Tests for sending a copy of a message to each recipient.
+
+    """
+
+    recipients = ["one@example.com", "two@example.com", "three@example.com"]
+
+    def message_dict(self):
+        """
+        Return a message dictionary addressed to several recipients.
+
+        """
+        return {
+            "subject": "Subject",
+            "message": "Body",
+            "from_email": "from@example.com",
+            "recipient_list": self.recipients,
+        }
+
+    def failing_send(self, failures):
+        """
+        Return a replacement for ConnectionPool.send_messages() which fails the given
+        number of times for each address in ``failures``.
+
+        """
+        original = ConnectionPool.send_messages
+        remaining = dict(failures)
+
+        def send_messages(pool, messages, fail_silently=False):
+            """
+            Fail for the listed recipients, and send otherwise.
+
+            """
+            recipient = messages[0].to[0]
+            if remaining.get(recipient):
+                remaining[recipient] -= 1
+                raise OSError(f"rejected {recipient}")
+            return original(pool, messages, fail_silently=fail_silently)
+
+        return send_messages
+
+    def test_send_individually(self):
+        """
+        Each recipient gets their own copy of the message.
+
+        """
+        results = send_individually(self.message_dict())
+        assert results == dict.fromkeys(self.recipients)
+        assert sorted(message.to for message in mail.outbox) == sorted(
+            [recipient] for recipient in self.recipients
+        )
+
+    def test_no_recipients(self):
+        """
+        With no recipients, nothing is sent.
+
+        """
+        assert not send_individually(dict(self.message_dict(), recipient_list=[]))
+        assert not mail.outbox
+
+    def test_retries(self):
+        """
+        Failures are retried independently, and reported per recipient.
+
+        """
+        send_messages = self.failing_send({"one@example.com": 1, "two@example.com": 3})
+        with mock.patch.object(ConnectionPool, "send_messages", send_messages):
+            results = send_individually(self.message_dict(), retries=2)
+        assert results["one@example.com"] is None
+        assert isinstance(results["two@example.com"], OSError)
+        assert results["three@example.com"] is None
+        assert len(mail.outbox) == 2
+
+    def test_connection_pool(self):
+        """
+        A given connection pool is used, and left open.
+
+        """
+        pool = ConnectionPool()
+        with mock.patch.object(pool, "close_all") as close_all:
+            send_individually(self.message_dict(), connection_pool=pool)
+        close_all.assert_not_called()
+        assert len(mail.outbox) == 3
+
+    def test_form_fan_out(self):
+        """
+        A form with fan_out set sends each recipient a copy, and records the results.
+
+        """
+        form = valid_form(recipient_list=self.recipients)
+        form.fan_out = True
+        form.save()
+        assert form.delivery_results == dict.fromkeys(self.recipients)
+        assert len(mail.outbox) == 3
+
+    def test_form_fan_out_failure(self):
+        """
+        Failed copies raise DeliveryError, unless failing silently.
+
+        """
+        form = valid_form(recipient_list=self.recipients)
+        form.fan_out = True
+        form.fan_out_retries = 0
+        send_messages = self.failing_send({"two@example.com": 2})
+        with mock.patch.object(ConnectionPool, "send_messages", send_messages):
+            with self.assertRaises(DeliveryError) as context:
+                form.save()
+            form.save(fail_silently=True)
+        assert str(context.exception) == (
+            "Failed to send to 1 of 3 recipients: two@example.com"
+        )
+        assert isinstance(form.delivery_results["two@example.com"], OSError)
+        assert len(mail.outbox) == 4
@@ -0,0 +1,127 @@
+"""
+Tests for rate limiting of submissions.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from http import HTTPStatus
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from django_contact_form.ratelimit import RateLimit
+from django_contact_form.views import AsyncContactFormView, ContactFormView
+
+from .helpers import VALID_DATA
+
+
+class RateLimitTests(TestCase):
+    """
+    Tests for RateLimit and its use by the contact-form views.
+
+    """
+
+    def setUp(self):
+        """
+        Ensure counts don't carry over between tests.
+
+        """
+        cache.clear()
+
+    def post(self, data=None, remote_addr="127.0.0.1"):
+        """
+        Return a POST request with the given data.
+
+        """
+        return RequestFactory().post(
+            "/", data=data or VALID_DATA, REMOTE_ADDR=remote_addr
+        )
+
+    def test_view(self):
+        """
+        Submissions over the limit are rejected without constructing the form.
+
+        """
+        view = ContactFormView.as_view(rate_limits=[RateLimit("ip", rate=2)])
+        for _ in range(2):
+            assert HTTPStatus.FOUND == view(self.post()).status_code
+        with mock.patch.object(ContactFormView, "get_form", side_effect=AssertionError):
+            response = view(self.post())
+        assert HTTPStatus.TOO_MANY_REQUESTS == response.status_code
+        assert "60" == response["Retry-After"]
+        assert 2 == len(mail.outbox)
+        assert HTTPStatus.FOUND == view(self.post(remote_addr="10.0.0.1")).status_code
+
+    async def test_async_view(self):
+        """
+        The async view applies rate limits too.
+
+        """
+        view = AsyncContactFormView.as_view(rate_limits=[RateLimit("site", rate=1)])
+        assert HTTPStatus.FOUND == (await view(self.post())).status_code
+        response = await view(self.post(remote_addr="10.0.0.1"))
+        assert HTTPStatus.TOO_MANY_REQUESTS == response.status_code
+
+    def test_email(self):
+        """
+        Limits by email address ignore case and whitespace, and don't apply to
+        submissions without an address.
+
+        """
+        limit = RateLimit("email", rate=1)
+        assert limit.allow(self.post())
+        assert not limit.allow(self.post(dict(VALID_DATA, email=" TEST@example.com")))
+        assert limit.allow(self.post({"name": "Test"}))
+        assert limit.allow(self.post({"name": "Test"}))
+
+    def test_callable_key(self):
+        """
+        A callable can supply the value to limit by.
+
+        """
+
+        def user_agent(request, data):  # pylint: disable=unused-argument
+            """
+            Limit by user agent.
+
+            """
+            return request.META.get("HTTP_USER_AGENT", "unknown")
+
+        limit = RateLimit(user_agent, rate=1)
+        assert limit.allow(self.post())
+        assert not limit.allow(self.post())
+
+    def test_new_period(self):
+        """
+        The limit resets at the start of each period.
+
+        """
+        limit = RateLimit(rate=1, period=10)
+        with mock.patch("time.time", return_value=1000.0):
+            assert limit.allow(self.post())
+            assert not limit.allow(self.post())
+        with mock.patch("time.time", return_value=1010.0):
+            assert limit.allow(self.post())
+
+    def test_expired_between_add_and_incr(self):
+        """
+        A count which expires just as it's incremented starts again.
+
+        """
+        limit = RateLimit(rate=1)
+        with mock.patch.object(cache, "incr", side_effect=ValueError):
+            assert limit.allow(self.post())
+
+    async def test_async_expired_between_add_and_incr(self):
+        """
+        The async check also handles a count expiring just as it's incremented, and
+        exempts requests the key function can't identify.
+
+        """
+        limit = RateLimit(rate=1)
+        with mock.patch.object(cache, "aincr", side_effect=ValueError):
+            assert await limit.aallow(self.post())
+        assert await RateLimit("email").aallow(self.post({"name": "Test"}))
@@ -0,0 +1,149 @@
+"""
+Tests for the message renderers.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from unittest import mock
+
+from django.template import TemplateDoesNotExist
+from django.test import RequestFactory, TestCase
+
+from django_contact_form.forms import ContactForm, prewarm_templates
+from django_contact_form.renderers import (
+    FormatRenderer,
+    TemplateRenderer,
+    _load_template,
+    clear_template_cache,
+)
+
+
+class FormattedForm(ContactForm):
+    """
+    Contact form which renders its messages from format strings.
+
+    """
+
+    message_renderer = FormatRenderer(
+        {
+            ContactForm.subject_template_name: "Message via {site.domain}\n",
+            ContactForm.template_name: "{name} <{email}> wrote:\n\n{body}",
+        }
+    )
+
+
+class RendererTests(TestCase):
+    """
+    Tests for the message renderers.
+
+    """
+
+    valid_data = {"name": "Test", "email": "test@example.com", "body": "Test & more"}
+
+    template_name = "django_contact_form/test_renderer.txt"
+
+    def request(self):
+        """
+        Construct and return an HttpRequest object for test use.
+
+        """
+        return RequestFactory().request()
+
+    def test_template_renderer(self):
+        """
+        The template renderer runs context processors unless told not to.
+
+        """
+        context = {"body": "Test"}
+        assert "en-us|Test\n" == TemplateRenderer().render(
+            self.template_name, context, self.request()
+        )
+        assert "|Test\n" == TemplateRenderer(context_processors=False).render(
+            self.template_name, context, self.request()
+        )
+
+    def test_form_renderer(self):
+        """
+        A form's message_renderer renders its subject and body.
+
+        """
+
+        class QuickForm(ContactForm):
+            """
+            Contact form which skips context processors.
+
+            """
+
+            template_name = "django_contact_form/test_renderer.txt"
+            message_renderer = TemplateRenderer(context_processors=False)
+
+        form = QuickForm(request=self.request(), data=self.valid_data)
+        assert form.is_valid()
+        assert "|Test &amp; more\n" == form.message()
+        assert "Contact form message" == form.subject()
+
+    def test_format_renderer(self):
+        """
+        The format renderer fills in format strings, without the template engine or
+        HTML escaping.
+
+        """
+        form = FormattedForm(request=self.request(), data=self.valid_data)
+        assert form.is_valid()
+        with mock.patch("django_contact_form.renderers.loader") as template_loader:
+            assert "Test <test@example.com> wrote:\n\nTest & more" == form.message()
+            assert "Message via example.com" == form.subject()
+            template_loader.get_template.assert_not_called()
+
+    def test_format_renderer_names(self):
+        """
+        The format renderer uses the first of a list of template names it has a
+        format string for, and raises TemplateDoesNotExist if it has none.
+
+        """
+        renderer = FormatRenderer({"second.txt": "{body}"})
+        context = {"body": "Test"}
+        assert "Test" == renderer.render(
+            ["first.txt", "second.txt"], context, self.request()
+        )
+        with self.assertRaises(TemplateDoesNotExist):
+            renderer.render("first.txt", context, self.request())
+
+    def test_format_renderer_malformed(self):
+        """
+        Malformed format strings are rejected when the renderer is created.
+
+        """
+        with self.assertRaises(ValueError):
+            FormatRenderer({"broken.txt": "{body"})
+
+    def test_prewarm_skips_format_renderer(self):
+        """
+        Pre-warming doesn't load templates for forms which render without the
+        template engine.
+
+        """
+
+        class MissingFormatted(FormattedForm):
+            """
+            Format-rendered form whose template names don't exist.
+
+            """
+
+            subject_template_name = "django_contact_form/nonexistent_subject.txt"
+            template_name = "django_contact_form/nonexistent.txt"
+
+        clear_template_cache()
+        with mock.patch("django_contact_form.renderers.loader") as template_loader:
+            template_loader.get_template.side_effect = TemplateDoesNotExist("")
+            template_loader.select_template.side_effect = TemplateDoesNotExist("")
+            prewarm_templates()
+            loaded = {
+                call.args[0] for call in template_loader.get_template.call_args_list
+            }
+        assert MissingFormatted.template_name not in loaded
+        assert MissingFormatted.subject_template_name not in loaded
+        assert ContactForm.template_name in loaded
+        assert 0 == _load_template.cache_info().currsize
+        del MissingFormatted
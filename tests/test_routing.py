@@ -0,0 +1,231 @@
+"""
+Tests for recipient routing.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from unittest import mock
+
+from django import forms
+from django.test import TestCase, override_settings
+from django.utils import translation
+
+from django_contact_form.forms import ContactForm
+from django_contact_form.models import Route
+from django_contact_form.routing import (
+    RoutingTable,
+    compile_routes,
+    database_routes,
+    settings_routes,
+)
+
+from .helpers import VALID_DATA, valid_form
+
+ROUTES = [
+    {"recipients": ["default@example.com"]},
+    {"topic": "sales", "recipients": ["sales@example.com"]},
+    {"topic": "sales", "language": "fr", "recipients": ["ventes@example.com"]},
+    {"site": "example.com", "recipients": ["site@example.com"]},
+]
+
+
+class TopicContactForm(ContactForm):
+    """
+    Contact form routed by topic through the settings routing table.
+
+    """
+
+    topic = forms.ChoiceField(choices=[("sales", "Sales"), ("support", "Support")])
+
+    routing_table = settings_routes
+
+
+class DatabaseRoutedContactForm(TopicContactForm):
+    """
+    Contact form routed through the database routing table.
+
+    """
+
+    routing_table = database_routes
+
+
+class RoutingTableTests(TestCase):
+    """
+    Tests for compiling and resolving routes.
+
+    """
+
+    def test_compile(self):
+        """
+        Routes compile to a dictionary keyed by topic, site and language.
+
+        """
+        assert compile_routes(ROUTES[1:3]) == {
+            ("sales", None, None): ["sales@example.com"],
+            ("sales", None, "fr"): ["ventes@example.com"],
+        }
+
+    def test_most_specific(self):
+        """
+        The most specific matching route is used.
+
+        """
+        table = RoutingTable(lambda: ROUTES)
+        assert table.resolve("sales", "example.org", "fr") == ["ventes@example.com"]
+        assert table.resolve("sales", "example.com", "en") == ["sales@example.com"]
+        assert table.resolve("support", "example.com", "fr") == ["site@example.com"]
+        assert table.resolve("support", "example.org") == ["default@example.com"]
+
+    def test_no_match(self):
+        """
+        With no matching route, resolve() returns None.
+
+        """
+        assert RoutingTable(lambda: ROUTES[1:]).resolve("support") is None
+
+    def test_loaded_once(self):
+        """
+        Routes are loaded once, until the table is reloaded.
+
+        """
+        loader = mock.Mock(return_value=ROUTES)
+        table = RoutingTable(loader)
+        table.resolve("sales")
+        table.resolve("support")
+        assert loader.call_count == 1
+        table.reload()
+        table.resolve("sales")
+        assert loader.call_count == 2
+
+    def test_reloaded_while_waiting(self):
+        """
+        A table discarded by reload() while a stale copy is being replaced is loaded
+        again, rather than returned as None.
+
+        """
+
+        class ReloadingLock:
+            """
+            Lock which discards the table as it's acquired, as a reload() finishing
+            just before would.
+
+            """
+
+            def __enter__(self):
+                """
+                Discard the table.
+
+                """
+                table._table = None  # pylint: disable=protected-access
+
+            def __exit__(self, *exc_info):
+                """
+                Release nothing.
+
+                """
+
+        loader = mock.Mock(return_value=ROUTES)
+        table = RoutingTable(loader, max_age=60)
+        with mock.patch("time.monotonic", return_value=100.0):
+            table.resolve("sales")
+        table._lock = ReloadingLock()  # pylint: disable=protected-access
+        with mock.patch("time.monotonic", return_value=200.0):
+            assert table.resolve("sales") == ["sales@example.com"]
+        assert loader.call_count == 2
+
+    def test_max_age(self):
+        """
+        With max_age, routes are loaded again once they are that old.
+
+        """
+        loader = mock.Mock(return_value=ROUTES)
+        table = RoutingTable(loader, max_age=60)
+        with mock.patch("time.monotonic", return_value=100.0):
+            table.resolve("sales")
+        with mock.patch("time.monotonic", return_value=159.0):
+            table.resolve("sales")
+        assert loader.call_count == 1
+        with mock.patch("time.monotonic", return_value=160.0):
+            table.resolve("sales")
+        assert loader.call_count == 2
+
+
+class RoutedFormTests(TestCase):
+    """
+    Tests for routing the messages of contact forms.
+
+    """
+
+    def form(self, form_class=TopicContactForm, topic="sales", **kwargs):
+        """
+        Return a valid form of the given class on the given topic.
+
+        """
+        return valid_form(form_class, dict(VALID_DATA, topic=topic), **kwargs)
+
+    @override_settings(CONTACT_FORM_ROUTES=ROUTES)
+    def test_settings_routes(self):
+        """
+        Recipients are routed by topic, site and language.
+
+        """
+        assert self.form().get_message_dict()["recipient_list"] == ["sales@example.com"]
+        with translation.override("fr"):
+            assert self.form().get_message_dict()["recipient_list"] == [
+                "ventes@example.com"
+            ]
+        assert self.form(topic="support").get_message_dict()["recipient_list"] == [
+            "site@example.com"
+        ]
+
+    def test_settings_change_reloads(self):
+        """
+        Changing the CONTACT_FORM_ROUTES setting reloads the routes.
+
+        """
+        with override_settings(CONTACT_FORM_ROUTES=ROUTES[1:2]):
+            assert self.form().get_message_dict()["recipient_list"] == [
+                "sales@example.com"
+            ]
+        with override_settings(CONTACT_FORM_ROUTES=ROUTES[3:]):
+            assert self.form().get_message_dict()["recipient_list"] == [
+                "site@example.com"
+            ]
+
+    @override_settings(CONTACT_FORM_ROUTES=[])
+    def test_fallback(self):
+        """
+        With no matching route, the form's recipient_list is used.
+
+        """
+        form = self.form()
+        assert form.get_message_dict()["recipient_list"] == form.recipient_list
+
+    @override_settings(CONTACT_FORM_ROUTES=ROUTES)
+    def test_explicit_recipient_list(self):
+        """
+        A recipient list passed to the form overrides routing.
+
+        """
+        form = self.form(recipient_list=["explicit@example.com"])
+        assert form.get_message_dict()["recipient_list"] == ["explicit@example.com"]
+
+    def test_database_routes(self):
+        """
+        Routes can be stored in the database, and changes take effect immediately.
+
+        """
+        route = Route.objects.create(topic="sales", recipients=["db@example.com"])
+        assert str(route) == "db@example.com"
+        form = self.form(DatabaseRoutedContactForm)
+        assert form.get_message_dict()["recipient_list"] == ["db@example.com"]
+        with self.assertNumQueries(0):
+            self.form(DatabaseRoutedContactForm).get_message_dict()
+        route.recipients = ["changed@example.com"]
+        route.save()
+        form = self.form(DatabaseRoutedContactForm)
+        assert form.get_message_dict()["recipient_list"] == ["changed@example.com"]
+        route.delete()
+        form = self.form(DatabaseRoutedContactForm)
+        assert form.get_message_dict()["recipient_list"] == form.recipient_list
@@ -0,0 +1,237 @@
+"""
+Tests for the local spam checks.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import ipaddress
+import json
+from http import HTTPStatus
+from unittest import mock
+
+from django import forms
+from django.test import RequestFactory, TestCase
+
+from django_contact_form.forms import AkismetContactForm
+from django_contact_form.spam import (
+    HAM,
+    SPAM,
+    CircuitBreaker,
+    HoneypotCheck,
+    LinkCountCheck,
+    MinimumTimeCheck,
+    NetworkCheck,
+    run_checks,
+)
+from django_contact_form.views import ContactFormAPIView
+
+
+class CheckedForm(AkismetContactForm):
+    """
+    Akismet form with a honeypot and timestamp field, and local spam checks.
+
+    """
+
+    website = forms.CharField(required=False)
+    rendered_at = forms.CharField(
+        widget=forms.HiddenInput, required=False, initial=MinimumTimeCheck.timestamp
+    )
+
+    spam_checks = [
+        HoneypotCheck(),
+        NetworkCheck(["10.0.0.0/8"], is_spam=HAM),
+        MinimumTimeCheck(min_seconds=2),
+        LinkCountCheck(max_links=1),
+    ]
+
+
+class SpamCheckTests(TestCase):
+    """
+    Tests for the local spam checks and their use by AkismetContactForm.
+
+    """
+
+    payload = {
+        "name": "Test Name",
+        "email": "test@example.com",
+        "body": "Test message.",
+    }
+
+    def form(self, data=None, remote_addr="127.0.0.1", age=10):
+        """
+        Return a CheckedForm with the given data, displayed ``age`` seconds ago.
+
+        """
+        with mock.patch("time.time", return_value=1000.0 - age):
+            rendered_at = MinimumTimeCheck.timestamp()
+        request = RequestFactory().post("/", REMOTE_ADDR=remote_addr)
+        return CheckedForm(
+            request=request, data={**self.payload, "rendered_at": rendered_at, **data}
+        )
+
+    def check(self, form):
+        """
+        Validate the form, and return the verdict reached by the local checks.
+
+        """
+        verdicts = []
+
+        def record_verdict(checks, form):
+            """
+            Run the checks, recording their verdict.
+
+            """
+            verdicts.append(run_checks(checks, form))
+            return verdicts[-1]
+
+        with mock.patch("time.time", return_value=1000.0), mock.patch(
+            "django_contact_form.forms.run_checks", side_effect=record_verdict
+        ), mock.patch.object(
+            CheckedForm, "get_akismet_client", side_effect=AssertionError
+        ):
+            form.is_valid()
+        return verdicts[0]
+
+    def test_honeypot(self):
+        """
+        Filling in the honeypot field marks a submission as spam.
+
+        """
+        form = self.form({"website": "http://spam.example.com/"})
+        assert SPAM is self.check(form)
+        assert str(form.SPAM_MESSAGE) in form.errors["body"]
+
+    def test_too_fast(self):
+        """
+        Submitting too soon after display marks a submission as spam.
+
+        """
+        assert SPAM is self.check(self.form({}, age=1))
+
+    def test_bad_timestamp(self):
+        """
+        A missing or tampered timestamp marks a submission as spam.
+
+        """
+        assert SPAM is self.check(self.form({"rendered_at": "garbage"}))
+
+    def test_expired_timestamp(self):
+        """
+        A timestamp older than max_age marks a submission as spam, unless max_age is
+        None.
+
+        """
+        form = self.form({}, age=86401)
+        assert SPAM is self.check(form)
+        with mock.patch("time.time", return_value=1000.0):
+            assert MinimumTimeCheck(max_age=None)(form) is None
+
+    def test_json_values(self):
+        """
+        Timestamp and honeypot values which aren't strings, as JSON submissions may
+        have, are classified rather than crashing the check.
+
+        """
+        view = ContactFormAPIView.as_view(form_class=CheckedForm)
+        for data in ({"rendered_at": None}, {"rendered_at": 5}, {"website": 1}):
+            request = RequestFactory().post(
+                "/", {**self.payload, **data}, content_type="application/json"
+            )
+            with mock.patch.object(
+                CheckedForm, "get_akismet_client", side_effect=AssertionError
+            ):
+                response = view(request)
+            assert HTTPStatus.BAD_REQUEST == response.status_code
+            errors = json.loads(response.content)["errors"]
+            assert [str(CheckedForm.SPAM_MESSAGE)] == errors["body"]
+
+    def test_links(self):
+        """
+        Too many links marks a submission as spam.
+
+        """
+        body = "See http://one.example.com/ and www.two.example.com"
+        assert SPAM is self.check(self.form({"body": body}))
+
+    def test_trusted_network(self):
+        """
+        Submissions from trusted networks are not spam, without asking Akismet.
+
+        """
+        form = self.form({"website": ""}, remote_addr="10.1.2.3", age=0)
+        assert HAM is self.check(form)
+        assert form.is_valid()
+
+    async def test_async(self):
+        """
+        Local checks are also applied when validating asynchronously.
+
+        """
+        form = self.form({"website": "spam"})
+        with mock.patch.object(
+            CheckedForm, "aget_akismet_client", side_effect=AssertionError
+        ):
+            assert not await form.ais_valid()
+
+    def test_inconclusive(self):
+        """
+        When no local check decides, Akismet is consulted.
+
+        """
+        form = self.form({})
+        akismet_client = mock.Mock()
+        akismet_client.comment_check.return_value = False
+        with mock.patch("time.time", return_value=1000.0), mock.patch.object(
+            CheckedForm, "get_akismet_client", return_value=akismet_client
+        ):
+            assert form.is_valid()
+        akismet_client.comment_check.assert_called_once()
+
+    def test_network_check(self):
+        """
+        Network checks accept network objects, block by default, and ignore
+        unparseable addresses.
+
+        """
+        check = NetworkCheck([ipaddress.ip_network("192.0.2.0/24")])
+        form = mock.Mock()
+        form.request.META = {"REMOTE_ADDR": "192.0.2.1"}
+        assert SPAM is check(form)
+        form.request.META = {"REMOTE_ADDR": "198.51.100.1"}
+        assert check(form) is None
+        form.request.META = {}
+        assert check(form) is None
+
+
+class CircuitBreakerTests(TestCase):
+    """
+    Tests for the circuit breaker.
+
+    """
+
+    def test_transitions(self):
+        """
+        The breaker opens after the failure threshold, lets one probe through once the
+        reset timeout passes, and reopens if the probe fails.
+
+        """
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        with mock.patch("time.monotonic", return_value=100.0):
+            assert breaker.allow()
+            breaker.record_failure()
+            assert CircuitBreaker.CLOSED == breaker.state
+            breaker.record_failure()
+            assert CircuitBreaker.OPEN == breaker.state
+            assert not breaker.allow()
+        with mock.patch("time.monotonic", return_value=111.0):
+            assert breaker.allow()
+            assert CircuitBreaker.HALF_OPEN == breaker.state
+            assert not breaker.allow()
+            breaker.record_failure()
+            assert CircuitBreaker.OPEN == breaker.state
+        with mock.patch("time.monotonic", return_value=122.0):
+            assert breaker.allow()
+            breaker.record_success()
+            assert CircuitBreaker.CLOSED == breaker.state
+            assert breaker.allow()
@@ -0,0 +1,393 @@
+"""
+Tests for the stored-submission model.
+
+"""
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+import datetime
+from io import StringIO
+from unittest import mock
+
+import akismet
+from django.core import mail
+from django.core.management import call_command
+from django.forms import DateField
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from django_contact_form.delivery import (
+    DatabaseDeliveryBackend,
+    ThreadDeliveryBackend,
+    drain_queue,
+)
+from django_contact_form.forms import AkismetContactForm, ContactForm
+from django_contact_form.models import Submission
+
+from .helpers import VALID_DATA, make_form
+
+
+class StoringForm(ContactForm):
+    """
+    Contact form which stores its submissions.
+
+    """
+
+    store_submissions = True
+
+
+class StoringAkismetForm(AkismetContactForm):
+    """
+    Akismet contact form which stores its submissions.
+
+    """
+
+    store_submissions = True
+
+
+class SubmissionTests(TestCase):
+    """
+    Tests for storing, querying and pruning submissions.
+
+    """
+
+    def test_save(self):
+        """
+        Saving a form with store_submissions set stores the submission.
+
+        """
+        form = make_form(StoringForm)
+        assert form.is_valid()
+        form.save()
+        submission = Submission.objects.get()
+        assert "example.com" == submission.site
+        assert "test@example.com" == submission.email
+        assert "127.0.0.1" == submission.ip_address
+        assert submission.is_spam is None
+        assert Submission.Status.SENT == submission.status
+        assert form.get_content_hash() == submission.content_hash
+        assert form.subject() == str(submission)
+        assert form.message() == submission.message["message"]
+
+    def test_stored_before_delivery(self):
+        """
+        The submission is stored before the message is delivered, and a failed
+        delivery is recorded.
+
+        """
+        form = make_form(StoringForm)
+        assert form.is_valid()
+        with mock.patch(
+            "django_contact_form.forms.send_mail",
+            side_effect=lambda **kwargs: self.fail_delivery(),
+        ), self.assertRaises(OSError):
+            form.save()
+        assert Submission.Status.FAILED == Submission.objects.get().status
+
+    def fail_delivery(self):
+        """
+        Check that the submission is stored, pending delivery, then fail.
+
+        """
+        assert Submission.Status.PENDING == Submission.objects.get().status
+        raise OSError
+
+    def test_delivery_statuses(self):
+        """
+        Messages handed to a delivery backend are recorded as queued, and partly
+        failed fan-out deliveries as failed.
+
+        """
+        backend = mock.Mock()
+        form = make_form(
+            type("QueuedForm", (StoringForm,), {"delivery_backend": backend})
+        )
+        assert form.is_valid()
+        form.save()
+        backend.enqueue.assert_called_once()
+        assert Submission.Status.QUEUED == Submission.objects.get().status
+
+        Submission.objects.all().delete()
+        form = make_form(
+            type(
+                "FanOutForm",
+                (StoringForm,),
+                {"fan_out": True, "recipient_list": ["one@example.com"]},
+            )
+        )
+        assert form.is_valid()
+        with mock.patch(
+            "django_contact_form.mail.ConnectionPool.send_messages",
+            side_effect=OSError,
+        ):
+            form.save(fail_silently=True)
+        assert Submission.Status.FAILED == Submission.objects.get().status
+
+    def test_database_backend(self):
+        """
+        Messages queued in the database update their submission's status when the
+        queue is drained: sent, or failed once out of attempts.
+
+        """
+        form_class = type(
+            "DatabaseQueuedForm",
+            (StoringForm,),
+            {"delivery_backend": DatabaseDeliveryBackend()},
+        )
+        make_form(form_class).save()
+        assert Submission.Status.QUEUED == Submission.objects.get().status
+        assert (1, 0, 0) == drain_queue()
+        assert 1 == len(mail.outbox)
+        assert Submission.Status.SENT == Submission.objects.get().status
+
+        Submission.objects.all().delete()
+        make_form(form_class).save()
+        with mock.patch("django_contact_form.delivery.send_mail", side_effect=OSError):
+            assert (0, 1, 0) == drain_queue(max_attempts=1)
+        assert Submission.Status.FAILED == Submission.objects.get().status
+
+    async def test_asave_failed(self):
+        """
+        asave() records failed deliveries too.
+
+        """
+        form = make_form(StoringForm)
+        assert await form.ais_valid()
+        with mock.patch(
+            "django_contact_form.forms.send_mail", side_effect=OSError
+        ), self.assertRaises(OSError):
+            await form.asave()
+        submission = await Submission.objects.aget()
+        assert Submission.Status.FAILED == submission.status
+
+    def test_spam_stored(self):
+        """
+        Submissions rejected as spam are stored, with their verdict, though not sent.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check.return_value = True
+        with mock.patch.object(
+            StoringAkismetForm, "get_akismet_client", return_value=akismet_client
+        ):
+            form = make_form(StoringAkismetForm)
+            assert not form.is_valid()
+        submission = Submission.objects.get()
+        assert submission.is_spam is True
+        assert Submission.Status.SPAM == submission.status
+        assert VALID_DATA["body"] in submission.message["message"]
+
+    async def test_spam_stored_async(self):
+        """
+        Submissions rejected as spam when validated asynchronously are stored too.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check = mock.AsyncMock(return_value=True)
+        with mock.patch.object(
+            StoringAkismetForm, "aget_akismet_client", return_value=akismet_client
+        ):
+            form = make_form(StoringAkismetForm)
+            assert not await form.ais_valid()
+        submission = await Submission.objects.aget()
+        assert submission.is_spam is True
+
+    def test_deferred_verdicts(self):
+        """
+        When deferred submissions are checked and sent from the queue, their stored
+        verdicts and statuses are updated.
+
+        """
+        with mock.patch.object(StoringAkismetForm, "akismet_deferred", True):
+            for body in ("Ham", "Spam", "Unchecked"):
+                form = make_form(StoringAkismetForm, dict(VALID_DATA, body=body))
+                assert form.is_valid()
+                form.save()
+        assert (
+            3
+            == Submission.objects.filter(
+                status=Submission.Status.QUEUED, is_spam=None
+            ).count()
+        )
+
+        async def comment_check(**arguments):
+            """
+            Classify by message body, failing for unchecked messages.
+
+            """
+            if arguments["comment_content"] == "Unchecked":
+                raise akismet.RequestError
+            return arguments["comment_content"] == "Spam"
+
+        client = mock.Mock()
+        client.comment_check = comment_check
+        with mock.patch(
+            "django_contact_form._akismet._batch_client", return_value=client
+        ):
+            assert (1, 1, 1) == drain_queue(max_attempts=2, retries=0)
+            assert Submission.Status.QUEUED == (
+                Submission.objects.get(message__message="Unchecked").status
+            )
+            assert (0, 1, 0) == drain_queue(max_attempts=2, retries=0)
+        statuses = {
+            submission.message["message"]: (submission.is_spam, submission.status)
+            for submission in Submission.objects.all()
+        }
+        assert {
+            "Ham": (False, Submission.Status.SENT),
+            "Spam": (True, Submission.Status.SPAM),
+            "Unchecked": (None, Submission.Status.FAILED),
+        } == statuses
+
+    def test_not_stored_by_default(self):
+        """
+        By default, submissions are not stored.
+
+        """
+        form = make_form(ContactForm)
+        assert form.is_valid()
+        form.save()
+        assert not Submission.objects.exists()
+
+    async def test_asave(self):
+        """
+        asave() stores the submission too.
+
+        """
+        form = make_form(StoringForm)
+        assert await form.ais_valid()
+        await form.asave()
+        assert 1 == await Submission.objects.acount()
+
+    def test_content_hash(self):
+        """
+        Submissions of the same data, including values which aren't text, have the
+        same content hash.
+
+        """
+        form_class = type("DatedForm", (StoringForm,), {"visited": DateField()})
+        first, second, other = (
+            make_form(form_class, data=dict(VALID_DATA, visited="2026-01-01")),
+            make_form(form_class, data=dict(VALID_DATA, visited="2026-01-01")),
+            make_form(form_class, data=dict(VALID_DATA, visited="2026-01-02")),
+        )
+        for form in (first, second, other):
+            form.is_valid()
+        assert first.get_content_hash() == second.get_content_hash()
+        assert first.get_content_hash() != other.get_content_hash()
+
+    def test_akismet_verdicts(self):
+        """
+        Submissions which passed Akismet are recorded as not spam; those whose check
+        was skipped or deferred have no verdict.
+
+        """
+        akismet_client = mock.Mock()
+        akismet_client.comment_check.return_value = False
+        with mock.patch.object(
+            StoringAkismetForm, "get_akismet_client", return_value=akismet_client
+        ):
+            form = make_form(StoringAkismetForm)
+            assert form.is_valid()
+            form.save()
+        assert Submission.objects.get().is_spam is False
+
+        Submission.objects.all().delete()
+        akismet_client.comment_check.side_effect = akismet.RequestError
+        with mock.patch.object(
+            StoringAkismetForm, "get_akismet_client", return_value=akismet_client
+        ), mock.patch.object(StoringAkismetForm, "akismet_failure_policy", "open"):
+            form = make_form(StoringAkismetForm)
+            assert form.is_valid()
+            form.save()
+        assert Submission.objects.get().is_spam is None
+
+        Submission.objects.all().delete()
+        with mock.patch.object(StoringAkismetForm, "akismet_deferred", True):
+            form = make_form(StoringAkismetForm)
+            assert form.is_valid()
+            form.save()
+        assert Submission.objects.get().is_spam is None
+
+    async def test_akismet_deferred_async(self):
+        """
+        Deferred submissions saved asynchronously are stored too.
+
+        """
+        with mock.patch.object(StoringAkismetForm, "akismet_deferred", True):
+            form = make_form(StoringAkismetForm)
+            assert await form.ais_valid()
+            await form.asave()
+        assert 1 == await Submission.objects.acount()
+
+    def test_record_many(self):
+        """
+        Many submissions can be stored in bulk.
+
+        """
+        forms = [make_form(ContactForm) for _ in range(3)]
+        for form in forms:
+            form.is_valid()
+        with self.assertNumQueries(1):
+            Submission.objects.record_many(forms)
+        assert 3 == Submission.objects.count()
+
+    def test_prune(self):
+        """
+        Pruning deletes old submissions in chunks, keeping recent ones.
+
+        """
+        forms = [make_form(ContactForm) for _ in range(5)]
+        for form in forms:
+            form.is_valid()
+        Submission.objects.record_many(forms)
+        old = list(Submission.objects.values_list("pk", flat=True)[:4])
+        Submission.objects.filter(pk__in=old).update(
+            created=timezone.now() - datetime.timedelta(days=100)
+        )
+        stdout = StringIO()
+        call_command("prune_contact_form_submissions", "--chunk-size=3", stdout=stdout)
+        assert "Deleted 4 submission(s)." in stdout.getvalue()
+        assert 1 == Submission.objects.count()
+
+
+class ThreadDeliveryStatusTests(TransactionTestCase):
+    """
+    Tests for the submission statuses recorded by the thread delivery backend, whose
+    worker writes to the database from its own thread.
+
+    """
+
+    def test_statuses(self):
+        """
+        The worker records each message's submission as sent or failed, and a failure
+        to record the status doesn't stop it.
+
+        """
+        backend = ThreadDeliveryBackend()
+        form_class = type(
+            "ThreadQueuedForm", (StoringForm,), {"delivery_backend": backend}
+        )
+        make_form(form_class).save()
+        backend.join()
+        assert 1 == len(mail.outbox)
+        assert Submission.Status.SENT == Submission.objects.get().status
+
+        Submission.objects.all().delete()
+        with mock.patch.object(
+            ThreadDeliveryBackend._pool,  # pylint: disable=protected-access
+            "send_messages",
+            side_effect=OSError,
+        ), self.assertLogs("django_contact_form.delivery", "ERROR"):
+            make_form(form_class).save()
+            backend.join()
+        assert Submission.Status.FAILED == Submission.objects.get().status
+
+        with mock.patch(
+            "django_contact_form.delivery._set_submission_status",
+            side_effect=RuntimeError,
+        ), self.assertLogs("django_contact_form.delivery", "ERROR") as logs:
+            make_form(form_class).save()
+            backend.join()
+        assert "Failed to record" in logs.output[0]
+        assert 2 == len(mail.outbox)
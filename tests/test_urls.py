@@ -8,7 +8,13 @@ URLConf for testing django-contact-form.
 from django.urls import path
 from django.views.generic import TemplateView
 
-from django_contact_form.views import ContactFormView
+from django_contact_form.ratelimit import RateLimit
+from django_contact_form.views import (
+    AsyncContactFormAPIView,
+    AsyncContactFormView,
+    ContactFormAPIView,
+    ContactFormView,
+)
 
 urlpatterns = [
     path("", ContactFormView.as_view(), name="django_contact_form"),
@@ -24,4 +30,53 @@ urlpatterns = [
         ContactFormView.as_view(recipient_list=["recipient_list@example.com"]),
         name="test_recipient_list",
     ),
+    path("async/", AsyncContactFormView.as_view(), name="test_async"),
+    path(
+        "cached/",
+        ContactFormView.as_view(
+            page_cache_alias="default",
+            template_name="django_contact_form/test_cached_form.html",
+        ),
+        name="test_cached",
+    ),
+    path(
+        "async_cached/",
+        AsyncContactFormView.as_view(
+            page_cache_alias="default",
+            template_name="django_contact_form/test_cached_form.html",
+        ),
+        name="test_async_cached",
+    ),
+    path(
+        "inline/",
+        ContactFormView.as_view(
+            page_cache_alias="default",
+            success_template_name="django_contact_form/contact_form_sent.html",
+        ),
+        name="test_inline",
+    ),
+    path(
+        "async_inline/",
+        AsyncContactFormView.as_view(
+            success_template_name="django_contact_form/contact_form_sent.html",
+        ),
+        name="test_async_inline",
+    ),
+    path("api/", ContactFormAPIView.as_view(), name="test_api"),
+    path(
+        "api_recipient_list/",
+        ContactFormAPIView.as_view(recipient_list=["recipient_list@example.com"]),
+        name="test_api_recipient_list",
+    ),
+    path(
+        "api_limited/",
+        ContactFormAPIView.as_view(rate_limits=[RateLimit(rate=1)]),
+        name="test_api_limited",
+    ),
+    path("async_api/", AsyncContactFormAPIView.as_view(), name="test_async_api"),
+    path(
+        "async_api_limited/",
+        AsyncContactFormAPIView.as_view(rate_limits=[RateLimit(rate=1)]),
+        name="test_async_api_limited",
+    ),
 ]
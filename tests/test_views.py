@@ -6,15 +6,20 @@ Tests for the built-in views.
 # SPDX-License-Identifier: BSD-3-Clause
 
 from http import HTTPStatus
+from unittest import mock
 
 import django
+from django import forms
 from django.conf import settings
-from django.core import mail
+from django.core import mail, signing
+from django.core.cache import cache
 from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 
 from django_contact_form.forms import AkismetContactForm, ContactForm
+from django_contact_form.spam import MinimumTimeCheck
+from django_contact_form.views import ContactFormView
 
 
 @override_settings(ROOT_URLCONF="tests.test_urls")
@@ -95,6 +100,209 @@ class ContactFormViewTests(TestCase):
         message = mail.outbox[0]
         assert ["recipient_list@example.com"] == message.recipients()
 
+    async def test_async_get(self):
+        """
+        HTTP GET on the async form view just shows the form.
+
+        """
+        response = await self.async_client.get(reverse("test_async"))
+        assert HTTPStatus.OK == response.status_code
+        self.assertTemplateUsed(response, "django_contact_form/contact_form.html")
+
+    async def test_async_send(self):
+        """
+        Valid data through the async view results in a successful send.
+
+        """
+        data = {"name": "Test", "email": "test@example.com", "body": "Test message"}
+
+        response = await self.async_client.post(reverse("test_async"), data=data)
+
+        assert HTTPStatus.FOUND == response.status_code
+        assert reverse("django_contact_form_sent") == response.url
+        assert 1 == len(mail.outbox)
+        assert data["body"] in mail.outbox[0].body
+
+    async def test_async_put(self):
+        """
+        HTTP PUT on the async form view is handled the same as POST.
+
+        """
+        response = await self.async_client.put(reverse("test_async"))
+
+        assert HTTPStatus.OK == response.status_code
+        assert "name" in response.context["form"].errors
+        assert 0 == len(mail.outbox)
+
+    async def test_async_invalid(self):
+        """
+        Invalid data through the async view re-displays the form and sends nothing.
+
+        """
+        data = {"name": "Test", "body": "Test message"}
+
+        response = await self.async_client.post(reverse("test_async"), data=data)
+
+        assert HTTPStatus.OK == response.status_code
+        assert "email" in response.context["form"].errors
+        assert 0 == len(mail.outbox)
+
+    def test_cached_get(self):
+        """
+        With page_cache_alias, the form page is rendered once and served from the
+        cache, with a fresh CSRF token each time.
+
+        """
+        cache.clear()
+        url = reverse("test_cached")
+        with mock.patch(
+            "django_contact_form.views.ContactFormView._render_page",
+            autospec=True,
+            side_effect=ContactFormView._render_page,  # pylint: disable=protected-access
+        ) as render:
+            first = self.client.get(url)
+            self.client.cookies.clear()
+            second = self.client.get(url)
+        assert render.call_count == 1
+        assert HTTPStatus.OK == second.status_code
+        for response in (first, second):
+            content = response.content.decode()
+            assert 'name="csrfmiddlewaretoken"' in content
+            assert "placeholder" not in content
+            assert 'name="body"' in content
+            assert response["Vary"] == "Cookie, Accept-Language"
+            assert "private" in response["Cache-Control"]
+        assert first.content != second.content
+        assert first["ETag"] != second["ETag"]
+
+    def test_cached_get_csrf(self):
+        """
+        The CSRF token served in a cached page is accepted.
+
+        """
+        cache.clear()
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.get(reverse("test_cached"))
+        token = response.content.decode().split('value="')[1].split('"')[0]
+        response = client.post(
+            reverse("test_cached"),
+            {
+                "name": "Test",
+                "email": "test@example.com",
+                "body": "Test message",
+                "csrfmiddlewaretoken": token,
+            },
+        )
+        assert HTTPStatus.FOUND == response.status_code
+        assert 1 == len(mail.outbox)
+
+    def test_cached_get_etag(self):
+        """
+        A cached page is revalidated by its ETag while the CSRF secret is unchanged.
+
+        """
+        cache.clear()
+        url = reverse("test_cached")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        assert HTTPStatus.NOT_MODIFIED == response.status_code
+        assert response["ETag"] == etag
+
+    def test_cached_get_timestamp(self):
+        """
+        A form page carrying a MinimumTimeCheck timestamp is rendered afresh for each
+        request, even with page_cache_alias, so that each page has its own timestamp.
+
+        """
+
+        class TimedForm(ContactForm):
+            """
+            Contact form with a signed timestamp of when it was rendered.
+
+            """
+
+            rendered_at = forms.CharField(
+                widget=forms.HiddenInput,
+                required=False,
+                initial=MinimumTimeCheck.timestamp,
+            )
+
+        cache.clear()
+        view = ContactFormView.as_view(
+            form_class=TimedForm,
+            page_cache_alias="default",
+            template_name="django_contact_form/test_cached_form.html",
+        )
+        with mock.patch(
+            "django_contact_form.views.ContactFormView._cached_page"
+        ) as cached_page:
+            pages = [
+                view(RequestFactory().get("/")).render().content.decode()
+                for _ in range(2)
+            ]
+        cached_page.assert_not_called()
+        rendered_at = [
+            signing.loads(
+                page.split('name="rendered_at" value="')[1].split('"')[0],
+                salt=MinimumTimeCheck.salt,
+            )
+            for page in pages
+        ]
+        assert rendered_at[0] < rendered_at[1]
+
+    async def test_async_cached_get(self):
+        """
+        The async view serves cached pages too.
+
+        """
+        await cache.aclear()
+        response = await self.async_client.get(reverse("test_async_cached"))
+        assert HTTPStatus.OK == response.status_code
+        assert response.has_header("ETag")
+
+    def test_inline_success(self):
+        """
+        With success_template_name, a successful submission is answered with that
+        page, rendered once and cached, rather than a redirect.
+
+        """
+        cache.clear()
+        data = {"name": "Test", "email": "test@example.com", "body": "Test message"}
+        with mock.patch(
+            "django_contact_form.views.ContactFormView._render",
+            side_effect=ContactFormView._render,  # pylint: disable=protected-access
+        ) as render:
+            for _ in range(2):
+                response = self.client.post(reverse("test_inline"), data=data)
+                assert HTTPStatus.OK == response.status_code
+                assert response.has_header("Content-Type")
+        assert render.call_count == 1
+        assert 2 == len(mail.outbox)
+
+    async def test_async_inline_success(self):
+        """
+        The async view can answer a successful submission with a page, too.
+
+        """
+        data = {"name": "Test", "email": "test@example.com", "body": "Test message"}
+        response = await self.async_client.post(reverse("test_async_inline"), data=data)
+        assert HTTPStatus.OK == response.status_code
+        assert 1 == len(mail.outbox)
+
+    def test_sent_view(self):
+        """
+        The provided URLconfs serve the sent page with long-lived caching headers.
+
+        """
+        for urlconf in ("django_contact_form.urls", "django_contact_form.akismet_urls"):
+            with override_settings(ROOT_URLCONF=urlconf):
+                response = self.client.get(reverse("django_contact_form_sent"))
+            assert HTTPStatus.OK == response.status_code
+            self.assertTemplateUsed(
+                response, "django_contact_form/contact_form_sent.html"
+            )
+            assert response["Cache-Control"] == "public, max-age=86400"
+
     @override_settings(ROOT_URLCONF="django_contact_form.akismet_urls")
     def test_akismet_view(self):
         """